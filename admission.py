@@ -0,0 +1,100 @@
+"""
+Memory-budget admission control for bulk runs
+
+Parallel bulk workers can run out of memory when several very large textures are
+decoded at the same time. MemoryBudget admits a job only while the estimated peak
+memory of all admitted jobs stays under a limit; estimates come from image headers
+(planner.CostModel), so nothing is decoded before it is admitted. Jobs are admitted in
+arrival order, so a large texture is not starved by a stream of small ones.
+
+A job whose estimate exceeds the whole budget is run alone, once everything else has
+finished, and on the low-memory unpack path (see ImageProcessor.save_channels_streaming).
+That path still decodes the whole image, so the job keeps its full estimate.
+"""
+
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+from texture_processor import ImageConfig
+
+
+def default_memory_budget() -> Optional[int]:
+    """ImageConfig.BULK_MEMORY_BUDGET_FRACTION of physical memory, if it can be determined"""
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+    return int(total * ImageConfig.BULK_MEMORY_BUDGET_FRACTION)
+
+
+def estimate_unpack_bytes(image_path: str, apply_gamma_correction: bool = False, sniffed=None) -> int:
+    """
+    Estimated peak bytes to unpack an image, from its header; 0 if it cannot be read
+    sniffed is the file's sniffer.SniffResult, if the caller has already read the header.
+    """
+    from planner import CostModel, probe_file
+
+    probe = probe_file(image_path, sniffed)
+    if probe.error:
+        return 0  # Fails at decode without allocating much
+    return CostModel().unpack_cost(probe, apply_gamma_correction)[1]
+
+
+class MemoryBudget:
+    """Admits jobs in arrival order while their summed memory estimates fit under a limit"""
+
+    def __init__(self, limit_bytes: int):
+        if limit_bytes <= 0:
+            raise ValueError("Memory budget must be positive")
+        self.limit_bytes = limit_bytes
+        self.in_use = 0
+        self.stats = {"admitted": 0, "waited": 0, "oversized": 0, "peak_bytes": 0}
+        self._queue: "deque[object]" = deque()
+        self._running = 0
+        self._changed = threading.Condition()
+
+    def oversized(self, nbytes: int) -> bool:
+        """Whether a job is larger than the whole budget"""
+        return nbytes > self.limit_bytes
+
+    def _fits(self, ticket: object, nbytes: int) -> bool:
+        if self._queue[0] is not ticket:
+            return False
+        if self.oversized(nbytes):
+            return self._running == 0  # Runs alone
+        return self.in_use + nbytes <= self.limit_bytes
+
+    def acquire(self, nbytes: int):
+        """Block until the job can run"""
+        ticket = object()
+        with self._changed:
+            self._queue.append(ticket)
+            if not self._fits(ticket, nbytes):
+                self.stats["waited"] += 1
+                self._changed.wait_for(lambda: self._fits(ticket, nbytes))
+            self._queue.popleft()
+            self.in_use += nbytes
+            self._running += 1
+            self.stats["admitted"] += 1
+            self.stats["oversized"] += int(self.oversized(nbytes))
+            self.stats["peak_bytes"] = max(self.stats["peak_bytes"], self.in_use)
+            self._changed.notify_all()
+
+    def release(self, nbytes: int):
+        """Return the memory of a finished job"""
+        with self._changed:
+            self.in_use -= nbytes
+            self._running -= 1
+            self._changed.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes: int):
+        """Hold nbytes of the budget for the enclosed block"""
+        self.acquire(nbytes)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
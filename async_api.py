@@ -0,0 +1,163 @@
+"""
+asyncio API for packing and unpacking
+
+AsyncImageProcessor runs ImageProcessor work (decoding, NumPy conversion, encoding and
+file I/O) on a thread pool shared by all instances, so an event loop can interleave
+thousands of texture jobs with network I/O. Pillow releases the GIL while decoding and
+encoding, so the threads run in parallel.
+
+Each processor limits how many of its jobs run at once. Cancelling a task stops jobs
+that have not started; a job already running on a worker thread finishes in the
+background and its result is discarded.
+
+    processor = AsyncImageProcessor(concurrency=8)
+    image = await processor.pack("rock_r.png", "rock_g.png", output_path="rock.png")
+    async for path, outcome in processor.bulk_unpack(scan_images("textures"), "out"):
+        ...
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from texture_processor import ChannelUnpackerModel, ImageConfig, ImageProcessor, ResizePolicy
+
+
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """Thread pool used by all processors that were not given their own executor"""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(max_workers=ImageConfig.ASYNC_WORKERS,
+                                                  thread_name_prefix="async-texture")
+        return _shared_executor
+
+
+class AsyncImageProcessor:
+    """Awaitable versions of ImageProcessor operations with a concurrency limit"""
+
+    def __init__(self, concurrency: int = ImageConfig.ASYNC_CONCURRENCY, executor: Optional[Executor] = None):
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.executor = executor
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(self, function: Callable, *args, **kwargs):
+        """Run a blocking function on the executor, waiting for a free slot first"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor or shared_executor(),
+                                              functools.partial(function, *args, **kwargs))
+
+    async def pack(self, r_path: Optional[str] = None, g_path: Optional[str] = None,
+                   b_path: Optional[str] = None, a_path: Optional[str] = None,
+                   output_path: Optional[str] = None, preserve_transparent: bool = True,
+                   resize_policy: ResizePolicy = ResizePolicy.STRICT,
+                   target_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+        """Pack channel images into an RGBA image, saving it to output_path if given"""
+        def pack():
+            image = ImageProcessor.pack_channels(r_path, g_path, b_path, a_path,
+                                                 preserve_transparent, resize_policy, target_size)
+            if output_path:
+                ImageProcessor.save_image(image, output_path)
+            return image
+        return await self.run(pack)
+
+    async def unpack(self, image_path: str, apply_gamma_correction: bool = False) -> List[Image.Image]:
+        """Unpack an image into its R, G, B and A channel images"""
+        return await self.run(ImageProcessor.unpack_channels, image_path, apply_gamma_correction)
+
+    async def unpack_to(self, image_path: str, output_dir: str, apply_gamma_correction: bool = False) -> List[str]:
+        """Unpack an image and save its channels to output_dir; returns the saved paths"""
+        def unpack():
+            channels = ImageProcessor.unpack_channels(image_path, apply_gamma_correction)
+            return ImageProcessor.save_channels(channels, output_dir, Path(image_path).stem)
+        return await self.run(unpack)
+
+    async def bulk_unpack(self, image_paths: Union[Iterable[str], AsyncIterator[str]], output_dir: str,
+                          apply_gamma_correction: bool = False,
+                          input_root: Optional[str] = None) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Unpack many images like ChannelUnpackerModel.bulk_unpack_channels, yielding
+        (image_path, saved_files or exception) as files finish
+        image_paths may be a plain or async iterable; plain iterators (e.g.
+        scanner.scan_images) are advanced on the executor so scanning never blocks the loop.
+        """
+        async for _, image_path, outcome in self._bulk_outcomes(image_paths, output_dir,
+                                                               apply_gamma_correction, input_root):
+            yield image_path, outcome
+
+    async def bulk_unpack_all(self, image_paths: Union[Iterable[str], AsyncIterator[str]], output_dir: str,
+                              apply_gamma_correction: bool = False,
+                              input_root: Optional[str] = None) -> Dict[str, Union[List[str], str]]:
+        """Unpack many images; returns the same mapping as bulk_unpack_channels, in input order"""
+        outcomes = []
+        async for index, image_path, outcome in self._bulk_outcomes(image_paths, output_dir,
+                                                                   apply_gamma_correction, input_root):
+            if isinstance(outcome, Exception):
+                outcome = f"Error processing {image_path}: {outcome}"
+            outcomes.append((index, image_path, outcome))
+        if not outcomes:
+            raise ValueError("No image paths provided for bulk unpacking")
+        return {image_path: outcome for _, image_path, outcome in sorted(outcomes, key=lambda item: item[0])}
+
+    async def _bulk_outcomes(self, image_paths, output_dir: str, apply_gamma_correction: bool,
+                             input_root: Optional[str]):
+        """Yield (input index, image_path, outcome) with at most `concurrency` files in flight"""
+        model = ChannelUnpackerModel()
+        model.apply_gamma_correction = apply_gamma_correction
+        paths = self._iterate(image_paths)
+        pending: Dict[asyncio.Future, Tuple[int, str]] = {}
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.concurrency:
+                    try:
+                        image_path = await paths.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    task = asyncio.ensure_future(self.run(model.unpack_file, image_path, output_dir,
+                                                          input_root=input_root))
+                    pending[task] = (index, image_path)
+                    index += 1
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task_index, image_path = pending.pop(task)
+                    exception = task.exception()
+                    yield task_index, image_path, exception if exception is not None else task.result()
+        finally:
+            # Cancelled, or the consumer stopped iterating: drop work that has not started
+            for task in pending:
+                task.cancel()
+
+    async def _iterate(self, image_paths) -> AsyncIterator[str]:
+        if hasattr(image_paths, "__aiter__"):
+            async for image_path in image_paths:
+                yield image_path
+            return
+        iterator = iter(image_paths)
+        if isinstance(image_paths, (list, tuple)):
+            for image_path in iterator:
+                yield image_path
+            return
+        loop = asyncio.get_running_loop()
+        done = object()
+        while True:
+            image_path = await loop.run_in_executor(self.executor or shared_executor(), next, iterator, done)
+            if image_path is done:
+                return
+            yield image_path
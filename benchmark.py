@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the texture processor
+
+Usage:
+    python benchmark.py run --sizes 1024 2048 --workers 1 2 4 --output results.json
+    python benchmark.py compare baseline.json results.json --threshold 0.10
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import PIL
+from PIL import Image
+
+from texture_processor import ImageProcessor, ChannelUnpackerModel
+from profiling import PROFILER
+
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = [1024, 2048]
+DEFAULT_WORKERS = [1, 2, 4]
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_MIN_DELTA = 0.001
+
+
+@dataclass(frozen=True)
+class TextureCase:
+    """Description of a synthetic texture variant"""
+    name: str
+    bit_depth: int
+    alpha: bool
+    transparency: Optional[str] = None  # "sparse" or "dense" fraction of fully transparent pixels
+
+
+TEXTURE_CASES = [
+    TextureCase("rgba8_sparse", 8, True, "sparse"),
+    TextureCase("rgba8_dense", 8, True, "dense"),
+    TextureCase("rgb8", 8, False),
+    TextureCase("gray16", 16, False),
+]
+
+TRANSPARENT_FRACTION = {"sparse": 0.05, "dense": 0.6}
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing result of one benchmark on one texture case"""
+    benchmark: str
+    case: str
+    size: int
+    workers: Optional[int]
+    repeat: int
+    times: List[float]
+    min: float
+    median: float
+    mean: float
+    megapixels_per_second: float
+
+    @property
+    def key(self) -> str:
+        workers = "" if self.workers is None else f"@{self.workers}"
+        return f"{self.benchmark}/{self.case}/{self.size}{workers}"
+
+
+def generate_texture(size: int, case: TextureCase, seed: int = 0) -> Image.Image:
+    """Generate a deterministic synthetic texture: gradients plus seeded noise"""
+    rng = np.random.RandomState(seed + size)
+    ramp = np.linspace(0.0, 1.0, size, dtype=np.float32)
+    gradient = np.add.outer(ramp, ramp) / 2.0
+
+    if case.bit_depth == 16:
+        noise = rng.randint(0, 4096, (size, size)).astype(np.float32)
+        plane = np.clip(gradient * 61439 + noise, 0, 65535).astype(np.uint16)
+        return Image.fromarray(plane)  # uint16 arrays map to mode I;16
+
+    bands = [np.clip(gradient * 200 + rng.randint(0, 56, (size, size)), 0, 255).astype(np.uint8)
+             for _ in range(3)]
+    if case.alpha:
+        alpha = rng.randint(1, 256, (size, size)).astype(np.uint8)
+        alpha[rng.random_sample((size, size)) < TRANSPARENT_FRACTION[case.transparency]] = 0
+        bands.append(alpha)
+
+    return Image.fromarray(np.dstack(bands), mode="RGBA" if case.alpha else "RGB")
+
+
+def _time(function: Callable[[], object], repeat: int) -> List[float]:
+    """Run function repeat times and return wall-clock durations"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _result(benchmark: str, case: str, size: int, workers: Optional[int],
+            times: List[float], pixels: int) -> BenchmarkResult:
+    """Summarize raw timings"""
+    median = statistics.median(times)
+    return BenchmarkResult(
+        benchmark=benchmark,
+        case=case,
+        size=size,
+        workers=workers,
+        repeat=len(times),
+        times=times,
+        min=min(times),
+        median=median,
+        mean=statistics.mean(times),
+        megapixels_per_second=(pixels / 1e6) / median if median > 0 else 0.0,
+    )
+
+
+def run_benchmarks(sizes: List[int], workers: List[int], repeat: int, work_dir: str,
+                   bulk_files: int = 8, flatten_max_size: int = 2048,
+                   log: Callable[[str], None] = print) -> List[BenchmarkResult]:
+    """Run the benchmark suite and return all results"""
+    results = []
+
+    def record(result: BenchmarkResult):
+        results.append(result)
+        log(f"{result.key:<50} median {result.median * 1000:9.1f} ms  "
+            f"({result.megapixels_per_second:8.1f} MP/s)")
+
+    for size in sizes:
+        pixels = size * size
+        for case in TEXTURE_CASES:
+            path = os.path.join(work_dir, f"{case.name}_{size}.png")
+            if not os.path.isfile(path):
+                generate_texture(size, case).save(path)
+
+            record(_result("pack_channels", case.name, size, None, _time(
+                lambda: ImageProcessor.pack_channels(path, path, path, path), repeat), pixels))
+
+            # The transparent-pixel flatten path only matters for images with alpha
+            if case.alpha and size <= flatten_max_size:
+                record(_result("pack_channels_flatten", case.name, size, None, _time(
+                    lambda: ImageProcessor.pack_channels(path, path, path, path, preserve_transparent=False),
+                    repeat), pixels))
+
+            record(_result("unpack_channels", case.name, size, None, _time(
+                lambda: ImageProcessor.unpack_channels(path), repeat), pixels))
+
+            channels = ImageProcessor.unpack_channels(path)
+            record(_result("gamma_correction", case.name, size, None, _time(
+                lambda: ImageProcessor._apply_gamma_correction(channels[0]), repeat), pixels))
+
+            save_dir = os.path.join(work_dir, "saved")
+            record(_result("save_channels", case.name, size, None, _time(
+                lambda: ImageProcessor.save_channels(channels, save_dir, f"{case.name}_{size}"), repeat), pixels))
+            shutil.rmtree(save_dir, ignore_errors=True)
+
+        # Bulk runs over several copies of the same texture
+        bulk_source = os.path.join(work_dir, f"{TEXTURE_CASES[0].name}_{size}.png")
+        bulk_paths = []
+        for index in range(bulk_files):
+            bulk_path = os.path.join(work_dir, "bulk", str(size), f"texture_{index:03d}.png")
+            if not os.path.isfile(bulk_path):
+                os.makedirs(os.path.dirname(bulk_path), exist_ok=True)
+                shutil.copyfile(bulk_source, bulk_path)
+            bulk_paths.append(bulk_path)
+
+        bulk_output = os.path.join(work_dir, "bulk_output")
+        for worker_count in workers:
+            model = ChannelUnpackerModel()
+            record(_result("bulk_unpack_channels", TEXTURE_CASES[0].name, size, worker_count, _time(
+                lambda: model.bulk_unpack_channels(bulk_paths, bulk_output, max_workers=worker_count), repeat),
+                pixels * bulk_files))
+            shutil.rmtree(bulk_output, ignore_errors=True)
+
+    return results
+
+
+def collect_metadata() -> Dict[str, object]:
+    """Describe the environment the benchmarks ran in"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(results: List[BenchmarkResult], output_path: str, metadata: Dict[str, object]):
+    """Write results to a JSON file"""
+    data = {
+        "version": RESULTS_VERSION,
+        "meta": metadata,
+        "results": [asdict(result) for result in results],
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, BenchmarkResult]:
+    """Load results from a JSON file, keyed by benchmark/case/size@workers"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported results version in {path}: {data.get('version')}")
+
+    results = [BenchmarkResult(**entry) for entry in data["results"]]
+    return {result.key: result for result in results}
+
+
+def compare_results(baseline: Dict[str, BenchmarkResult], current: Dict[str, BenchmarkResult],
+                    threshold: float = DEFAULT_THRESHOLD,
+                    min_delta: float = DEFAULT_MIN_DELTA) -> List[Tuple[str, Optional[float], Optional[float], str]]:
+    """
+    Compare median timings of two result sets
+    Changes smaller than min_delta seconds are treated as noise.
+    Returns rows of (key, baseline_median, current_median, status) where status is one of
+    "regression", "improvement", "ok", "missing" or "new"
+    """
+    rows = []
+    for key in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(key), current.get(key)
+        if new is None:
+            rows.append((key, old.median, None, "missing"))
+        elif old is None:
+            rows.append((key, None, new.median, "new"))
+        elif abs(new.median - old.median) < min_delta:
+            rows.append((key, old.median, new.median, "ok"))
+        elif new.median > old.median * (1 + threshold):
+            rows.append((key, old.median, new.median, "regression"))
+        elif new.median < old.median * (1 - threshold):
+            rows.append((key, old.median, new.median, "improvement"))
+        else:
+            rows.append((key, old.median, new.median, "ok"))
+    return rows
+
+
+def _format_ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def _run_command(args) -> int:
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="texture_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+    if args.profile or args.profile_dir:
+        PROFILER.configure(args.profile or PROFILER.mode, args.profile_dir)
+    try:
+        with PROFILER.profile("benchmark_run"):
+            results = run_benchmarks(args.sizes, args.workers, args.repeat, work_dir,
+                                     bulk_files=args.bulk_files, flatten_max_size=args.flatten_max_size)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    save_results(results, args.output, collect_metadata())
+    print(f"Saved {len(results)} results to {args.output}")
+    if PROFILER.enabled:
+        print(f"Profile written to: {', '.join(PROFILER.last_outputs)}")
+    return 0
+
+
+def _compare_command(args) -> int:
+    rows = compare_results(load_results(args.baseline), load_results(args.current),
+                           args.threshold, args.min_delta)
+
+    print(f"{'benchmark':<50} {'baseline ms':>12} {'current ms':>12} {'change':>8}  status")
+    for key, old, new, status in rows:
+        change = f"{(new / old - 1) * 100:+.1f}%" if old and new else "-"
+        print(f"{key:<50} {_format_ms(old):>12} {_format_ms(new):>12} {change:>8}  {status}")
+
+    regressions = [row for row in rows if row[3] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Texture processor benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks and write results JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                            help="Texture edge lengths, e.g. 1024 2048 4096 8192")
+    run_parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS,
+                            help="Worker counts for bulk_unpack_channels")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Repetitions per benchmark")
+    run_parser.add_argument("--bulk-files", type=int, default=8, help="Files per bulk run")
+    run_parser.add_argument("--flatten-max-size", type=int, default=2048,
+                            help="Largest size for the transparent-pixel flatten benchmark")
+    run_parser.add_argument("--work-dir", help="Directory for generated textures (kept between runs)")
+    run_parser.add_argument("--output", default="benchmark_results.json", help="Results JSON path")
+    run_parser.add_argument("--profile", nargs="?", const="cprofile", choices=["cprofile", "sampling"],
+                            help="Profile the whole run (default mode: cprofile)")
+    run_parser.add_argument("--profile-dir", help="Directory for profile output files")
+    run_parser.set_defaults(handler=_run_command)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline", help="Baseline results JSON")
+    compare_parser.add_argument("current", help="Current results JSON")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Relative slowdown of the median that counts as a regression")
+    compare_parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                                help="Absolute change in seconds below which results are treated as noise")
+    compare_parser.set_defaults(handler=_compare_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Bounded in-memory log with the full history on disk
+
+BulkLog keeps the most recent lines in a ring buffer for display and appends every
+line to a log file, so long bulk runs use constant memory in the UI.
+"""
+
+import os
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+
+class BulkLog:
+    """Ring buffer of log lines addressed by absolute line index"""
+
+    def __init__(self, capacity: int = 1000, path: Optional[str] = None):
+        self.capacity = capacity
+        self.path = path
+        self.total_lines = 0
+        self._lines: "deque[str]" = deque(maxlen=capacity)
+        self._file = None
+
+    @staticmethod
+    def default_path(log_dir: str, job: str = "bulk_unpack") -> str:
+        """Timestamped log file path in log_dir"""
+        return os.path.join(log_dir, f"{job}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+
+    @property
+    def first_index(self) -> int:
+        """Absolute index of the oldest line still in memory"""
+        return self.total_lines - len(self._lines)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def extend(self, lines: List[str]):
+        """Append lines to the buffer and the log file"""
+        if not lines:
+            return
+        self._lines.extend(lines)
+        self.total_lines += len(lines)
+        if self.path is None:
+            return
+        try:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+        except OSError as e:
+            print(f"Error writing log file {self.path}: {e}")
+            self.path = None
+
+    def append(self, line: str):
+        """Append one line"""
+        self.extend([line])
+
+    def lines(self, start: int, count: int) -> List[str]:
+        """Lines from absolute index start that are still in memory"""
+        offset = max(0, start - self.first_index)
+        return [self._lines[i] for i in range(offset, min(offset + count, len(self._lines)))]
+
+    def close(self):
+        """Close the log file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
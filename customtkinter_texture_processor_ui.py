@@ -121,7 +121,7 @@ class ChannelThumbnail:
 
     def update_thumbnail(self, image: Image.Image, image_path: str):
         """Update the thumbnail display"""
-        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.DROP_SIZE)
+        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.DROP_SIZE, ThumbnailCache.source_key(image_path))
         photo = ImageTk.PhotoImage(thumb)
         self.thumb_label.configure(image=photo, bg_color=None)
         self.thumb_label.image = photo
@@ -280,7 +280,7 @@ class ChannelPackerPanel(BasePanel):
 
     def _browse_file_for_channel(self, channel: str):
         """Browse for file for a specific channel"""
-        filetypes = [('PNG files', '*.png'), ('DDS files', '*.dds'), ('All files', '*.*')]
+        filetypes = [('PNG files', '*.png'), ('DDS files', '*.dds'), ('TGA files', '*.tga'), ('TIFF files', '*.tif *.tiff'), ('All files', '*.*')]
         filename = filedialog.askopenfilename(title=f'Select image file for {channel} channel', filetypes=filetypes)
         if filename:
             try:
@@ -314,8 +314,7 @@ class ChannelPreviewWidget:
 
     def update_preview(self, image: Image.Image):
         """Update the preview with channel image"""
-        rgb_image = Image.merge('RGB', (image, image, image))
-        thumb = ImageProcessor.create_thumbnail(rgb_image, ImageConfig.CHANNEL_PREVIEW_SIZE)
+        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.CHANNEL_PREVIEW_SIZE).convert('RGB')
         photo = ImageTk.PhotoImage(thumb)
         self.preview_button.configure(image=photo, bg_color=None)
         self.preview_button.image = photo
@@ -408,7 +407,7 @@ class ChannelUnpackerPanel(BasePanel):
 
     def _browse_file(self):
         """Browse for file"""
-        filetypes = [('PNG files', '*.png'), ('DDS files', '*.dds'), ('All files', '*.*')]
+        filetypes = [('PNG files', '*.png'), ('DDS files', '*.dds'), ('TGA files', '*.tga'), ('TIFF files', '*.tif *.tiff'), ('All files', '*.*')]
         filename = filedialog.askopenfilename(title='Select image file', filetypes=filetypes)
         if filename:
             try:
@@ -450,7 +449,7 @@ class ChannelUnpackerPanel(BasePanel):
 
     def on_image_loaded(self, image: Image.Image, path: str):
         """Called when image is loaded"""
-        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.PREVIEW_SIZE)
+        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.PREVIEW_SIZE, ThumbnailCache.source_key(path))
         photo = ImageTk.PhotoImage(thumb)
         self.drop_label.configure(image=photo, bg_color=None, text='')
         self.drop_label.image = photo
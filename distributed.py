@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Sharded bulk unpacking across several machines
+
+A coordinator splits the input files into shards of roughly equal estimated cost
+(from image headers, see planner.CostModel) and serves them over TCP. Workers connect,
+pull one shard at a time, run ChannelUnpackerModel.bulk_unpack_channels on it and send
+the results back. Shards of a worker that disconnects, fails or exceeds the shard
+timeout are handed to another worker, up to a maximum number of attempts. A worker
+that timed out stays connected; its late result is discarded. Workers must see the
+input and output folders under the same paths (e.g. a network share).
+
+The coordinator returns the same mapping as bulk_unpack_channels: source path to the
+saved channel files, or an error message.
+
+Messages are JSON objects, one per line:
+    worker -> coordinator  {"type": "ready", "worker": name, "token": token}
+    coordinator -> worker  {"type": "shard", "shard": id, "paths": [...], "output_dir": ..., "input_root": ...}
+    worker -> coordinator  {"type": "result", "shard": id, "results": {...}}
+                           {"type": "failed", "shard": id, "error": message}
+    coordinator -> worker  {"type": "done"} when every shard has finished
+
+Usage:
+    python distributed.py coordinator textures/ out/ --port 8766 --local-workers 4
+    python distributed.py worker coordinator-host:8766 --threads 8
+"""
+
+import argparse
+import heapq
+import hmac
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from event_bus import EventBus, EventSpec
+from planner import CostModel, probe_files
+from scanner import scan_images
+from texture_processor import ChannelUnpackerModel, ImageConfig
+
+
+@dataclass
+class Shard:
+    """A batch of files handed to one worker at a time"""
+    id: int
+    paths: List[str]
+    cost: float = 0.0
+    attempts: int = 0
+    failed_on: List[str] = field(default_factory=list)
+    last_error: Optional[str] = None
+
+
+def shard_files(paths: List[str], shard_count: int, cost_model: Optional[CostModel] = None) -> List[Shard]:
+    """Split paths into shard_count shards of balanced estimated cost (largest first, into the lightest shard)"""
+    cost_model = cost_model or CostModel()
+    shard_count = max(1, min(shard_count, len(paths)))
+    costs = []
+    for probe in probe_files(paths):
+        # Unreadable files cost little; they fail at decode
+        costs.append(cost_model.unpack_cost(probe)[0] if probe.size else probe.file_bytes / 1e6 * cost_model.decode_seconds_per_mb)
+
+    shards = [Shard(index, []) for index in range(shard_count)]
+    lanes = [(0.0, index) for index in range(shard_count)]
+    heapq.heapify(lanes)
+    for cost, path in sorted(zip(costs, paths), key=lambda item: -item[0]):
+        total, index = heapq.heappop(lanes)
+        shards[index].paths.append(path)
+        shards[index].cost += cost
+        heapq.heappush(lanes, (total + cost, index))
+    # Most expensive shards go out first
+    return sorted((shard for shard in shards if shard.paths), key=lambda shard: -shard.cost)
+
+
+def _send(stream, message: Dict[str, object]):
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def _receive(stream) -> Optional[Dict[str, object]]:
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    """Serves shards to one connected worker"""
+
+    def handle(self):
+        coordinator: Coordinator = self.server.coordinator
+        worker = f"{self.client_address[0]}:{self.client_address[1]}"
+        while True:
+            try:
+                message = _receive(self.rfile)
+            except (OSError, ValueError):
+                return
+            if message is None or message.get("type") != "ready":
+                return
+            if coordinator.token and not hmac.compare_digest(str(message.get("token") or "").encode("utf-8"),
+                                                             coordinator.token.encode("utf-8")):
+                _send(self.wfile, {"type": "error", "error": "Invalid token"})
+                return
+            worker = message.get("worker") or worker
+
+            shard = coordinator._next_shard(worker)
+            if shard is None:
+                _send(self.wfile, {"type": "done"})
+                return
+            attempt = shard.attempts
+            # Requeue on timeout but keep reading, so the worker stays connected for its next shard
+            timer = None
+            if coordinator.shard_timeout is not None:
+                timer = threading.Timer(coordinator.shard_timeout, coordinator._shard_failed,
+                                        (shard, attempt, worker, f"Timed out after {coordinator.shard_timeout}s"))
+                timer.daemon = True
+            try:
+                _send(self.wfile, {"type": "shard", "shard": shard.id, "paths": shard.paths,
+                                   "output_dir": coordinator.output_dir, "input_root": coordinator.input_root})
+                if timer:
+                    timer.start()
+                reply = _receive(self.rfile)
+            except (OSError, ValueError) as e:
+                coordinator._shard_failed(shard, attempt, worker, f"Connection lost: {e}")
+                return
+            finally:
+                if timer:
+                    timer.cancel()
+
+            if reply is None:
+                coordinator._shard_failed(shard, attempt, worker, "Connection closed")
+                return
+            if reply.get("type") == "result" and reply.get("shard") == shard.id:
+                coordinator._shard_completed(shard, attempt, worker, reply.get("results") or {})
+            else:
+                coordinator._shard_failed(shard, attempt, worker, str(reply.get("error", "Invalid reply")))
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Coordinator:
+    """Shards a bulk unpack across connected workers and collects the results"""
+
+    EVENTS = (
+        EventSpec("shard_assigned", ("shard", "worker", "files")),
+        EventSpec("shard_completed", ("shard", "worker", "files")),
+        EventSpec("shard_requeued", ("shard", "worker", "error")),
+        EventSpec("bulk_progress", ("progress", "total", "current_file"), coalesce=True),
+    )
+
+    def __init__(self, host: Optional[str] = None, port: int = ImageConfig.CLUSTER_PORT, token: Optional[str] = None,
+                 shard_timeout: Optional[float] = None, max_attempts: int = ImageConfig.CLUSTER_MAX_ATTEMPTS):
+        """host defaults to all interfaces with a token, and to localhost only without one"""
+        if host is None:
+            host = "0.0.0.0" if token else "127.0.0.1"
+        self.token = token
+        self.shard_timeout = shard_timeout
+        self.max_attempts = max_attempts
+        self.events = EventBus(self.EVENTS)
+        self.output_dir: Optional[str] = None
+        self.input_root: Optional[str] = None
+        self.results: Dict[str, object] = {}
+
+        self._pending: "deque[Shard]" = deque()
+        self._running: Dict[int, Shard] = {}
+        self._total = 0
+        self._state = "idle"  # idle until run() is called, then running, then finished
+        self._changed = threading.Condition()
+        self._server = _CoordinatorServer((host, port), _CoordinatorHandler)
+        self._server.coordinator = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def add_observer(self, observer):
+        """Add observer for shard events"""
+        self.events.subscribe(observer)
+
+    def notify_observers(self, event: str, **kwargs):
+        """Notify all observers of changes"""
+        self.events.publish(event, **kwargs)
+
+    def start(self):
+        """Start accepting worker connections"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="coordinator", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop accepting workers and release the port; connected workers receive 'done'"""
+        with self._changed:
+            self._state = "finished"
+            self._changed.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def run(self, image_paths: List[str], output_dir: str, input_root: Optional[str] = None,
+            workers: int = 1, shards_per_worker: int = ImageConfig.CLUSTER_SHARDS_PER_WORKER,
+            timeout: Optional[float] = None) -> Dict[str, object]:
+        """
+        Process image_paths on the connected workers and return results like bulk_unpack_channels
+        workers is the expected number of workers, used to size the shards
+        """
+        image_paths = list(image_paths)
+        if not image_paths:
+            raise ValueError("No image paths provided for bulk unpacking")
+        shards = shard_files(image_paths, max(1, workers) * shards_per_worker)
+        with self._changed:
+            self.output_dir = os.path.abspath(output_dir)
+            self.input_root = os.path.abspath(input_root) if input_root else None
+            self.results = {}
+            self._total = len(image_paths)
+            self._pending = deque(shards)
+            self._running = {}
+            self._state = "running"
+            self._changed.notify_all()
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self._thread is None:
+            self.start()
+
+        with self._changed:
+            if not self._changed.wait_for(lambda: not self._pending and not self._running, timeout):
+                raise TimeoutError(f"Distributed run did not finish within {timeout}s")
+            # Wake up workers waiting for requeued shards so they receive 'done'
+            self._state = "finished"
+            self._changed.notify_all()
+        return {path: self.results[path] for path in image_paths}
+
+    def _next_shard(self, worker: str) -> Optional[Shard]:
+        """Block until a shard is available for the worker; None when the run is finished"""
+        with self._changed:
+            while True:
+                if self._state == "running" and self._pending:
+                    # Prefer shards that have not already failed on this worker
+                    shard = next((shard for shard in self._pending if worker not in shard.failed_on), self._pending[0])
+                    self._pending.remove(shard)
+                    shard.attempts += 1
+                    self._running[shard.id] = shard
+                    break
+                if self._state == "finished":
+                    return None
+                self._changed.wait()
+        self.notify_observers('shard_assigned', shard=shard.id, worker=worker, files=len(shard.paths))
+        return shard
+
+    def _is_current(self, shard: Shard, attempt: int) -> bool:
+        """Whether attempt is the shard's latest assignment and still running; called with the lock held"""
+        return self._running.get(shard.id) is shard and shard.attempts == attempt
+
+    def _shard_completed(self, shard: Shard, attempt: int, worker: str, results: Dict[str, object]):
+        with self._changed:
+            if not self._is_current(shard, attempt):
+                return  # Timed out and requeued or given up on; discard the late result
+            del self._running[shard.id]
+            for path in shard.paths:
+                self.results[path] = results.get(path, f"Error processing {path}: no result from worker {worker}")
+            progress = len(self.results)
+            self._changed.notify_all()
+        self.notify_observers('shard_completed', shard=shard.id, worker=worker, files=len(shard.paths))
+        self.notify_observers('bulk_progress', progress=progress, total=self._total, current_file=shard.paths[-1])
+
+    def _shard_failed(self, shard: Shard, attempt: int, worker: str, error: str):
+        with self._changed:
+            if not self._is_current(shard, attempt):
+                return
+            del self._running[shard.id]
+            shard.failed_on.append(worker)
+            shard.last_error = error
+            if shard.attempts < self.max_attempts:
+                self._pending.append(shard)
+            else:
+                for path in shard.paths:
+                    self.results[path] = f"Error processing {path}: shard failed {shard.attempts} times, last: {error}"
+            self._changed.notify_all()
+        self.notify_observers('shard_requeued', shard=shard.id, worker=worker, error=error)
+
+
+def run_worker(address: Tuple[str, int], threads: int = 1, token: Optional[str] = None,
+               name: Optional[str] = None, connect_timeout: float = 10.0) -> int:
+    """Process shards from a coordinator until it reports completion; returns the number of shards processed"""
+    name = name or f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            connection = socket.create_connection(address)
+            break
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)  # The coordinator may still be starting
+
+    model = ChannelUnpackerModel()
+    processed = 0
+    with connection, connection.makefile("rwb") as stream:
+        while True:
+            _send(stream, {"type": "ready", "worker": name, "token": token})
+            message = _receive(stream)
+            if message is None or message.get("type") == "done":
+                return processed
+            if message.get("type") != "shard":
+                raise ValueError(f"Coordinator refused worker: {message.get('error', message)}")
+            try:
+                results = model.bulk_unpack_channels(message["paths"], message["output_dir"], max_workers=threads,
+                                                     input_root=message.get("input_root"))
+            except Exception as e:
+                _send(stream, {"type": "failed", "shard": message["shard"], "error": str(e)})
+                continue
+            _send(stream, {"type": "result", "shard": message["shard"], "results": results})
+            processed += 1
+
+
+def spawn_local_workers(address: Tuple[str, int], count: int, threads: int = 1,
+                        token: Optional[str] = None) -> List[subprocess.Popen]:
+    """Start worker processes on this machine, e.g. to test a cluster on one box"""
+    host, port = address
+    if host in ("0.0.0.0", ""):
+        host = "127.0.0.1"
+    command = [sys.executable, os.path.abspath(__file__), "worker", f"{host}:{port}", "--threads", str(threads)]
+    if token:
+        command += ["--token", token]
+    return [subprocess.Popen(command) for _ in range(count)]
+
+
+class ConsoleReporter:
+    """Prints coordinator events for the command line"""
+
+    def on_shard_assigned(self, shard: int, worker: str, files: int):
+        print(f"Shard {shard} ({files} files) -> {worker}")
+
+    def on_shard_requeued(self, shard: int, worker: str, error: str):
+        print(f"Shard {shard} failed on {worker}: {error}")
+
+    def on_bulk_progress(self, progress: int, total: int, current_file: str):
+        print(f"Processed {progress}/{total}")
+
+
+def parse_address(text: str) -> Tuple[str, int]:
+    host, _, port = text.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Expected HOST:PORT, got {text}")
+    return host, int(port)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sharded bulk unpacking across several machines")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator_parser = commands.add_parser("coordinator", help="Shard a folder across workers")
+    coordinator_parser.add_argument("input", help="Input folder (scanned recursively)")
+    coordinator_parser.add_argument("output", help="Output folder, mirroring the input tree")
+    coordinator_parser.add_argument("--host", help="Address to listen on (default: all interfaces with --token, "
+                                                   "otherwise 127.0.0.1)")
+    coordinator_parser.add_argument("--port", type=int, default=ImageConfig.CLUSTER_PORT, help="TCP port")
+    coordinator_parser.add_argument("--workers", type=int, default=1, help="Expected number of workers")
+    coordinator_parser.add_argument("--local-workers", type=int, default=0, help="Worker processes to start here")
+    coordinator_parser.add_argument("--threads", type=int, default=1, help="Threads per local worker")
+    coordinator_parser.add_argument("--shards-per-worker", type=int, default=ImageConfig.CLUSTER_SHARDS_PER_WORKER)
+    coordinator_parser.add_argument("--shard-timeout", type=float, help="Seconds before a shard is reassigned")
+    coordinator_parser.add_argument("--token", help="Shared secret workers must present")
+    coordinator_parser.add_argument("--json", help="Write the results as JSON to this path")
+
+    worker_parser = commands.add_parser("worker", help="Process shards from a coordinator")
+    worker_parser.add_argument("address", help="Coordinator HOST:PORT")
+    worker_parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="Threads per shard")
+    worker_parser.add_argument("--token", help="Shared secret of the coordinator")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        try:
+            processed = run_worker(parse_address(args.address), args.threads, args.token)
+        except (OSError, ValueError) as e:
+            print(f"Worker stopped: {e}")
+            return 1
+        print(f"Worker finished after {processed} shard(s)")
+        return 0
+
+    paths = list(scan_images(args.input))
+    if not paths:
+        print(f"No supported images found in {args.input}")
+        return 1
+    coordinator = Coordinator(args.host, args.port, args.token, args.shard_timeout)
+    coordinator.add_observer(ConsoleReporter())
+    coordinator.start()
+    processes = spawn_local_workers(coordinator.address, args.local_workers, args.threads, args.token)
+    interrupted = False
+    try:
+        results = coordinator.run(paths, args.output, args.input, max(args.workers, args.local_workers),
+                                  args.shards_per_worker)
+    except KeyboardInterrupt:
+        interrupted = True
+        return 1
+    finally:
+        coordinator.close()
+        for process in processes:
+            if interrupted:
+                process.terminate()  # Do not wait for shards in progress
+            process.wait()
+
+    errors = [result for result in results.values() if isinstance(result, str)]
+    print(f"Finished: {len(results) - len(errors)} succeeded, {len(errors)} failed")
+    for error in errors:
+        print(f"  {error}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Observer event bus with pre-bound handlers and coalesced, frame-rate delivery
+
+Observers subscribe once; their on_{event} methods are looked up when they subscribe
+(or the first time an unregistered event is published) instead of on every event.
+An observer may implement on_{event}_batch(events) to receive a list of payloads in
+one call rather than one call per event.
+
+Until attach() is called, events are delivered synchronously on the publishing
+thread, like the original notify_observers(). Once attached to a UI scheduler
+(e.g. a Tk widget's after), events published from other threads are queued and
+delivered on the attached thread at the configured frame rate. Events registered
+with coalesce=True keep only the latest payload per key within a frame.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_FRAME_RATE = 30.0
+
+
+@dataclass(frozen=True)
+class EventSpec:
+    """Declares an event's payload fields and whether it may be coalesced"""
+    name: str
+    fields: Tuple[str, ...] = ()
+    coalesce: bool = False
+    # Payload field whose value separates coalescing slots (None: one slot per event)
+    key: Optional[str] = None
+
+
+class EventBus:
+    """Thread-safe observer dispatch for models"""
+
+    def __init__(self, specs: Iterable[EventSpec] = (), frame_rate: float = DEFAULT_FRAME_RATE):
+        self.specs: Dict[str, EventSpec] = {spec.name: spec for spec in specs}
+        self.frame_rate = frame_rate
+        self.observers = []
+        self.stats = {"published": 0, "delivered": 0, "coalesced": 0}
+
+        self._bindings: Dict[str, List[Tuple[Callable, bool]]] = {}
+        self._queue: "deque[Tuple[str, Dict[str, object], Optional[tuple]]]" = deque()
+        self._lock = threading.Lock()
+        self._schedule: Optional[Callable[[int, Callable[[], None]], object]] = None
+        self._owner_thread: Optional[int] = None
+
+    def register(self, spec: EventSpec):
+        """Declare an event"""
+        self.specs[spec.name] = spec
+        self._bindings.pop(spec.name, None)
+
+    def subscribe(self, observer):
+        """Add an observer and bind its handlers for all registered events"""
+        self.observers.append(observer)
+        self._bindings = {}
+        for name in self.specs:
+            self._bind(name)
+
+    def unsubscribe(self, observer):
+        """Remove an observer"""
+        if observer in self.observers:
+            self.observers.remove(observer)
+            self._bindings = {}
+
+    def _bind(self, event: str) -> List[Tuple[Callable, bool]]:
+        """Handlers for an event as (callable, takes_batch) pairs"""
+        bindings = self._bindings.get(event)
+        if bindings is None:
+            bindings = []
+            for observer in self.observers:
+                batch_handler = getattr(observer, f'on_{event}_batch', None)
+                if batch_handler is not None:
+                    bindings.append((batch_handler, True))
+                    continue
+                handler = getattr(observer, f'on_{event}', None)
+                if handler is not None:
+                    bindings.append((handler, False))
+            self._bindings[event] = bindings
+        return bindings
+
+    @property
+    def attached(self) -> bool:
+        return self._schedule is not None
+
+    def attach(self, schedule: Callable[[int, Callable[[], None]], object]):
+        """
+        Deliver events on the calling thread, polled with schedule(delay_ms, callback)
+        schedule is only ever called from the attached thread (Tk's after qualifies).
+        """
+        self._schedule = schedule
+        self._owner_thread = threading.get_ident()
+        self._poll()
+
+    def detach(self):
+        """Deliver remaining events and return to synchronous delivery"""
+        self.flush()
+        self._schedule = None
+        self._owner_thread = None
+
+    def _poll(self):
+        if self._schedule is None:
+            return
+        self.flush()
+        try:
+            self._schedule(max(1, int(1000 / self.frame_rate)), self._poll)
+        except Exception:
+            self._schedule = None  # The UI has been destroyed
+
+    def publish(self, event: str, **kwargs):
+        """Publish an event to all observers"""
+        spec = self.specs.get(event)
+        if spec is not None and spec.fields and set(kwargs) != set(spec.fields):
+            raise TypeError(f"Event {event} expects fields {', '.join(spec.fields)}, got {', '.join(sorted(kwargs))}")
+        self.stats["published"] += 1
+
+        if self._schedule is None:
+            self._dispatch(event, [kwargs])
+            return
+
+        coalesce_key = None
+        if spec is not None and spec.coalesce:
+            coalesce_key = (event, kwargs.get(spec.key) if spec.key else None)
+        with self._lock:
+            self._queue.append((event, kwargs, coalesce_key))
+
+        # On the UI thread, non-coalesced events go out at once, after anything queued before them
+        if coalesce_key is None and threading.get_ident() == self._owner_thread:
+            self.flush()
+
+    def flush(self) -> int:
+        """Deliver all queued events on the calling thread; returns the number delivered"""
+        with self._lock:
+            items = list(self._queue)
+            self._queue.clear()
+        if not items:
+            return 0
+
+        latest: Dict[tuple, int] = {}
+        for index, (_, _, coalesce_key) in enumerate(items):
+            if coalesce_key is not None:
+                latest[coalesce_key] = index
+        pending = [(event, kwargs) for index, (event, kwargs, coalesce_key) in enumerate(items)
+                   if coalesce_key is None or latest[coalesce_key] == index]
+        self.stats["coalesced"] += len(items) - len(pending)
+
+        # Consecutive events of the same type are handed to batch handlers together
+        run_event, run = None, []
+        for event, kwargs in pending:
+            if event != run_event and run:
+                self._dispatch(run_event, run)
+                run = []
+            run_event = event
+            run.append(kwargs)
+        if run:
+            self._dispatch(run_event, run)
+        return len(pending)
+
+    def _dispatch(self, event: str, payloads: List[Dict[str, object]]):
+        for handler, takes_batch in self._bind(event):
+            if takes_batch:
+                handler(payloads)
+            else:
+                for kwargs in payloads:
+                    handler(**kwargs)
+        self.stats["delivered"] += len(payloads)
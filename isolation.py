@@ -0,0 +1,258 @@
+"""
+Crash-isolated bulk workers with per-file time and memory limits
+
+IsolatedWorkerPool unpacks files in separate worker processes. Each file gets a
+wall-clock timeout; a worker that exceeds it is killed. Each worker's address space is
+limited (RLIMIT_AS) to its size at startup plus a per-file memory limit, so a huge or
+malicious image fails with an out-of-memory error instead of taking the machine down.
+A worker that is killed, crashes or hangs is replaced with a fresh process and the
+file is reported as an error; the other workers keep going.
+
+ChannelUnpackerModel.bulk_unpack_channels uses this pool when it is given a
+file_timeout or memory_limit.
+
+Workers are started with the forkserver method (spawn where it is not available): the
+callers are multithreaded, and a worker forked directly from them could inherit a lock
+held by another thread and deadlock.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from sniffer import SniffResult
+from texture_processor import ChannelUnpackerModel
+
+
+# Exit code of a worker that ran out of memory while reporting a result
+OUT_OF_MEMORY_EXIT_CODE = 86
+
+
+class FileTimeoutError(Exception):
+    """A file took longer than the per-file timeout"""
+
+
+class WorkerCrashedError(Exception):
+    """The worker process died while processing a file"""
+
+
+def _virtual_memory_size() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _limit_address_space(memory_limit: int):
+    """Cap the process at its current size plus memory_limit bytes"""
+    try:
+        import resource
+    except ImportError:
+        return  # Not available on Windows
+    baseline = _virtual_memory_size() or 0
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = baseline + memory_limit
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _out_of_memory(error: BaseException) -> bool:
+    """Whether an error was caused by a MemoryError, possibly wrapped by the processor"""
+    while error is not None:
+        if isinstance(error, MemoryError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _run_task(model: ChannelUnpackerModel, task: tuple, memory_limit: Optional[int]) -> tuple:
+    """Unpack one file and return the reply for the parent"""
+    image_path, output_dir, input_root, sniffed = task
+    try:
+        saved_files = model.unpack_file(image_path, output_dir, input_root=input_root, sniffed=sniffed)
+        if sniffed is not None and sniffed.size:
+            pixels = sniffed.size[0] * sniffed.size[1]
+        else:
+            with Image.open(image_path) as img:
+                pixels = img.width * img.height
+        return "ok", saved_files, pixels
+    except Exception as e:
+        if _out_of_memory(e):
+            return "error", f"Out of memory (limit {memory_limit} bytes)", 0
+        return "error", str(e), 0
+
+
+def _worker_main(connection, memory_limit: Optional[int], apply_gamma_correction: bool):
+    """Worker process: unpack the files sent over connection until told to stop"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent handles Ctrl+C
+    if memory_limit:
+        _limit_address_space(memory_limit)
+    model = ChannelUnpackerModel()
+    model.apply_gamma_correction = apply_gamma_correction
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        try:
+            reply = _run_task(model, task, memory_limit)
+            connection.send(reply)
+        except MemoryError:
+            # Not even enough memory left to report the error; the parent maps the exit code
+            os._exit(OUT_OF_MEMORY_EXIT_CODE)
+
+
+def default_start_method(preload: Iterable[str] = (__name__,)) -> str:
+    """
+    Start method for worker processes of a multithreaded caller: forkserver, or spawn where
+    it is not available; preload names the modules the fork server imports once for all workers
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        multiprocessing.get_context("forkserver").set_forkserver_preload(list(preload))
+        return "forkserver"
+    return "spawn"
+
+
+class _Worker:
+    """One worker process and the file it is working on"""
+
+    def __init__(self, context, memory_limit: Optional[int], apply_gamma_correction: bool):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, daemon=True,
+                                       args=(child_connection, memory_limit, apply_gamma_correction))
+        self.process.start()
+        child_connection.close()
+        self.task: Optional[str] = None
+        self.started = 0.0
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(5.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class IsolatedWorkerPool:
+    """Process pool for bulk unpacking that survives hung and crashing workers"""
+
+    def __init__(self, workers: int = 1, file_timeout: Optional[float] = None,
+                 memory_limit: Optional[int] = None, apply_gamma_correction: bool = False,
+                 start_method: Optional[str] = None):
+        self.workers = max(1, workers)
+        self.file_timeout = file_timeout
+        self.memory_limit = memory_limit
+        self.apply_gamma_correction = apply_gamma_correction
+        self.stats = {"respawned": 0, "timeouts": 0, "crashes": 0}
+        self._context = multiprocessing.get_context(start_method or default_start_method())
+        self._pool: List[_Worker] = []
+
+    def __enter__(self) -> "IsolatedWorkerPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.memory_limit, self.apply_gamma_correction)
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.kill()
+        self.stats["respawned"] += 1
+        replacement = self._spawn()
+        self._pool[self._pool.index(worker)] = replacement
+        return replacement
+
+    def close(self):
+        """Stop all worker processes"""
+        for worker in self._pool:
+            if worker.task is None:
+                worker.stop()
+            else:
+                worker.kill()
+        self._pool = []
+
+    def unpack(self, image_paths: Iterable[str], output_dir: str, input_root: Optional[str] = None,
+               on_start=None, sniffs: Optional[Dict[str, SniffResult]] = None) -> Iterator[Tuple[str, object]]:
+        """
+        Yield (image_path, (saved_files, pixels) or exception) as files finish
+        image_paths is consumed lazily, one file per free worker. on_start(image_path) is
+        called when a file is handed to a worker. sniffs maps paths to headers the caller
+        has already read; workers then do not read them again.
+        """
+        if not self._pool:
+            self._pool = [self._spawn() for _ in range(self.workers)]
+        paths = iter(image_paths)
+        exhausted = False
+
+        while True:
+            for worker in self._pool:
+                if worker.task is None and not exhausted:
+                    image_path = next(paths, None)
+                    if image_path is None:
+                        exhausted = True
+                        break
+                    if on_start is not None:
+                        on_start(image_path)
+                    worker.task, worker.started = image_path, time.monotonic()
+                    try:
+                        sniffed = sniffs.pop(image_path, None) if sniffs is not None else None
+                        worker.connection.send((image_path, output_dir, input_root, sniffed))
+                    except (OSError, ValueError):
+                        pass  # Dead worker; picked up below through its sentinel
+
+            busy = [worker for worker in self._pool if worker.task is not None]
+            if not busy:
+                return
+
+            timeout = None
+            if self.file_timeout is not None:
+                now = time.monotonic()
+                timeout = max(0.0, min(worker.started + self.file_timeout - now for worker in busy))
+            ready = wait([worker.connection for worker in busy] + [worker.process.sentinel for worker in busy],
+                         timeout)
+
+            for worker in busy:
+                image_path = worker.task
+                outcome = None
+                if worker.connection in ready or worker.process.sentinel in ready:
+                    try:
+                        status, value, pixels = worker.connection.recv()
+                        outcome = (value, pixels) if status == "ok" else ValueError(value)
+                    except (EOFError, OSError):
+                        exit_code = worker.process.exitcode
+                        if exit_code is None:
+                            worker.process.join(1.0)
+                            exit_code = worker.process.exitcode
+                        if exit_code == OUT_OF_MEMORY_EXIT_CODE:
+                            outcome = ValueError(f"Out of memory (limit {self.memory_limit} bytes)")
+                        else:
+                            self.stats["crashes"] += 1
+                            outcome = WorkerCrashedError(f"Worker crashed (exit code {exit_code})")
+                        worker = self._replace(worker)
+                elif self.file_timeout is not None and time.monotonic() - worker.started >= self.file_timeout:
+                    self.stats["timeouts"] += 1
+                    outcome = FileTimeoutError(f"Timed out after {self.file_timeout:g}s")
+                    worker = self._replace(worker)
+                if outcome is not None:
+                    worker.task = None
+                    yield image_path, outcome
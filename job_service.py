@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Local HTTP job service for packing and unpacking
+
+One long-running process keeps Pillow and NumPy loaded and runs jobs on a persistent
+worker pool, so tools and farm machines submit JSON jobs instead of starting their
+own Python process for every texture. Paths in jobs are paths on the service host.
+
+Endpoints:
+    POST   /jobs               Submit a job; returns 202 with its id (add ?wait=1 to block until done)
+    GET    /jobs               Summaries of queued, running and recent jobs
+    GET    /jobs/<id>          Status and result of one job
+    GET    /jobs/<id>/events   Progress and result as newline-delimited JSON, streamed until the job ends
+    DELETE /jobs/<id>          Cancel a job that has not started
+    GET    /health             Liveness and queue depth, for load balancers
+    GET    /metrics            Prometheus text format
+
+Job bodies:
+    {"type": "pack", "channels": {"R": "rock_r.png", "G": "rock_g.png"}, "output": "rock.png",
+     "resize_policy": "strict", "target_size": [1024, 1024], "preserve_transparent": true}
+    {"type": "unpack", "input": "rock.png", "output_dir": "rock_channels", "gamma": false}
+    {"type": "bulk_unpack", "input_dir": "textures", "output_dir": "out", "workers": 4,
+     "include": ["*.png"], "exclude": ["cache"], "memory_budget_mb": 4096}
+    A bulk job may list "inputs": [paths] instead of an input_dir, and may set "file_timeout"
+    (seconds) and "memory_limit_mb" to run each file in a crash-isolated worker process.
+
+POST bodies must be sent as Content-Type: application/json, so web pages cannot submit
+jobs with simple cross-origin requests. Start the service with --token to also require
+a shared secret in the X-Service-Token header (all endpoints except /health). Without a
+token the service only listens on loopback addresses and rejects requests whose Host
+header names another host, so DNS-rebinding pages cannot reach it either.
+
+Usage:
+    python job_service.py --port 8765 --workers 4
+    python job_service.py --socket /tmp/texture.sock
+    python job_service.py --token s3cret
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+from scanner import scan_images
+from texture_processor import ChannelType, ChannelUnpackerModel, ImageConfig, ImageProcessor, ResizePolicy
+
+
+JOB_TYPES = ("pack", "unpack", "bulk_unpack")
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+MAX_REQUEST_BYTES = 1024 * 1024
+EVENT_HEARTBEAT_SECONDS = 15.0
+TOKEN_HEADER = "X-Service-Token"
+
+
+@dataclass
+class Job:
+    """One submitted job with its progress events"""
+    id: str
+    type: str
+    params: Dict[str, object]
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, object]] = None
+    error: Optional[str] = None
+    events: List[Dict[str, object]] = field(default_factory=list)
+    future: Optional[Future] = None
+    changed: threading.Condition = field(default_factory=threading.Condition)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def add_event(self, event: str, **kwargs):
+        """Record a progress event and wake up streaming clients"""
+        with self.changed:
+            self.events.append({"event": event, "time": time.time(), **kwargs})
+            self.changed.notify_all()
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, object]:
+        data = {
+            "id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if include_result:
+            data["params"] = self.params
+            data["result"] = self.result
+        return data
+
+
+class _BulkJobObserver:
+    """Forwards bulk model events to a job's event stream"""
+
+    def __init__(self, job: Job):
+        self.job = job
+
+    def on_bulk_progress(self, progress: int, total: Optional[int], current_file: str):
+        self.job.add_event("progress", progress=progress, total=total, file=current_file)
+
+    def on_bulk_unpack_error(self, file: str, error: str, progress: int, total: Optional[int]):
+        self.job.add_event("file_error", file=file, error=error)
+
+
+class JobService:
+    """Queue of pack/unpack jobs running on a persistent worker pool"""
+
+    def __init__(self, workers: int = ImageConfig.SERVICE_WORKERS,
+                 history: int = ImageConfig.SERVICE_JOB_HISTORY):
+        self.workers = max(1, workers)
+        self.history = history
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.started_at = time.time()
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self.durations: Dict[str, List[float]] = {job_type: [0.0, 0] for job_type in JOB_TYPES}
+        self.files_processed = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        for _ in range(self.workers):
+            self._executor.submit(Image.init)  # Start the threads and load format plugins up front
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs; with wait, let queued and running jobs finish"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def submit(self, spec: Dict[str, object]) -> Job:
+        """Validate a job description and queue it; raises ValueError for invalid jobs"""
+        if not isinstance(spec, dict):
+            raise ValueError("Job must be a JSON object")
+        job_type = spec.get("type")
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}. Use one of: {', '.join(JOB_TYPES)}")
+        params = {key: value for key, value in spec.items() if key != "type"}
+        getattr(self, f"_validate_{job_type}")(params)
+
+        job = Job(uuid.uuid4().hex[:12], job_type, params)
+        with self._lock:
+            self.jobs[job.id] = job
+            self._count(job_type, "queued")
+            self._prune()
+        job.add_event("queued")
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job; running jobs cannot be interrupted"""
+        job = self.get(job_id)
+        if job is None or job.future is None or not job.future.cancel():
+            return False
+        self._finish(job, "cancelled")
+        return True
+
+    def wait(self, job: Job, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished"""
+        with job.changed:
+            return job.changed.wait_for(lambda: job.finished, timeout)
+
+    def health(self) -> Dict[str, object]:
+        with self._lock:
+            states = [job.status for job in self.jobs.values()]
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+        }
+
+    def to_prometheus(self) -> str:
+        """Render service counters in the Prometheus text exposition format"""
+        health = self.health()
+        with self._lock:
+            counts = dict(self.counts)
+            durations = {job_type: list(values) for job_type, values in self.durations.items()}
+            files_processed = self.files_processed
+        lines = []
+
+        def metric(name: str, metric_type: str, help_text: str, samples: List[tuple]):
+            lines.append(f"# HELP texture_service_{name} {help_text}")
+            lines.append(f"# TYPE texture_service_{name} {metric_type}")
+            for suffix, labels, value in samples:
+                label_text = "{" + ",".join(labels) + "}" if labels else ""
+                lines.append(f"texture_service_{name}{suffix}{label_text} {value}")
+
+        metric("jobs_total", "counter", "Jobs by type and state reached", [
+            ("", [f'type="{job_type}"', f'status="{status}"'], count)
+            for (job_type, status), count in sorted(counts.items())
+        ])
+        metric("job_duration_seconds", "summary", "Run time of finished jobs", [
+            sample for job_type, (total, count) in durations.items() for sample in (
+                ("_sum", [f'type="{job_type}"'], f"{total:.6f}"),
+                ("_count", [f'type="{job_type}"'], count),
+            )
+        ])
+        metric("bulk_files_total", "counter", "Files processed by bulk jobs", [("", [], files_processed)])
+        metric("queue_depth", "gauge", "Jobs waiting for a worker", [("", [], health["queued"])])
+        metric("running_jobs", "gauge", "Jobs currently running", [("", [], health["running"])])
+        metric("workers", "gauge", "Size of the worker pool", [("", [], self.workers)])
+        metric("uptime_seconds", "gauge", "Seconds since the service started",
+               [("", [], f"{health['uptime_seconds']:.3f}")])
+        return "\n".join(lines) + "\n"
+
+    def _count(self, job_type: str, status: str):
+        self.counts[(job_type, status)] = self.counts.get((job_type, status), 0) + 1
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond the history limit"""
+        excess = len(self.jobs) - self.history
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished][:max(0, excess)]:
+            del self.jobs[job_id]
+
+    def _finish(self, job: Job, status: str, result: Optional[Dict[str, object]] = None,
+                error: Optional[str] = None):
+        with job.changed:
+            job.status, job.result, job.error = status, result, error
+            job.finished_at = time.time()
+            job.events.append({"event": status, "time": job.finished_at, "result": result, "error": error})
+            job.changed.notify_all()
+        with self._lock:
+            self._count(job.type, status)
+            if job.started_at is not None:
+                self.durations[job.type][0] += job.finished_at - job.started_at
+                self.durations[job.type][1] += 1
+
+    def _run(self, job: Job):
+        job.started_at = time.time()
+        job.status = "running"
+        job.add_event("running")
+        try:
+            result = getattr(self, f"_run_{job.type}")(job)
+        except Exception as e:
+            self._finish(job, "failed", error=str(e))
+            return
+        self._finish(job, "done", result)
+
+    @staticmethod
+    def _require(params: Dict[str, object], *keys: str):
+        for key in keys:
+            if not isinstance(params.get(key), str) or not params[key]:
+                raise ValueError(f"Missing or invalid '{key}'")
+
+    def _validate_pack(self, params: Dict[str, object]):
+        self._require(params, "output")
+        channels = params.get("channels")
+        if not isinstance(channels, dict) or not channels:
+            raise ValueError("'channels' must map channel letters (R, G, B, A) to paths")
+        valid = {channel.value for channel in ChannelType}
+        unknown = set(channels) - valid
+        if unknown:
+            raise ValueError(f"Unknown channels: {', '.join(sorted(unknown))}")
+        ResizePolicy(params.get("resize_policy", ImageConfig.DEFAULT_RESIZE_POLICY.value))
+
+    def _validate_unpack(self, params: Dict[str, object]):
+        self._require(params, "input", "output_dir")
+
+    def _validate_bulk_unpack(self, params: Dict[str, object]):
+        self._require(params, "output_dir")
+        if "input_dir" in params:
+            self._require(params, "input_dir")
+        elif not isinstance(params.get("inputs"), list) or not params["inputs"]:
+            raise ValueError("Provide 'input_dir' or a non-empty 'inputs' list")
+
+    def _run_pack(self, job: Job) -> Dict[str, object]:
+        params = job.params
+        channels = params["channels"]
+        target_size = params.get("target_size")
+        image = ImageProcessor.pack_channels(
+            channels.get("R"), channels.get("G"), channels.get("B"), channels.get("A"),
+            params.get("preserve_transparent", True),
+            ResizePolicy(params.get("resize_policy", ImageConfig.DEFAULT_RESIZE_POLICY.value)),
+            tuple(target_size) if target_size else None
+        )
+        output = params["output"]
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        nbytes = ImageProcessor.save_image(image, output)
+        return {"output": output, "size": list(image.size), "bytes": nbytes}
+
+    def _run_unpack(self, job: Job) -> Dict[str, object]:
+        params = job.params
+        if not ImageProcessor.validate_image_format(params["input"]):
+            raise ValueError(f"Unsupported image format: {params['input']}")
+        channels = ImageProcessor.unpack_channels(params["input"], bool(params.get("gamma", False)))
+        files = ImageProcessor.save_channels(channels, params["output_dir"], Path(params["input"]).stem)
+        return {"files": files}
+
+    def _run_bulk_unpack(self, job: Job) -> Dict[str, object]:
+        params = job.params
+        model = ChannelUnpackerModel()
+        model.apply_gamma_correction = bool(params.get("gamma", False))
+        model.add_observer(_BulkJobObserver(job))
+        input_dir = params.get("input_dir")
+        if input_dir:
+            inputs = scan_images(input_dir, params.get("include"), params.get("exclude", ()))
+        else:
+            inputs = list(params["inputs"])
+        budget_mb = params.get("memory_budget_mb")
+        limit_mb = params.get("memory_limit_mb")
+        timeout = params.get("file_timeout")
+        results = model.bulk_unpack_channels(inputs, params["output_dir"],
+                                             max_workers=int(params.get("workers", 1)), input_root=input_dir,
+                                             memory_budget=int(budget_mb * 1024 * 1024) if budget_mb else None,
+                                             file_timeout=float(timeout) if timeout else None,
+                                             memory_limit=int(limit_mb * 1024 * 1024) if limit_mb else None)
+        with self._lock:
+            self.files_processed += len(results)
+        errors = {path: result for path, result in results.items() if isinstance(result, str)}
+        return {"results": results, "files": len(results), "errors": len(errors)}
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """Maps HTTP requests onto the server's JobService"""
+
+    server_version = "TextureJobService/1.0"
+
+    @property
+    def service(self) -> JobService:
+        return self.server.service
+
+    def address_string(self) -> str:
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if not getattr(self.server, "quiet", False):
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, data: object):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status: int, text: str, content_type: str = "text/plain; version=0.0.4"):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _host_allowed(self) -> bool:
+        """Without a token, only accept Host headers naming this machine's loopback or bound address"""
+        if not isinstance(self.server, JobHTTPServer):
+            return True  # Unix sockets cannot be reached from a browser
+        host = self.headers.get("Host", "").strip().lower()
+        if host.startswith("["):
+            host = host[1:].partition("]")[0]
+        elif host.count(":") == 1:
+            host = host.partition(":")[0]
+        return host in ("localhost", "127.0.0.1", "::1", str(self.server.server_address[0]).lower())
+
+    def _authorized(self) -> bool:
+        """Check the shared token, if the server has one; /health stays open for load balancers"""
+        token = getattr(self.server, "token", None)
+        if not token and not self._host_allowed():
+            self._send_json(403, {"error": "Host header does not name this service"})
+            return False
+        if not token or urlparse(self.path).path.rstrip("/") == "/health":
+            return True
+        if hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode("utf-8"), token.encode("utf-8")):
+            return True
+        self._send_json(401, {"error": f"Missing or wrong {TOKEN_HEADER} header"})
+        return False
+
+    def _route(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        url = urlparse(self.path)
+        return [part for part in url.path.split("/") if part], parse_qs(url.query)
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parts, _ = self._route()
+        if parts == ["health"]:
+            self._send_json(200, self.service.health())
+        elif parts == ["metrics"]:
+            self._send_text(200, self.service.to_prometheus())
+        elif parts == ["jobs"]:
+            self._send_json(200, {"jobs": [job.to_dict(include_result=False) for job in self.service.list_jobs()]})
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.service.get(parts[1])
+            if job is None:
+                self._send_json(404, {"error": f"No job {parts[1]}"})
+            elif len(parts) == 2:
+                self._send_json(200, job.to_dict())
+            elif parts[2] == "events":
+                self._stream_events(job)
+            else:
+                self._send_json(404, {"error": "Not found"})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        parts, query = self._route()
+        if parts != ["jobs"]:
+            self._send_json(404, {"error": "Not found"})
+            return
+        # Browsers can send text/plain and form posts cross-origin without a preflight; JSON cannot
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            self._send_json(415, {"error": "Content-Type must be application/json"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            self._send_json(400, {"error": "Request body missing or too large"})
+            return
+        try:
+            job = self.service.submit(json.loads(self.rfile.read(length)))
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if query.get("wait", ["0"])[0] not in ("0", "false", ""):
+            self.service.wait(job)
+            self._send_json(200 if job.status == "done" else 500, job.to_dict())
+            return
+        self._send_json(202, {"id": job.id, "status": job.status, "url": f"/jobs/{job.id}"})
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send_json(404, {"error": "Not found"})
+        elif self.service.get(parts[1]) is None:
+            self._send_json(404, {"error": f"No job {parts[1]}"})
+        elif self.service.cancel(parts[1]):
+            self._send_json(200, {"id": parts[1], "status": "cancelled"})
+        else:
+            self._send_json(409, {"error": "Job has already started"})
+
+    def _stream_events(self, job: Job):
+        """Send the job's events as newline-delimited JSON until it has finished"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        sent = 0
+        while True:
+            with job.changed:
+                job.changed.wait_for(lambda: len(job.events) > sent or job.finished, EVENT_HEARTBEAT_SECONDS)
+                events = job.events[sent:]
+                finished = job.finished
+            sent += len(events)
+            lines = [json.dumps(event) for event in events] or [json.dumps({"event": "heartbeat"})]
+            try:
+                self.wfile.write(("\n".join(lines) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                return  # Client went away
+            if finished and sent == len(job.events):
+                return
+
+
+class JobHTTPServer(ThreadingHTTPServer):
+    """HTTP server on a TCP port"""
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: JobService, quiet: bool = False,
+                 token: Optional[str] = None):
+        super().__init__(address, JobRequestHandler)
+        self.service = service
+        self.quiet = quiet
+        self.token = token
+
+
+class JobUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server on a Unix domain socket"""
+    daemon_threads = True
+
+    def __init__(self, path: str, service: JobService, quiet: bool = False, token: Optional[str] = None):
+        if os.path.exists(path):
+            os.unlink(path)  # Left behind by a previous run
+        super().__init__(path, JobRequestHandler)
+        self.service = service
+        self.quiet = quiet
+        self.token = token
+
+
+def _is_loopback(host: str) -> bool:
+    """Whether host only accepts connections from this machine"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def create_server(service: JobService, host: str = ImageConfig.SERVICE_HOST, port: int = ImageConfig.SERVICE_PORT,
+                  socket_path: Optional[str] = None, quiet: bool = False, token: Optional[str] = None):
+    """
+    HTTP server for the service, on a Unix socket if socket_path is given
+    With a token, every request except /health must send it in the X-Service-Token header;
+    without one, only loopback hosts are allowed.
+    """
+    if not socket_path and not token and not _is_loopback(host):
+        raise ValueError(f"Listening on {host} requires a token")
+    if socket_path:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise ValueError("Unix sockets are not supported on this platform")
+        return JobUnixServer(socket_path, service, quiet, token)
+    return JobHTTPServer((host, port), service, quiet, token)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP job service for texture packing and unpacking")
+    parser.add_argument("--host", default=ImageConfig.SERVICE_HOST,
+                        help="Address to listen on; non-loopback addresses require --token")
+    parser.add_argument("--port", type=int, default=ImageConfig.SERVICE_PORT, help="TCP port")
+    parser.add_argument("--socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=ImageConfig.SERVICE_WORKERS, help="Worker threads")
+    parser.add_argument("--quiet", action="store_true", help="Do not log requests")
+    parser.add_argument("--token", default=os.environ.get("TEXTURE_SERVICE_TOKEN"),
+                        help=f"Shared secret clients must send in the {TOKEN_HEADER} header "
+                             "(default: $TEXTURE_SERVICE_TOKEN)")
+    args = parser.parse_args(argv)
+
+    service = JobService(args.workers)
+    try:
+        server = create_server(service, args.host, args.port, args.socket, args.quiet, args.token)
+    except (OSError, ValueError) as e:
+        print(f"Cannot start service: {e}")
+        service.shutdown(wait=False)
+        return 1
+    where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"Texture job service on {where} with {service.workers} workers, press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
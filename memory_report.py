@@ -0,0 +1,283 @@
+"""
+Memory accounting for models, caches and previews
+
+Objects that hold image data expose memory_usage(), returning the buffers held by
+each of their fields. build_report() turns a set of named sources into a MemoryReport
+with the bytes per field; a buffer held by several fields is counted once in the total
+and reported as shared for every later holder.
+
+MEMORY_TRACKER measures the peak memory of individual operations (wrap them with
+@memory_tracked or MEMORY_TRACKER.measure()). It is off by default; set the
+TEXTURE_MEMORY_TRACE environment variable or call MEMORY_TRACKER.enable(). Pillow
+allocates pixel buffers outside the Python allocator, so tracemalloc only sees the
+Python side; the resident set size is sampled during the operation to catch the rest.
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+
+RSS_SAMPLE_INTERVAL = 0.005
+MAX_RECORDED_PEAKS = 200
+
+# Bytes per pixel of Pillow's internal storage; multi-band modes are padded to 4 bytes
+_PIXEL_SIZES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16L": 2, "I;16B": 2, "I;16N": 2}
+
+
+def pixel_size(mode: str) -> int:
+    """Bytes per pixel Pillow allocates for an image mode"""
+    return _PIXEL_SIZES.get(mode, 4)
+
+
+def image_nbytes(image: Image.Image) -> int:
+    """Bytes of pixel data held by a PIL image (0 while a lazily opened file is not loaded)"""
+    if getattr(image, "tile", None):
+        return 0
+    return image.width * image.height * pixel_size(image.mode)
+
+
+def buffer_nbytes(buffer) -> int:
+    """Bytes held by a PIL image or a Tk photo image"""
+    if isinstance(buffer, Image.Image):
+        return image_nbytes(buffer)
+    if callable(getattr(buffer, "width", None)) and callable(getattr(buffer, "height", None)):
+        return buffer.width() * buffer.height() * 4  # Tk photos store 32-bit pixels
+    return 0
+
+
+def format_bytes(nbytes: float) -> str:
+    """Human readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(nbytes) < 1024 or unit == "GB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+
+def current_rss() -> Optional[int]:
+    """Current resident set size of the process in bytes, if it can be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of the process in bytes, if available"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class MemoryEntry:
+    """Bytes held by one field of one owner"""
+    owner: str
+    field: str
+    buffers: int
+    nbytes: int
+    shared_nbytes: int = 0
+
+
+@dataclass
+class MemoryReport:
+    """Memory held by each field of the reported sources"""
+    entries: List[MemoryEntry]
+    total_bytes: int
+    rss_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+
+    def by_owner(self) -> Dict[str, int]:
+        """Unshared bytes per owner"""
+        totals: Dict[str, int] = {}
+        for entry in self.entries:
+            totals[entry.owner] = totals.get(entry.owner, 0) + entry.nbytes - entry.shared_nbytes
+        return totals
+
+    def format(self) -> str:
+        """Plain text table of the report"""
+        lines = [f"{'Owner':<28} {'Field':<26} {'Buffers':>7} {'Size':>10} {'Shared':>10}"]
+        for entry in self.entries:
+            shared = format_bytes(entry.shared_nbytes) if entry.shared_nbytes else ""
+            lines.append(f"{entry.owner:<28} {entry.field:<26} {entry.buffers:>7} "
+                         f"{format_bytes(entry.nbytes):>10} {shared:>10}")
+        lines.append(f"Total image memory: {format_bytes(self.total_bytes)}")
+        if self.rss_bytes is not None:
+            lines.append(f"Process RSS: {format_bytes(self.rss_bytes)}")
+        if self.peak_rss_bytes is not None:
+            lines.append(f"Peak RSS: {format_bytes(self.peak_rss_bytes)}")
+        return "\n".join(lines)
+
+
+def build_report(sources: Dict[str, object]) -> MemoryReport:
+    """Build a report from named objects implementing memory_usage()"""
+    entries = []
+    seen = set()
+    total = 0
+    for owner, source in sources.items():
+        for field_name, buffers in source.memory_usage().items():
+            nbytes = shared = 0
+            for buffer in buffers:
+                size = buffer_nbytes(buffer)
+                nbytes += size
+                if id(buffer) in seen:
+                    shared += size
+                else:
+                    seen.add(id(buffer))
+                    total += size
+            entries.append(MemoryEntry(owner, field_name, len(buffers), nbytes, shared))
+    return MemoryReport(entries, total, current_rss(), peak_rss())
+
+
+@dataclass
+class MemoryPeak:
+    """Peak memory measured for one operation"""
+    action: str
+    seconds: float
+    python_peak_bytes: int
+    rss_start_bytes: Optional[int] = None
+    rss_peak_bytes: Optional[int] = None
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def rss_growth_bytes(self) -> Optional[int]:
+        """Peak RSS above the level at the start of the operation"""
+        if self.rss_start_bytes is None or self.rss_peak_bytes is None:
+            return None
+        return self.rss_peak_bytes - self.rss_start_bytes
+
+
+class _RssSampler:
+    """Polls the resident set size in a background thread and keeps the maximum"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_rss = current_rss()
+        self.peak = self.start_rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        if self.start_rss is not None:
+            self._thread.start()
+
+    def stop(self):
+        if self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+        self._sample()
+
+
+class MemoryTracker:
+    """Optional per-operation peak memory measurement"""
+
+    def __init__(self, max_peaks: int = MAX_RECORDED_PEAKS):
+        self.enabled = False
+        self.peaks: "deque[MemoryPeak]" = deque(maxlen=max_peaks)
+        self.observers = []
+        self._active = False
+        self._lock = threading.Lock()
+
+    def add_observer(self, observer):
+        """Add observer notified with 'memory_peak' after each measured operation"""
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """Remove a previously added observer"""
+        if observer in self.observers:
+            self.observers.remove(observer)
+
+    def notify_observers(self, event: str, **kwargs):
+        """Notify all observers of changes"""
+        for observer in self.observers:
+            if hasattr(observer, f'on_{event}'):
+                getattr(observer, f'on_{event}')(**kwargs)
+
+    def enable(self):
+        """Start measuring tracked operations"""
+        self.enabled = True
+
+    def disable(self):
+        """Stop measuring tracked operations"""
+        self.enabled = False
+
+    @contextmanager
+    def measure(self, action: str):
+        """Measure the enclosed block if enabled; nested operations are not measured separately"""
+        with self._lock:
+            run = self.enabled and not self._active
+            if run:
+                self._active = True
+        if not run:
+            yield
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        sampler = _RssSampler()
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+            python_peak = tracemalloc.get_traced_memory()[1] - baseline
+            if started_tracing:
+                tracemalloc.stop()
+            peak = MemoryPeak(action, elapsed, max(python_peak, 0), sampler.start_rss, sampler.peak)
+            self.peaks.append(peak)
+            with self._lock:
+                self._active = False
+            self.notify_observers('memory_peak', peak=peak)
+
+    def latest(self, action: str) -> Optional[MemoryPeak]:
+        """Most recent measurement for an action"""
+        for peak in reversed(self.peaks):
+            if peak.action == action:
+                return peak
+        return None
+
+
+MEMORY_TRACKER = MemoryTracker()
+
+if os.environ.get("TEXTURE_MEMORY_TRACE"):
+    MEMORY_TRACKER.enable()
+
+
+def memory_tracked(action: str):
+    """Decorator measuring the peak memory of every call when the tracker is enabled"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not MEMORY_TRACKER.enabled:
+                return function(*args, **kwargs)
+            with MEMORY_TRACKER.measure(action):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,225 @@
+"""
+Throughput and latency metrics for bulk runs
+
+BulkMetricsCollector is passed to ChannelUnpackerModel.bulk_unpack_channels and records
+one entry per file. snapshot() gives the live rates shown while a run is in progress.
+When given an output directory it writes a Prometheus text-format
+file (for the node exporter textfile collector) and a JSON summary at the end of the
+run and periodically while it is in progress.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+
+@dataclass
+class FileMetric:
+    """Measurements for one processed file"""
+    path: str
+    seconds: float
+    bytes_read: int = 0
+    bytes_written: int = 0
+    pixels: int = 0
+    error: Optional[str] = None
+    finished_at: float = 0.0
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(max(1, math.ceil(fraction * len(sorted_values))), len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+class BulkMetricsCollector:
+    """Thread-safe collector of per-file metrics for a bulk run"""
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, output_dir: Optional[str] = None, job: str = "bulk_unpack",
+                 flush_interval: float = 10.0, top_n: int = 10):
+        self.output_dir = output_dir
+        self.job = job
+        self.flush_interval = flush_interval
+        self.top_n = top_n
+
+        self.files: List[FileMetric] = []
+        self.total: Optional[int] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.active = 0
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def prometheus_path(self) -> Optional[str]:
+        return os.path.join(self.output_dir, f"texture_{self.job}.prom") if self.output_dir else None
+
+    @property
+    def summary_path(self) -> Optional[str]:
+        return os.path.join(self.output_dir, f"texture_{self.job}_summary.json") if self.output_dir else None
+
+    def start_run(self, total: Optional[int] = None):
+        """Reset the collector for a new run"""
+        with self._lock:
+            self.files = []
+            self.total = total
+            self.started_at = time.time()
+            self.finished_at = None
+            self.active = 0
+            self._last_flush = time.monotonic()
+    
+    def file_started(self):
+        """Count a file as in progress until it is recorded"""
+        with self._lock:
+            self.active += 1
+
+    def record_file(self, path: str, seconds: float, bytes_read: int = 0, bytes_written: int = 0,
+                    pixels: int = 0, error: Optional[str] = None):
+        """Record one finished file; may flush output files if the flush interval elapsed"""
+        with self._lock:
+            self.files.append(FileMetric(path, seconds, bytes_read, bytes_written, pixels, error, time.time()))
+            self.active = max(0, self.active - 1)
+            due = self.output_dir is not None and time.monotonic() - self._last_flush >= self.flush_interval
+            if due:
+                self._last_flush = time.monotonic()
+        if due:
+            self.write()
+
+    def finish_run(self):
+        """Mark the run as finished and write final output files"""
+        with self._lock:
+            self.finished_at = time.time()
+        if self.output_dir is not None:
+            self.write()
+
+    def summary(self) -> Dict[str, object]:
+        """Aggregate metrics for the run so far"""
+        with self._lock:
+            files = list(self.files)
+            started_at, finished_at, total = self.started_at, self.finished_at, self.total
+
+        end = finished_at or time.time()
+        elapsed = max(end - started_at, 1e-9) if started_at else 0.0
+        latencies = sorted(f.seconds for f in files)
+        errors = sum(1 for f in files if f.error is not None)
+        pixels = sum(f.pixels for f in files)
+        slowest = sorted(files, key=lambda f: f.seconds, reverse=True)[:self.top_n]
+
+        return {
+            "job": self.job,
+            "running": finished_at is None,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "elapsed_seconds": elapsed,
+            "total_files": total,
+            "processed_files": len(files),
+            "successful_files": len(files) - errors,
+            "error_files": errors,
+            "bytes_read": sum(f.bytes_read for f in files),
+            "bytes_written": sum(f.bytes_written for f in files),
+            "pixels": pixels,
+            "images_per_second": len(files) / elapsed if elapsed else 0.0,
+            "megapixels_per_second": pixels / 1e6 / elapsed if elapsed else 0.0,
+            "latency_seconds": {
+                f"p{int(q * 100)}": percentile(latencies, q) for q in self.QUANTILES
+            },
+            "latency_sum_seconds": sum(latencies),
+            "slowest_files": [asdict(f) for f in slowest],
+        }
+
+    def snapshot(self, window: float = 5.0) -> Dict[str, object]:
+        """Live progress: rates over the last window seconds, ETA, active workers and error rate"""
+        with self._lock:
+            processed = len(self.files)
+            errors = sum(1 for f in self.files if f.error is not None)
+            started_at, finished_at, total, active = self.started_at, self.finished_at, self.total, self.active
+            now = finished_at or time.time()
+            # Files are appended in completion order, so the window is a suffix of the list
+            recent = []
+            for f in reversed(self.files):
+                if f.finished_at < now - window:
+                    break
+                recent.append(f)
+
+        elapsed = now - started_at if started_at else 0.0
+        span = min(window, elapsed) if elapsed else 0.0
+        files_per_second = len(recent) / span if span else 0.0
+        bytes_per_second = sum(f.bytes_read for f in recent) / span if span else 0.0
+        remaining = total - processed if total is not None else None
+        eta = remaining / files_per_second if remaining is not None and files_per_second else None
+        return {
+            "processed_files": processed,
+            "total_files": total,
+            "error_files": errors,
+            "error_rate": errors / processed if processed else 0.0,
+            "active_workers": active,
+            "files_per_second": files_per_second,
+            "megabytes_per_second": bytes_per_second / 1e6,
+            "eta_seconds": 0.0 if remaining == 0 else eta,
+            "elapsed_seconds": elapsed,
+            "running": finished_at is None,
+        }
+    
+    def to_prometheus(self, summary: Optional[Dict[str, object]] = None) -> str:
+        """Render the summary in the Prometheus text exposition format"""
+        summary = summary or self.summary()
+        label = f'job="{self.job}"'
+        lines = []
+
+        def metric(name: str, metric_type: str, help_text: str, samples: List[tuple]):
+            lines.append(f"# HELP texture_bulk_{name} {help_text}")
+            lines.append(f"# TYPE texture_bulk_{name} {metric_type}")
+            for suffix, extra_labels, value in samples:
+                labels = ",".join([label] + extra_labels)
+                lines.append(f"texture_bulk_{name}{suffix}{{{labels}}} {value}")
+
+        metric("files_total", "counter", "Files processed in the bulk run", [
+            ("", ['status="success"'], summary["successful_files"]),
+            ("", ['status="error"'], summary["error_files"]),
+        ])
+        metric("files_expected", "gauge", "Files queued for the bulk run, -1 if unknown",
+               [("", [], summary["total_files"] if summary["total_files"] is not None else -1)])
+        metric("bytes_read_total", "counter", "Bytes of source images read", [("", [], summary["bytes_read"])])
+        metric("bytes_written_total", "counter", "Bytes of output images written",
+               [("", [], summary["bytes_written"])])
+        metric("pixels_total", "counter", "Source pixels processed", [("", [], summary["pixels"])])
+        metric("images_per_second", "gauge", "Average image throughput",
+               [("", [], f"{summary['images_per_second']:.6f}")])
+        metric("megapixels_per_second", "gauge", "Average pixel throughput",
+               [("", [], f"{summary['megapixels_per_second']:.6f}")])
+        metric("file_latency_seconds", "summary", "Per-file processing latency", [
+            ("", [f'quantile="{q}"'], f"{summary['latency_seconds'][f'p{int(q * 100)}']:.6f}")
+            for q in self.QUANTILES
+        ] + [
+            ("_sum", [], f"{summary['latency_sum_seconds']:.6f}"),
+            ("_count", [], summary["processed_files"]),
+        ])
+        metric("elapsed_seconds", "gauge", "Wall-clock time since the run started",
+               [("", [], f"{summary['elapsed_seconds']:.3f}")])
+        metric("running", "gauge", "1 while the run is in progress", [("", [], int(summary["running"]))])
+        metric("active_workers", "gauge", "Files currently being processed", [("", [], self.active)])
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Write the Prometheus file and JSON summary atomically"""
+        if self.output_dir is None:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        summary = self.summary()
+        self._write_atomic(self.prometheus_path, self.to_prometheus(summary))
+        self._write_atomic(self.summary_path, json.dumps(summary, indent=2))
+
+    @staticmethod
+    def _write_atomic(path: str, content: str):
+        """Write via a temporary file so readers never see partial content"""
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, path)
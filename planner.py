@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Dry-run planner for bulk pack and unpack jobs
+
+Probes image headers in parallel (no pixel data is decoded), runs the same checks as
+the real job (supported format, readable file, matching sizes within a channel set)
+and estimates each file's time and peak memory from its pixel count and bit depth.
+Valid tasks are scheduled longest-first onto the worker count to give a total time
+and peak-memory estimate.
+
+Usage:
+    python planner.py unpack textures/ --workers 4
+    python planner.py unpack textures/ --include "*.png" --exclude "cache;renders/*"
+    python planner.py pack textures/ --policy match_largest --json plan.json
+    python planner.py unpack textures/ --benchmark benchmark_results.json
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from texture_processor import ImageConfig, ImageProcessor, ChannelType, ResizePolicy
+from memory_report import pixel_size, format_bytes
+from scanner import parse_patterns, scan_images
+from sniffer import SniffResult, sniff_file
+
+
+PROBE_WORKERS = 16
+
+# Bits per channel and channel count of Pillow modes; anything else is treated as 8-bit RGBA
+_MODE_LAYOUT = {
+    "1": (1, 1), "L": (8, 1), "P": (8, 1), "LA": (8, 2), "La": (8, 2), "PA": (8, 2),
+    "RGB": (8, 3), "RGBA": (8, 4), "RGBa": (8, 4), "CMYK": (8, 4), "YCbCr": (8, 3),
+    "I;16": (16, 1), "I;16L": (16, 1), "I;16B": (16, 1), "I;16N": (16, 1), "I": (32, 1), "F": (32, 1),
+}
+
+
+@dataclass
+class FileProbe:
+    """Header information of one input file"""
+    path: str
+    file_bytes: int = 0
+    format: Optional[str] = None
+    mode: Optional[str] = None
+    size: Optional[Tuple[int, int]] = None
+    error: Optional[str] = None
+
+    @property
+    def pixels(self) -> int:
+        return self.size[0] * self.size[1] if self.size else 0
+
+    @property
+    def raw_bytes(self) -> int:
+        """Size of the decoded pixel data as stored in the file"""
+        bits, channels = _MODE_LAYOUT.get(self.mode, (8, 4))
+        return self.pixels * bits * channels // 8
+
+
+def probe_file(path: str, sniffed: Optional[SniffResult] = None) -> FileProbe:
+    """Read the header of one image without decoding pixels; reuses sniffed if the caller has it"""
+    sniffed = sniffed or sniff_file(path)
+    probe = FileProbe(path, sniffed.file_bytes, sniffed.format, sniffed.mode, sniffed.size, sniffed.error)
+    if probe.error or (probe.mode and probe.size):
+        return probe
+    try:
+        # Recognized but not fully parsed by the sniffer, e.g. BigTIFF
+        with Image.open(path) as img:
+            probe.format, probe.mode, probe.size = img.format, img.mode, img.size
+    except Exception as e:
+        probe.error = f"Cannot open image {path}: {e}"
+    return probe
+
+
+def probe_files(paths: List[str], max_workers: int = PROBE_WORKERS) -> List[FileProbe]:
+    """Probe headers in parallel, returning probes in input order"""
+    if len(paths) <= 1 or max_workers <= 1:
+        return [probe_file(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(probe_file, paths))
+
+
+@dataclass
+class CostModel:
+    """Per-file time and memory estimates; time scales with raw bytes and pixel count"""
+    decode_seconds_per_mb: float = 0.0125
+    unpack_seconds_per_mp: float = 0.35       # RGBA conversion, split and four PNG encodes
+    gamma_seconds_per_mp: float = 0.1
+    pack_input_seconds_per_mp: float = 0.045  # Per input: conversion, plane extraction
+    pack_output_seconds_per_mp: float = 0.02  # Merge and bit depth conversion
+    flatten_seconds_per_mp: float = 0.3       # Per-pixel transparency flatten loop
+    resize_seconds_per_mp: float = 0.01
+
+    @classmethod
+    def from_benchmark(cls, path: str) -> "CostModel":
+        """Scale the default coefficients to match the machine that produced benchmark results"""
+        from benchmark import TEXTURE_CASES, load_results
+
+        model = cls()
+        results = load_results(path)
+        cases = {case.name: case for case in TEXTURE_CASES}
+        unpack_ratios, pack_ratios = [], []
+        for result in results.values():
+            case = cases.get(result.case)
+            if case is None or result.workers is not None:
+                continue
+            probe = FileProbe("", size=(result.size, result.size),
+                              mode="I;16" if case.bit_depth == 16 else ("RGBA" if case.alpha else "RGB"))
+            if result.benchmark == "unpack_channels":
+                save = results.get(f"save_channels/{result.case}/{result.size}")
+                if save is not None:
+                    unpack_ratios.append((result.median + save.median) / model.unpack_cost(probe)[0])
+            elif result.benchmark == "pack_channels":
+                pack_ratios.append(result.median / model.pack_cost([probe] * 4, probe.size)[0])
+
+        if unpack_ratios:
+            scale = sorted(unpack_ratios)[len(unpack_ratios) // 2]
+            model.decode_seconds_per_mb *= scale
+            model.unpack_seconds_per_mp *= scale
+            model.gamma_seconds_per_mp *= scale
+        if pack_ratios:
+            scale = sorted(pack_ratios)[len(pack_ratios) // 2]
+            model.pack_input_seconds_per_mp *= scale
+            model.pack_output_seconds_per_mp *= scale
+            model.flatten_seconds_per_mp *= scale
+            model.resize_seconds_per_mp *= scale
+        return model
+
+    def unpack_cost(self, probe: FileProbe, apply_gamma_correction: bool = False) -> Tuple[float, int]:
+        """(seconds, peak bytes) to unpack one file"""
+        megapixels = probe.pixels / 1e6
+        seconds = probe.raw_bytes / 1e6 * self.decode_seconds_per_mb + megapixels * self.unpack_seconds_per_mp
+        if apply_gamma_correction:
+            seconds += megapixels * self.gamma_seconds_per_mp
+        # Decoded source, RGBA copy, four planes and an encode buffer
+        peak = probe.pixels * (pixel_size(probe.mode or "RGBA") + 4 + 4 + 1)
+        return seconds, peak
+
+    def pack_cost(self, probes: List[FileProbe], size: Tuple[int, int],
+                  preserve_transparent: bool = True) -> Tuple[float, int]:
+        """(seconds, peak bytes) to pack one channel set into an image of the given size"""
+        output_pixels = size[0] * size[1]
+        seconds = output_pixels / 1e6 * self.pack_output_seconds_per_mp
+        transient = 0
+        for probe in probes:
+            megapixels = probe.pixels / 1e6
+            seconds += probe.raw_bytes / 1e6 * self.decode_seconds_per_mb + megapixels * self.pack_input_seconds_per_mp
+            if not preserve_transparent:
+                seconds += megapixels * self.flatten_seconds_per_mp
+            if probe.size != tuple(size):
+                seconds += output_pixels / 1e6 * self.resize_seconds_per_mp
+            # Decoded input, its RGBA copy and the extracted plane
+            transient = max(transient, probe.pixels * (pixel_size(probe.mode or "RGBA") + 4 + 1))
+        # Four output planes, the merged RGBA image and the bit depth conversion
+        return seconds, transient + output_pixels * (4 + 4 + 4)
+
+
+@dataclass
+class PlannedTask:
+    """One unit of work in a bulk job"""
+    name: str
+    inputs: List[str]
+    output_size: Optional[Tuple[int, int]] = None
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    errors: List[str] = field(default_factory=list)
+    worker: Optional[int] = None
+    start: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+@dataclass
+class Plan:
+    """Validated tasks with a schedule and totals"""
+    job: str
+    workers: int
+    tasks: List[PlannedTask]
+    total_seconds: float = 0.0
+    peak_bytes: int = 0
+
+    @property
+    def failures(self) -> List[PlannedTask]:
+        return [task for task in self.tasks if not task.ok]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "job": self.job,
+            "workers": self.workers,
+            "tasks": len(self.tasks),
+            "failures": len(self.failures),
+            "total_seconds": self.total_seconds,
+            "peak_bytes": self.peak_bytes,
+            "schedule": [asdict(task) for task in self.tasks],
+        }
+
+    def format(self, max_failures: int = 20) -> str:
+        """Plain text summary"""
+        ok = len(self.tasks) - len(self.failures)
+        lines = [
+            f"{self.job}: {ok} tasks ok, {len(self.failures)} will fail",
+            f"Estimated time with {self.workers} worker(s): {self.total_seconds:.1f}s",
+            f"Estimated peak memory: {format_bytes(self.peak_bytes)}",
+        ]
+        for task in self.failures[:max_failures]:
+            lines.append(f"  ✗ {task.name}: {'; '.join(task.errors)}")
+        if len(self.failures) > max_failures:
+            lines.append(f"  ... and {len(self.failures) - max_failures} more")
+        return "\n".join(lines)
+
+
+def schedule_tasks(tasks: List[PlannedTask], workers: int) -> Tuple[float, int]:
+    """
+    Assign valid tasks to workers longest-first and fill in worker and start times
+    Returns (makespan seconds, peak bytes of concurrently running tasks)
+    """
+    workers = max(1, workers)
+    lanes = [(0.0, worker) for worker in range(workers)]
+    heapq.heapify(lanes)
+    for task in sorted((task for task in tasks if task.ok), key=lambda task: -task.seconds):
+        start, worker = heapq.heappop(lanes)
+        task.worker, task.start = worker, start
+        heapq.heappush(lanes, (start + task.seconds, worker))
+    makespan = max(end for end, _ in lanes)
+
+    # Sweep start/end events to find the largest concurrent memory
+    events = []
+    for task in tasks:
+        if task.ok:
+            events.append((task.start, 1, task.peak_bytes))
+            events.append((task.start + task.seconds, 0, -task.peak_bytes))
+    current = peak = 0
+    for _, _, delta in sorted(events):
+        current += delta
+        peak = max(peak, current)
+    return makespan, peak
+
+
+def order_by_cost(paths: List[str], apply_gamma_correction: bool = False,
+                  cost_model: Optional[CostModel] = None, probes: Optional[List[FileProbe]] = None) -> List[str]:
+    """
+    Paths sorted by estimated unpack time, most expensive first
+    Workers taking the next file from this order as they free up is the longest-first
+    schedule that schedule_tasks() estimates. Ties keep their input order. probes, if
+    given, are the probes of paths in the same order.
+    """
+    cost_model = cost_model or CostModel()
+    costs = [cost_model.unpack_cost(probe, apply_gamma_correction)[0] if probe.size else 0.0
+             for probe in (probes if probes is not None else probe_files(paths))]
+    return [path for _, path in sorted(zip(costs, paths), key=lambda item: -item[0])]
+
+
+def plan_unpack(paths: List[str], workers: int = 1, apply_gamma_correction: bool = False,
+                cost_model: Optional[CostModel] = None) -> Plan:
+    """Plan a bulk unpack of paths with the given number of workers"""
+    cost_model = cost_model or CostModel()
+    tasks = []
+    for probe in probe_files(paths):
+        task = PlannedTask(os.path.basename(probe.path), [probe.path], probe.size)
+        # The probe sniffs the header like the real run, so it reports the same format errors
+        if probe.error:
+            task.errors.append(probe.error)
+        if task.ok:
+            task.seconds, task.peak_bytes = cost_model.unpack_cost(probe, apply_gamma_correction)
+        tasks.append(task)
+
+    plan = Plan("unpack", workers, tasks)
+    plan.total_seconds, plan.peak_bytes = schedule_tasks(tasks, workers)
+    return plan
+
+
+def group_channel_sets(paths: List[str]) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
+    """
+    Group files into channel sets by name, e.g. rock_r.png and rock_g.png form set 'rock'
+    Returns (sets, files without a channel suffix)
+    """
+    sets: Dict[str, Dict[str, str]] = {}
+    ungrouped = []
+    for path in paths:
+        stem = Path(path).stem
+        match = next(((channel, suffix) for channel, suffixes in ImageConfig.CHANNEL_SUFFIXES.items()
+                      for suffix in sorted(suffixes, key=len, reverse=True)
+                      if stem.lower().endswith(suffix)), None)
+        if match is None:
+            ungrouped.append(path)
+            continue
+        channel, suffix = match
+        name = os.path.join(os.path.dirname(path), stem[:-len(suffix)])
+        sets.setdefault(name, {})[channel] = path
+    return sets, ungrouped
+
+
+def plan_pack(channel_sets: Dict[str, Dict[str, str]], workers: int = 1,
+              resize_policy: ResizePolicy = ResizePolicy.STRICT, target_size: Optional[Tuple[int, int]] = None,
+              preserve_transparent: bool = True, cost_model: Optional[CostModel] = None) -> Plan:
+    """Plan packing each channel set ({name: {channel: path}}) into one image"""
+    cost_model = cost_model or CostModel()
+    all_paths = sorted({path for channels in channel_sets.values() for path in channels.values()})
+    probes = dict(zip(all_paths, probe_files(all_paths)))
+
+    tasks = []
+    for name, channels in channel_sets.items():
+        ordered = [channels[ch.value] for ch in ChannelType if ch.value in channels]
+        set_probes = [probes[path] for path in ordered]
+        task = PlannedTask(os.path.basename(name), ordered)
+        for probe in set_probes:
+            if probe.error:
+                task.errors.append(probe.error)
+        if task.ok:
+            try:
+                task.output_size = ImageProcessor.resolve_pack_size(
+                    [(os.path.basename(probe.path), probe.size) for probe in set_probes], resize_policy, target_size
+                )
+            except ValueError as e:
+                task.errors.append(str(e))
+        if task.ok:
+            task.seconds, task.peak_bytes = cost_model.pack_cost(set_probes, task.output_size, preserve_transparent)
+        tasks.append(task)
+
+    plan = Plan("pack", workers, tasks)
+    plan.total_seconds, plan.peak_bytes = schedule_tasks(tasks, workers)
+    return plan
+
+
+def expand_inputs(inputs: List[str], include: Optional[Iterable[str]] = None,
+                  exclude: Iterable[str] = ()) -> List[str]:
+    """Expand directories recursively with scan_images, like the bulk run; files are kept as given"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(scan_images(item, include, exclude))
+        else:
+            paths.append(item)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Dry-run planner for bulk texture jobs")
+    parser.add_argument("job", choices=["unpack", "pack"], help="Job to plan")
+    parser.add_argument("inputs", nargs="+", help="Input files or folders")
+    parser.add_argument("--workers", type=int, default=1, help="Worker count of the planned run")
+    parser.add_argument("--gamma", action="store_true", help="Unpack with gamma correction")
+    parser.add_argument("--include", default="", help="';'-separated globs of files to plan in folders")
+    parser.add_argument("--exclude", default="", help="';'-separated globs of files or folders to skip")
+    parser.add_argument("--policy", choices=[policy.value for policy in ResizePolicy],
+                        default=ImageConfig.DEFAULT_RESIZE_POLICY.value, help="Size mismatch policy for pack")
+    parser.add_argument("--target-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"),
+                        help="Output size for the explicit policy")
+    parser.add_argument("--flatten", action="store_true", help="Pack with transparent pixels flattened to white")
+    parser.add_argument("--benchmark", help="Benchmark results JSON used to calibrate estimates")
+    parser.add_argument("--json", help="Write the full plan as JSON to this path")
+    args = parser.parse_args(argv)
+
+    cost_model = CostModel.from_benchmark(args.benchmark) if args.benchmark else CostModel()
+    paths = expand_inputs(args.inputs, parse_patterns(args.include) or None, parse_patterns(args.exclude))
+    if args.job == "unpack":
+        plan = plan_unpack(paths, args.workers, args.gamma, cost_model)
+    else:
+        sets, ungrouped = group_channel_sets(paths)
+        plan = plan_pack(sets, args.workers, ResizePolicy(args.policy),
+                         tuple(args.target_size) if args.target_size else None, not args.flatten, cost_model)
+        for path in ungrouped:
+            plan.tasks.append(PlannedTask(os.path.basename(path), [path],
+                                          errors=["No channel suffix, cannot assign to a set"]))
+
+    print(plan.format())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(plan.to_dict(), f, indent=2)
+        print(f"Plan written to {args.json}")
+    return 1 if plan.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
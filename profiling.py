@@ -0,0 +1,279 @@
+"""
+On-demand profiling of GUI actions and CLI runs
+
+Profiling is off by default. Enable it with the TEXTURE_PROFILE environment variable
+("cprofile" or "sampling"), the --profile command line flag, or the hidden Ctrl+Alt+P
+toggle in the application. Each profiled action writes its output files to
+TEXTURE_PROFILE_DIR (default: ./profiles):
+
+- cprofile mode: <action>_<timestamp>.pstats and a speedscope JSON built from the call graph
+  (covers the calling thread only)
+- sampling mode: a speedscope JSON and a folded-stacks text file from periodic stack samples
+  of all threads, including bulk workers (lower overhead, no pstats)
+
+Open the .speedscope.json files at https://www.speedscope.app.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+PROFILE_MODES = ("cprofile", "sampling")
+DEFAULT_PROFILE_DIR = "profiles"
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 64
+MIN_SAMPLE_WEIGHT = 1e-6
+
+Frame = Tuple[str, str, int]  # (function name, file, line)
+
+
+class SpeedscopeBuilder:
+    """Accumulates weighted stacks into a speedscope 'sampled' profile"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.frames: List[Dict[str, object]] = []
+        self.frame_index: Dict[Frame, int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []
+
+    def add(self, stack: List[Frame], weight: float):
+        """Add a root-to-leaf stack with its weight in seconds"""
+        indices = []
+        for frame in stack:
+            if frame not in self.frame_index:
+                self.frame_index[frame] = len(self.frames)
+                self.frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indices.append(self.frame_index[frame])
+        self.samples.append(indices)
+        self.weights.append(weight)
+
+    def to_json(self) -> Dict[str, object]:
+        total = sum(self.weights)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "texture_processor.profiling",
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": self.samples,
+                "weights": self.weights,
+            }],
+        }
+
+
+def pstats_to_speedscope(stats: pstats.Stats, name: str) -> Dict[str, object]:
+    """
+    Convert cProfile statistics to a speedscope profile
+    cProfile only keeps caller/callee pairs, so time is distributed down the call
+    graph in proportion to each edge's cumulative time.
+    """
+    builder = SpeedscopeBuilder(name)
+    entries = stats.stats
+
+    callees: Dict[tuple, List[Tuple[tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    def frame(func: tuple) -> Frame:
+        filename, line, function_name = func
+        return function_name, filename, line
+
+    def walk(func: tuple, stack: List[Frame], path: set, attributed: float):
+        _, _, inline_time, cumulative_time, _ = entries[func]
+        scale = attributed / cumulative_time if cumulative_time else 0.0
+        stack = stack + [frame(func)]
+        if inline_time * scale >= MIN_SAMPLE_WEIGHT:
+            builder.add(stack, inline_time * scale)
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, []):
+            if callee not in path and callee in entries and edge_time * scale >= MIN_SAMPLE_WEIGHT:
+                walk(callee, stack, path | {callee}, edge_time * scale)
+
+    roots = [func for func, value in entries.items() if not value[4]]
+    for root in roots:
+        walk(root, [], {root}, entries[root][3])
+    return builder.to_json()
+
+
+class StackSampler:
+    """Samples the stacks of all other threads at a fixed interval"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts: Dict[Tuple[Frame, ...], int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, frame.f_lineno))
+                    frame = frame.f_back
+                stack.append((names.get(thread_id, f"thread-{thread_id}"), "", 0))
+                key = tuple(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def to_speedscope(self, name: str) -> Dict[str, object]:
+        builder = SpeedscopeBuilder(name)
+        for stack, count in self.counts.items():
+            builder.add(list(stack), count * self.interval)
+        return builder.to_json()
+
+    def to_folded(self) -> str:
+        """Folded stacks ('a;b;c count') for flamegraph tools"""
+        return "\n".join(
+            ";".join(frame[0] for frame in stack) + f" {count}" for stack, count in self.counts.items()
+        ) + "\n"
+
+
+class Profiler:
+    """Process-wide profiling switch that wraps named actions"""
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.output_dir = DEFAULT_PROFILE_DIR
+        self.observers = []
+        self.last_outputs: List[str] = []
+        self._active = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def add_observer(self, observer):
+        """Add observer notified with 'profile_saved' after each profiled action"""
+        self.observers.append(observer)
+
+    def notify_observers(self, event: str, **kwargs):
+        """Notify all observers of changes"""
+        for observer in self.observers:
+            if hasattr(observer, f'on_{event}'):
+                getattr(observer, f'on_{event}')(**kwargs)
+
+    def configure(self, mode: Optional[str], output_dir: Optional[str] = None):
+        """Set the profiling mode (None disables profiling) and output directory"""
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}. Use one of: {', '.join(PROFILE_MODES)}")
+        self.mode = mode
+        if output_dir:
+            self.output_dir = output_dir
+
+    def configure_from_env(self):
+        """Read TEXTURE_PROFILE and TEXTURE_PROFILE_DIR"""
+        mode = os.environ.get("TEXTURE_PROFILE", "").strip().lower()
+        if mode in ("1", "true", "yes", "on"):
+            mode = "cprofile"
+        elif mode not in PROFILE_MODES:
+            if mode:
+                print(f"Ignoring TEXTURE_PROFILE={mode}: expected one of {', '.join(PROFILE_MODES)}")
+            mode = None
+        self.configure(mode, os.environ.get("TEXTURE_PROFILE_DIR"))
+
+    @contextmanager
+    def profile(self, action: str):
+        """Profile the enclosed block if profiling is enabled; nested actions are not profiled"""
+        with self._lock:
+            run = self.enabled and not self._active
+            if run:
+                self._active = True
+        if not run:
+            yield
+            return
+
+        mode = self.mode
+        base_path = os.path.join(self.output_dir, f"{action}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        profiler = cProfile.Profile() if mode == "cprofile" else None
+        sampler = StackSampler() if mode == "sampling" else None
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            else:
+                sampler.start()
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            else:
+                sampler.stop()
+            elapsed = time.perf_counter() - start
+            try:
+                outputs = self._save(action, base_path, profiler, sampler)
+                self.last_outputs = outputs
+                self.notify_observers('profile_saved', action=action, paths=outputs, elapsed=elapsed)
+            finally:
+                with self._lock:
+                    self._active = False
+
+    def _save(self, action: str, base_path: str, profiler: Optional[cProfile.Profile],
+              sampler: Optional[StackSampler]) -> List[str]:
+        """Write profile outputs and return their paths"""
+        os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+        outputs = []
+
+        if profiler is not None:
+            pstats_path = f"{base_path}.pstats"
+            profiler.dump_stats(pstats_path)
+            outputs.append(pstats_path)
+            speedscope = pstats_to_speedscope(pstats.Stats(profiler), action)
+        else:
+            folded_path = f"{base_path}.folded.txt"
+            with open(folded_path, "w", encoding="utf-8") as f:
+                f.write(sampler.to_folded())
+            outputs.append(folded_path)
+            speedscope = sampler.to_speedscope(action)
+
+        speedscope_path = f"{base_path}.speedscope.json"
+        with open(speedscope_path, "w", encoding="utf-8") as f:
+            json.dump(speedscope, f)
+        outputs.append(speedscope_path)
+        return outputs
+
+
+PROFILER = Profiler()
+PROFILER.configure_from_env()
+
+
+def profiled(action: str):
+    """Decorator profiling every call of a function as the named action when profiling is enabled"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return function(*args, **kwargs)
+            with PROFILER.profile(action):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -3,6 +3,7 @@
 Simple launcher script for the Texture Channel Processor
 """
 
+import argparse
 import sys
 import subprocess
 from pathlib import Path
@@ -19,8 +20,20 @@ def check_dependencies():
         print("Please install requirements: pip install -r requirements.txt")
         return False
 
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Texture Channel Processor")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=["cprofile", "sampling"],
+                        help="Profile pack/unpack/bulk actions (default mode: cprofile)")
+    parser.add_argument("--profile-dir", help="Directory for profile output files")
+    parser.add_argument("--watchdog", nargs="?", const=0, type=float, metavar="MS",
+                        help="Log UI stalls longer than MS milliseconds (default: 200)")
+    parser.add_argument("--watchdog-log", help="Append UI stall records to this JSON lines file")
+    return parser.parse_args(argv)
+
 def main():
     """Main entry point"""
+    args = parse_args()
     print("Starting Texture Channel Processor...")
     
     if not check_dependencies():
@@ -31,6 +44,12 @@ def main():
         # Import and run the application
         # from customtkinter_texture_processor_ui import TextureProcessorApp
         from texture_processor_ui import TextureProcessorApp
+        from profiling import PROFILER
+        if args.profile or args.profile_dir:
+            PROFILER.configure(args.profile or PROFILER.mode, args.profile_dir)
+        from stall_watchdog import WATCHDOG
+        if args.watchdog is not None or args.watchdog_log:
+            WATCHDOG.configure(args.watchdog, args.watchdog_log)
         app = TextureProcessorApp()
         app.run()
     except Exception as e:
@@ -0,0 +1,88 @@
+"""
+Recursive streaming directory scanner for bulk inputs
+
+scan_images() walks a directory tree with os.scandir and yields matching file paths
+as they are found, so a bulk job can start on the first files while the rest of the
+tree is still being scanned.
+"""
+
+import fnmatch
+import os
+from typing import Iterable, Iterator, List, Optional
+
+from texture_processor import ImageConfig
+
+
+def default_include_patterns() -> List[str]:
+    """Glob patterns for the supported image formats"""
+    return [f"*{extension}" for extension in ImageConfig.SUPPORTED_FORMATS]
+
+
+def parse_patterns(text: str) -> List[str]:
+    """Split a ';' or ',' separated list of glob patterns"""
+    return [pattern.strip() for pattern in text.replace(",", ";").split(";") if pattern.strip()]
+
+
+def _matches(name: str, relative_path: str, patterns: Iterable[str]) -> bool:
+    """Match a pattern against the entry name or, if it contains a '/', the relative path"""
+    for pattern in patterns:
+        pattern = pattern.lower()
+        target = relative_path if "/" in pattern else name
+        if fnmatch.fnmatchcase(target, pattern):
+            return True
+    return False
+
+
+def scan_images(root: str, include: Optional[Iterable[str]] = None, exclude: Iterable[str] = (),
+                recursive: bool = True, follow_symlinks: bool = False) -> Iterator[str]:
+    """
+    Yield files under root whose name matches an include glob and no exclude glob
+    Patterns are case-insensitive. Patterns containing '/' match the path relative to
+    root (e.g. 'renders/*'); others match the file or directory name. Excluded
+    directories are not descended into. Entries of a directory are yielded in name order.
+    """
+    include = [pattern.lower() for pattern in (include or default_include_patterns())]
+    exclude = [pattern.lower() for pattern in exclude]
+    pending = [("", root)]
+
+    while pending:
+        relative_dir, directory = pending.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Cannot scan {directory}: {e}")
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            name = entry.name.lower()
+            relative_path = f"{relative_dir}{name}"
+            if exclude and _matches(name, relative_path, exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    if recursive:
+                        subdirectories.append((f"{relative_path}/", entry.path))
+                elif entry.is_file(follow_symlinks=follow_symlinks) and _matches(name, relative_path, include):
+                    yield entry.path
+            except OSError:
+                continue  # Entry vanished or is unreadable
+
+        # Depth-first, visiting subdirectories in name order
+        pending.extend(reversed(subdirectories))
+
+
+
+def path_matches(path: str, root: str, include: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()) -> bool:
+    """Whether scan_images(root, include, exclude) would yield path"""
+    relative = os.path.relpath(path, root).replace(os.sep, "/").lower()
+    if relative == "." or relative.startswith("../"):
+        return False
+    include = [pattern.lower() for pattern in (include or default_include_patterns())]
+    exclude = [pattern.lower() for pattern in exclude]
+    parts = relative.split("/")
+    for depth, name in enumerate(parts):
+        if exclude and _matches(name, "/".join(parts[:depth + 1]), exclude):
+            return False
+    return _matches(parts[-1], relative, include)
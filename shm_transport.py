@@ -0,0 +1,310 @@
+"""
+Shared-memory transfer of image planes between processes
+
+Sending Pillow images or arrays to a process pool pickles the pixel data, which for an
+8k RGBA texture copies 256 MB per hop. SharedPlanePool instead keeps pixel data in
+multiprocessing.shared_memory segments owned by the parent process; workers and the
+parent only exchange PlaneHandle objects (segment name, offset, mode and size).
+
+Segments are recycled: releasing a handle returns its segment to the pool, and later
+allocations of the same or smaller size reuse it instead of mapping new memory.
+close() (or leaving the pool's with block) unlinks every segment.
+
+SharedMemoryUnpacker runs the decode and split on a process pool and hands the planes
+back through the pool. Like the isolated workers, its processes are started with
+forkserver (or spawn), never forked from the multithreaded caller:
+
+    with SharedPlanePool() as pool:
+        unpacker = SharedMemoryUnpacker(pool, processes=4)
+        for path, planes in unpacker.unpack(paths):
+            ...
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from isolation import default_start_method
+from texture_processor import ImageProcessor
+
+
+# Bytes per pixel of Image.tobytes() for the modes that can be transferred
+RAW_PIXEL_SIZES = {"L": 1, "LA": 2, "I;16": 2, "RGB": 3, "RGBA": 4}
+_NUMPY_LAYOUTS = {"L": (np.uint8, 1), "LA": (np.uint8, 2), "I;16": (np.dtype("<u2"), 1),
+                  "RGB": (np.uint8, 3), "RGBA": (np.uint8, 4)}
+MAX_ATTACHED_SEGMENTS = 32
+
+
+@dataclass(frozen=True)
+class PlaneHandle:
+    """Location of one image in a shared memory segment; cheap to pickle"""
+    segment: str
+    offset: int
+    mode: str
+    size: Tuple[int, int]
+
+    @property
+    def nbytes(self) -> int:
+        return plane_nbytes(self.mode, self.size)
+
+
+def plane_nbytes(mode: str, size: Tuple[int, int]) -> int:
+    """Bytes needed to store an image of the given mode and size"""
+    if mode not in RAW_PIXEL_SIZES:
+        raise ValueError(f"Unsupported mode for shared memory transfer: {mode}")
+    return size[0] * size[1] * RAW_PIXEL_SIZES[mode]
+
+
+# Segments opened by read_plane/write_plane/plane_array without an explicit segment, by name.
+# unpack_into and pack_into map their segments per task instead, see _mapped
+_attached: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+_attached_lock = threading.Lock()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    with _attached_lock:
+        segment = _attached.get(name)
+        if segment is None:
+            segment = shared_memory.SharedMemory(name=name)
+            _attached[name] = segment
+            while len(_attached) > MAX_ATTACHED_SEGMENTS:
+                _, oldest = _attached.popitem(last=False)
+                oldest.close()
+        else:
+            _attached.move_to_end(name)
+        return segment
+
+
+def _buffer(handle: PlaneHandle, segment: Optional[shared_memory.SharedMemory] = None) -> memoryview:
+    segment = segment or _attach(handle.segment)
+    return segment.buf[handle.offset:handle.offset + handle.nbytes]
+
+
+def write_plane(handle: PlaneHandle, image: Image.Image, segment: Optional[shared_memory.SharedMemory] = None):
+    """Copy an image into the location of a handle; mode and size must match"""
+    if image.mode != handle.mode or image.size != handle.size:
+        raise ValueError(f"Image is {image.mode} {image.size}, handle expects {handle.mode} {handle.size}")
+    _buffer(handle, segment)[:] = image.tobytes()
+
+
+def read_plane(handle: PlaneHandle, segment: Optional[shared_memory.SharedMemory] = None) -> Image.Image:
+    """Copy the image at a handle into a new Pillow image"""
+    return Image.frombytes(handle.mode, handle.size, bytes(_buffer(handle, segment)))
+
+
+def plane_array(handle: PlaneHandle, segment: Optional[shared_memory.SharedMemory] = None) -> np.ndarray:
+    """NumPy view of the image at a handle, without copying; valid until the handle is released"""
+    dtype, channels = _NUMPY_LAYOUTS[handle.mode]
+    shape = (handle.size[1], handle.size[0]) + ((channels,) if channels > 1 else ())
+    segment = segment or _attach(handle.segment)
+    return np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=handle.offset)
+
+
+class SharedPlanePool:
+    """Owner of shared memory segments, recycled between transfers"""
+
+    def __init__(self, max_free_bytes: int = 2 * 1024 ** 3):
+        self.max_free_bytes = max_free_bytes
+        self.stats = {"created": 0, "reused": 0, "unlinked": 0}
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self._users: Dict[str, int] = {}  # Live handles per segment
+        self._free: List[str] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> "SharedPlanePool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def free_bytes(self) -> int:
+        return sum(self._segments[name].size for name in self._free)
+
+    def _allocate(self, nbytes: int) -> shared_memory.SharedMemory:
+        """Smallest free segment of at least nbytes, or a new one"""
+        if self._closed:
+            raise ValueError("Shared plane pool is closed")
+        with self._lock:
+            fitting = [name for name in self._free if self._segments[name].size >= nbytes]
+            if fitting:
+                name = min(fitting, key=lambda name: self._segments[name].size)
+                self._free.remove(name)
+                self.stats["reused"] += 1
+                return self._segments[name]
+        segment = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+        with self._lock:
+            self._segments[segment.name] = segment
+            self.stats["created"] += 1
+        return segment
+
+    def allocate(self, mode: str, size: Tuple[int, int], count: int = 1) -> List[PlaneHandle]:
+        """Handles for count images of the given mode and size, laid out in one segment"""
+        nbytes = plane_nbytes(mode, size)
+        segment = self._allocate(nbytes * count)
+        with self._lock:
+            self._users[segment.name] = count
+        return [PlaneHandle(segment.name, index * nbytes, mode, size) for index in range(count)]
+
+    def put(self, image: Image.Image) -> PlaneHandle:
+        """Copy an image into shared memory"""
+        if image.mode not in RAW_PIXEL_SIZES:
+            image = image.convert("RGBA")
+        handle = self.allocate(image.mode, image.size)[0]
+        write_plane(handle, image, self._segments[handle.segment])
+        return handle
+
+    def get(self, handle: PlaneHandle) -> Image.Image:
+        """Copy of the image at a handle"""
+        return read_plane(handle, self._segments[handle.segment])
+
+    def array(self, handle: PlaneHandle) -> np.ndarray:
+        """NumPy view of the image at a handle, without copying; valid until the handle is released"""
+        return plane_array(handle, self._segments[handle.segment])
+
+    def release(self, handle: PlaneHandle):
+        """Give a handle back; its segment is recycled once all handles laid out in it are released"""
+        unlink = None
+        with self._lock:
+            users = self._users.get(handle.segment, 0) - 1
+            if users > 0:
+                self._users[handle.segment] = users
+                return
+            self._users.pop(handle.segment, None)
+            segment = self._segments.get(handle.segment)
+            if segment is None or handle.segment in self._free:
+                return
+            if self.free_bytes + segment.size <= self.max_free_bytes:
+                self._free.append(handle.segment)
+            else:
+                unlink = self._segments.pop(handle.segment)
+        if unlink is not None:
+            self._unlink(unlink)
+
+    def _unlink(self, segment: shared_memory.SharedMemory):
+        with _attached_lock:
+            attached = _attached.pop(segment.name, None)
+        if attached is not None and attached is not segment:
+            attached.close()
+        try:
+            segment.close()
+        except BufferError:
+            pass  # A NumPy view is still alive; the mapping goes away with it
+        segment.unlink()
+        self.stats["unlinked"] += 1
+
+    def close(self):
+        """Unlink every segment; handles from this pool become invalid"""
+        with self._lock:
+            self._closed = True
+            segments = list(self._segments.values())
+            self._segments.clear()
+            self._users.clear()
+            self._free.clear()
+        for segment in segments:
+            self._unlink(segment)
+
+
+@contextmanager
+def _mapped(handles: List[PlaneHandle]):
+    """
+    Map the segments of handles for one task and close them afterwards, so worker
+    processes do not keep segments mapped after the owning pool has unlinked them
+    """
+    segments = {}
+    try:
+        for handle in handles:
+            if handle.segment not in segments:
+                segments[handle.segment] = shared_memory.SharedMemory(name=handle.segment)
+        yield segments
+    finally:
+        for segment in segments.values():
+            segment.close()
+
+
+def unpack_into(image_path: str, handles: List[PlaneHandle], apply_gamma_correction: bool = False) -> Tuple[int, int]:
+    """
+    Worker side of a shared memory unpack: decode image_path and write its R, G, B and A
+    planes to the given 'L' handles. Returns the image size.
+    """
+    channels = ImageProcessor.unpack_channels(image_path, apply_gamma_correction)
+    if channels[0].size != handles[0].size:
+        raise ValueError(f"{image_path} is {channels[0].size}, expected {handles[0].size}")
+    with _mapped(handles) as segments:
+        for channel, handle in zip(channels, handles):
+            write_plane(handle, channel, segments[handle.segment])
+    return channels[0].size
+
+
+def pack_into(plane_handles: List[PlaneHandle], output: PlaneHandle):
+    """Worker side of a shared memory pack: merge four 'L' planes into the RGBA output handle"""
+    with _mapped(plane_handles + [output]) as segments:
+        planes = [read_plane(handle, segments[handle.segment]) for handle in plane_handles]
+        write_plane(output, Image.merge("RGBA", planes), segments[output.segment])
+
+
+class SharedMemoryUnpacker:
+    """Unpacks images on a process pool, receiving the planes through shared memory"""
+
+    def __init__(self, pool: SharedPlanePool, processes: int = os.cpu_count() or 1,
+                 start_method: Optional[str] = None):
+        self.pool = pool
+        self.processes = max(1, processes)
+        self._context = multiprocessing.get_context(start_method or default_start_method([__name__]))
+
+    def unpack(self, image_paths: Iterable[str], apply_gamma_correction: bool = False,
+               as_arrays: bool = False) -> Iterator[Tuple[str, object]]:
+        """
+        Yield (image_path, planes or exception) in input order
+        planes are four 'L' images, or with as_arrays NumPy views into shared memory that
+        stay valid until the next item is requested.
+        """
+        paths = iter(image_paths)
+        window = deque()
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=self._context) as executor:
+            def submit_next() -> bool:
+                image_path = next(paths, None)
+                if image_path is None:
+                    return False
+                try:
+                    with Image.open(image_path) as img:
+                        size = img.size
+                except Exception as e:
+                    window.append((image_path, None, ValueError(f"Error unpacking channels from {image_path}: {e}")))
+                    return True
+                handles = self.pool.allocate("L", size, 4)
+                window.append((image_path, handles,
+                               executor.submit(unpack_into, image_path, handles, apply_gamma_correction)))
+                return True
+
+            # Keep a bounded number of files decoded ahead, so shared memory use stays bounded
+            while len(window) < self.processes * 2 and submit_next():
+                pass
+            while window:
+                image_path, handles, job = window.popleft()
+                if handles is None:
+                    yield image_path, job
+                    submit_next()
+                    continue
+                try:
+                    job.result()
+                    if as_arrays:
+                        yield image_path, [self.pool.array(handle) for handle in handles]
+                    else:
+                        yield image_path, [self.pool.get(handle) for handle in handles]
+                except Exception as e:
+                    yield image_path, e
+                finally:
+                    for handle in handles:
+                        self.pool.release(handle)
+                submit_next()
@@ -0,0 +1,294 @@
+"""
+Content-sniffing format detection
+
+sniff_file reads the first bytes of a file once and identifies PNG, DDS, TGA and TIFF
+by their magic numbers (TGA, which has none, by a plausible header and its extension
+or footer). It parses the size and the mode Pillow will open the image in, and rejects
+unrecognized formats and files that are obviously truncated (shorter than their header
+says, or a PNG without its IEND chunk), so bulk runs can drop them before they are
+queued instead of failing deep inside a decode.
+
+The size and mode match what Image.open reports, so planner.probe_file uses them
+without opening the file with Pillow.
+"""
+
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+HEADER_BYTES = 512
+TAIL_BYTES = 64
+SNIFF_WORKERS = 16
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+DDS_MAGIC = b"DDS "
+TIFF_MAGICS = (b"II*\x00", b"MM\x00*")
+BIGTIFF_MAGICS = (b"II+\x00", b"MM\x00+")
+TGA_FOOTER = b"TRUEVISION-XFILE.\x00"
+
+PNG_MODES = {
+    (1, 0): "1", (2, 0): "L", (4, 0): "L", (8, 0): "L", (16, 0): "I;16",
+    (8, 2): "RGB", (16, 2): "RGB",
+    (1, 3): "P", (2, 3): "P", (4, 3): "P", (8, 3): "P",
+    (8, 4): "LA", (16, 4): "LA",
+    (8, 6): "RGBA", (16, 6): "RGBA",
+}
+
+# FourCC and DXGI formats: (mode, bytes per 4x4 block)
+DDS_FOURCC = {
+    b"DXT1": ("RGBA", 8), b"DXT3": ("RGBA", 16), b"DXT5": ("RGBA", 16),
+    b"ATI1": ("L", 8), b"BC4U": ("L", 8), b"BC4S": ("L", 8),
+    b"ATI2": ("RGB", 16), b"BC5U": ("RGB", 16), b"BC5S": ("RGB", 16),
+}
+DXGI_BLOCK_FORMATS = {
+    70: ("RGBA", 8), 71: ("RGBA", 8), 72: ("RGBA", 8),
+    73: ("RGBA", 16), 74: ("RGBA", 16), 75: ("RGBA", 16),
+    76: ("RGBA", 16), 77: ("RGBA", 16), 78: ("RGBA", 16),
+    79: ("L", 8), 80: ("L", 8), 81: ("L", 8),
+    82: ("RGB", 16), 83: ("RGB", 16), 84: ("RGB", 16),
+    94: ("RGB", 16), 95: ("RGB", 16), 96: ("RGB", 16),
+    97: ("RGBA", 16), 98: ("RGBA", 16), 99: ("RGBA", 16),
+}
+# Uncompressed DXGI formats: (mode, bytes per pixel)
+DXGI_PIXEL_FORMATS = {
+    27: ("RGBA", 4), 28: ("RGBA", 4), 29: ("RGBA", 4),
+    87: ("RGBA", 4), 88: ("RGB", 4), 90: ("RGBA", 4), 91: ("RGBA", 4),
+}
+DDPF_ALPHAPIXELS = 0x1
+DDPF_FOURCC = 0x4
+DDPF_PALETTEINDEXED8 = 0x20
+DDPF_RGB = 0x40
+DDPF_LUMINANCE = 0x20000
+
+TGA_IMAGE_TYPES = {1: "P", 2: "RGB", 3: "L", 9: "P", 10: "RGB", 11: "L"}
+TGA_EXTENSIONS = (".tga", ".tpic", ".vda", ".icb", ".vst")
+
+TIFF_TYPE_SIZES = {1: 1, 3: 2, 4: 4, 16: 8}
+# ImageWidth, ImageLength, BitsPerSample, PhotometricInterpretation, StripOffsets, SamplesPerPixel,
+# StripByteCounts, TileOffsets, TileByteCounts, ExtraSamples
+TIFF_TAGS = (256, 257, 258, 262, 273, 277, 279, 324, 325, 338)
+
+
+@dataclass
+class SniffResult:
+    """What the header of one file says; error is set if it should not be queued"""
+    path: str
+    file_bytes: int = 0
+    format: Optional[str] = None
+    mode: Optional[str] = None
+    size: Optional[Tuple[int, int]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def sniff_file(path: str) -> SniffResult:
+    """Identify an image file from its first bytes"""
+    result = SniffResult(path)
+    try:
+        result.file_bytes = os.path.getsize(path)
+        with open(path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+            if header.startswith(PNG_MAGIC) and result.file_bytes > len(header):
+                f.seek(-TAIL_BYTES, os.SEEK_END)
+                tail = f.read()
+            else:
+                tail = header[-TAIL_BYTES:]
+            _sniff_header(result, header, tail, f)
+    except OSError as e:
+        result.error = f"Cannot read {path}: {e}"
+    except (struct.error, ValueError) as e:
+        result.error = f"Corrupt {result.format or 'image'} header in {path}: {e}"
+    return result
+
+
+def sniff_files(paths: List[str], max_workers: int = SNIFF_WORKERS) -> List[SniffResult]:
+    """Sniff files in parallel, returning results in input order"""
+    if len(paths) <= 1 or max_workers <= 1:
+        return [sniff_file(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(sniff_file, paths))
+
+
+def _sniff_header(result: SniffResult, header: bytes, tail: bytes, f):
+    if header.startswith(PNG_MAGIC):
+        _sniff_png(result, header, tail, f)
+    elif header.startswith(DDS_MAGIC):
+        _sniff_dds(result, header)
+    elif header[:4] in TIFF_MAGICS:
+        _sniff_tiff(result, header, f)
+    elif header[:4] in BIGTIFF_MAGICS:
+        result.format = "TIFF"  # Size and mode are left to the decoder
+    elif _looks_like_tga(result, header, f):
+        _sniff_tga(result, header)
+    elif not header:
+        result.error = f"Empty file: {result.path}"
+    else:
+        result.error = f"Unsupported image format: {result.path}"
+
+
+def _truncated(result: SniffResult, expected_bytes: int):
+    if result.file_bytes < expected_bytes:
+        result.error = (f"Truncated {result.format} file {result.path}: "
+                        f"{result.file_bytes} bytes, expected at least {expected_bytes}")
+
+
+def _has_png_end(f, file_bytes: int) -> bool:
+    """Walk the chunk lengths from the start of the file until IEND or the end of the file"""
+    position = len(PNG_MAGIC)
+    while position + 8 <= file_bytes:
+        f.seek(position)
+        length, chunk_type = struct.unpack(">I4s", f.read(8))
+        if chunk_type == b"IEND":
+            return True
+        position += 12 + length  # Length, type, data and CRC
+    return False
+
+
+def _sniff_png(result: SniffResult, header: bytes, tail: bytes, f):
+    result.format = "PNG"
+    if header[12:16] != b"IHDR":
+        raise ValueError("first chunk is not IHDR")
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", header[16:26])
+    result.size, result.mode = (width, height), PNG_MODES.get((bit_depth, color_type))
+    if result.mode is None:
+        raise ValueError(f"bit depth {bit_depth} with color type {color_type}")
+    # IEND is normally in the last bytes; only files with trailing data need the chunk walk
+    if b"IEND" not in tail and not _has_png_end(f, result.file_bytes):
+        result.error = f"Truncated PNG file {result.path}: no IEND chunk at the end"
+
+
+def _sniff_dds(result: SniffResult, header: bytes):
+    result.format = "DDS"
+    height, width = struct.unpack("<II", header[12:20])
+    flags, fourcc, bit_count = struct.unpack("<I4sI", header[80:92])
+    alpha_mask = struct.unpack("<I", header[104:108])[0]
+    result.size = (width, height)
+    header_bytes = 128
+    block = pixel_bytes = None
+    if flags & DDPF_FOURCC and fourcc == b"DX10":
+        header_bytes += 20
+        dxgi_format = struct.unpack("<I", header[128:132])[0]
+        if dxgi_format in DXGI_BLOCK_FORMATS:
+            result.mode, block = DXGI_BLOCK_FORMATS[dxgi_format]
+        elif dxgi_format in DXGI_PIXEL_FORMATS:
+            result.mode, pixel_bytes = DXGI_PIXEL_FORMATS[dxgi_format]
+    elif flags & DDPF_FOURCC:
+        if fourcc in DDS_FOURCC:
+            result.mode, block = DDS_FOURCC[fourcc]
+    elif flags & DDPF_RGB:
+        result.mode, pixel_bytes = ("RGBA" if flags & DDPF_ALPHAPIXELS else "RGB"), bit_count // 8
+    elif flags & DDPF_LUMINANCE:
+        result.mode, pixel_bytes = ("LA" if flags & DDPF_ALPHAPIXELS and alpha_mask else "L"), bit_count // 8
+    elif flags & DDPF_PALETTEINDEXED8:
+        result.mode = "P"
+
+    if block is not None:
+        _truncated(result, header_bytes + ((width + 3) // 4) * ((height + 3) // 4) * block)
+    elif pixel_bytes:
+        _truncated(result, header_bytes + width * height * pixel_bytes)
+    else:
+        _truncated(result, header_bytes)
+
+
+def _looks_like_tga(result: SniffResult, header: bytes, f) -> bool:
+    """TGA has no magic number: require a plausible header and a TGA extension or footer"""
+    if len(header) < 18:
+        return False
+    color_map_type, image_type = header[1], header[2]
+    width, height, depth = struct.unpack("<HHB", header[12:17])
+    if color_map_type not in (0, 1) or image_type not in TGA_IMAGE_TYPES:
+        return False
+    if not width or not height or depth not in (1, 8, 15, 16, 24, 32):
+        return False
+    if result.path.lower().endswith(TGA_EXTENSIONS):
+        return True
+    if result.file_bytes < 18 + len(TGA_FOOTER):
+        return False
+    f.seek(-len(TGA_FOOTER), os.SEEK_END)
+    return f.read() == TGA_FOOTER
+
+
+def _sniff_tga(result: SniffResult, header: bytes):
+    result.format = "TGA"
+    id_length, color_map_type, image_type = header[0], header[1], header[2]
+    color_map_length, color_map_depth = struct.unpack("<HB", header[5:8])
+    width, height, depth, descriptor = struct.unpack("<HHBB", header[12:18])
+    result.size = (width, height)
+    mode = TGA_IMAGE_TYPES[image_type]
+    if mode == "L" and depth == 1:
+        mode = "1"
+    elif mode == "L" and depth == 16:
+        mode = "LA"
+    elif mode == "RGB" and (depth == 32 or (depth == 16 and descriptor & 0xF)):
+        mode = "RGBA"
+    result.mode = mode
+
+    data_start = 18 + id_length + color_map_type * color_map_length * ((color_map_depth + 7) // 8)
+    if image_type < 9:
+        _truncated(result, data_start + (width * height * depth + 7) // 8)
+    else:
+        _truncated(result, data_start + 1)  # Run-length encoded: at least one packet
+
+
+def _sniff_tiff(result: SniffResult, header: bytes, f):
+    result.format = "TIFF"
+    order = "<" if header[:2] == b"II" else ">"
+    ifd_offset = struct.unpack(order + "I", header[4:8])[0]
+    if ifd_offset < 8 or ifd_offset + 2 > result.file_bytes:
+        result.error = f"Truncated TIFF file {result.path}: first directory is past the end of the file"
+        return
+    if ifd_offset + 2 <= len(header):
+        ifd = header[ifd_offset:]
+    else:
+        f.seek(ifd_offset)
+        ifd = f.read(HEADER_BYTES)
+    count = struct.unpack(order + "H", ifd[:2])[0]
+    if len(ifd) < 2 + count * 12 and ifd_offset + 2 + count * 12 > result.file_bytes:
+        result.error = f"Truncated TIFF file {result.path}: first directory is cut off"
+        return
+    if len(ifd) < 2 + count * 12:
+        f.seek(ifd_offset)
+        ifd = f.read(2 + count * 12)
+
+    tags = {}
+    for index in range(count):
+        entry = ifd[2 + index * 12:14 + index * 12]
+        tag, value_type, value_count = struct.unpack(order + "HHI", entry[:8])
+        value_size = TIFF_TYPE_SIZES.get(value_type)
+        if tag not in TIFF_TAGS or value_size is None or value_type == 16 or not value_count:
+            continue
+        data = entry[8:12]
+        if value_size * value_count > result.file_bytes:
+            raise ValueError(f"tag {tag} is larger than the file")
+        if value_size * value_count > 4:
+            f.seek(struct.unpack(order + "I", data)[0])
+            data = f.read(value_size * value_count)
+        code = {1: "B", 3: "H", 4: "I"}[value_type]
+        tags[tag] = struct.unpack(order + code * value_count, data[:value_size * value_count])
+
+    if 256 not in tags or 257 not in tags:
+        raise ValueError("no image width or height")
+    result.size = (tags[256][0], tags[257][0])
+    for offsets, byte_counts in ((273, 279), (324, 325)):
+        if tags.get(offsets) and tags.get(byte_counts):
+            _truncated(result, max(offset + count for offset, count in zip(tags[offsets], tags[byte_counts])))
+    bits = (tags.get(258) or (1,))[0]
+    samples = (tags.get(277) or (1,))[0]
+    photometric = (tags.get(262) or (None,))[0]
+    extra_samples = tags.get(338) or (0,)
+    if photometric in (0, 1) and samples == 1:
+        result.mode = {1: "1", 8: "L", 16: "I;16"}.get(bits)
+    elif photometric in (0, 1) and samples == 2 and bits == 8:
+        result.mode = "LA"
+    elif photometric == 2 and bits == 8:
+        if samples == 3:
+            result.mode = "RGB"
+        elif samples == 4:
+            result.mode = {0: "RGBX", 1: "RGBa", 2: "RGBA"}.get(extra_samples[0])
+    elif photometric == 3 and samples == 1:
+        result.mode = "P"
@@ -0,0 +1,247 @@
+"""
+Tk event-loop stall watchdog
+
+A heartbeat after() callback runs on the Tk main loop every interval; a monitor thread
+notices when it is overdue and samples the Python stack of the main thread while the
+loop is still blocked. When the heartbeat finally runs, a stall longer than the
+threshold is recorded with its duration, the action that caused it and the sampled
+stack, and logged to stdout (and to a JSON lines file if configured).
+
+The action is the innermost WATCHDOG.action() label active on the main thread, or
+otherwise the Tk callback found on the sampled stack. Enable the watchdog with the
+TEXTURE_WATCHDOG environment variable (threshold in milliseconds, or 1 for the
+default) or the --watchdog flag of run_texture_processor.py.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+
+DEFAULT_THRESHOLD_MS = 200
+DEFAULT_INTERVAL_MS = 50
+HISTOGRAM_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+MAX_RECORDED_STALLS = 500
+MAX_STACK_DEPTH = 40
+
+
+@dataclass
+class StallEvent:
+    """One period in which the Tk main loop did not run its heartbeat"""
+    duration_ms: float
+    action: str
+    stack: List[str]
+    timestamp: float = field(default_factory=time.time)
+
+
+class StallWatchdog:
+    """Measures Tk main-loop latency and records stalls over a threshold"""
+
+    def __init__(self, threshold_ms: float = DEFAULT_THRESHOLD_MS, interval_ms: int = DEFAULT_INTERVAL_MS,
+                 log_path: Optional[str] = None):
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.log_path = log_path
+        self.enabled = False
+        self.observers = []
+
+        self.stalls: List[StallEvent] = []
+        # Heartbeat lateness counts per bucket upper bound in ms (None is the overflow bucket)
+        self.histogram: Dict[Optional[int], int] = {bucket: 0 for bucket in HISTOGRAM_BUCKETS_MS + (None,)}
+        self.heartbeats = 0
+        self.max_latency_ms = 0.0
+
+        self.root = None
+        self.main_thread_id: Optional[int] = None
+        self._actions: List[str] = []
+        self._last_beat: Optional[float] = None
+        self._sampled_stack: Optional[List[str]] = None
+        self._sampled_action: Optional[str] = None
+        self._after_id = None
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add_observer(self, observer):
+        """Add observer notified with 'stall' for each recorded stall"""
+        self.observers.append(observer)
+
+    def notify_observers(self, event: str, **kwargs):
+        """Notify all observers of changes"""
+        for observer in self.observers:
+            if hasattr(observer, f'on_{event}'):
+                getattr(observer, f'on_{event}')(**kwargs)
+
+    def configure(self, threshold_ms: Optional[float] = None, log_path: Optional[str] = None):
+        """Enable the watchdog with an optional threshold and stall log file"""
+        self.enabled = True
+        if threshold_ms:
+            self.threshold_ms = threshold_ms
+        if log_path:
+            self.log_path = log_path
+
+    def configure_from_env(self):
+        """Read TEXTURE_WATCHDOG and TEXTURE_WATCHDOG_LOG"""
+        value = os.environ.get("TEXTURE_WATCHDOG", "").strip().lower()
+        if not value or value in ("0", "false", "no", "off"):
+            return
+        try:
+            threshold = float(value)
+        except ValueError:
+            threshold = None
+        self.configure(threshold if threshold and threshold > 1 else None, os.environ.get("TEXTURE_WATCHDOG_LOG"))
+
+    def start(self, root=None):
+        """
+        Start monitoring the calling thread's event loop
+        With a Tk root the heartbeat is scheduled with after(); without one, call beat()
+        from the loop being monitored.
+        """
+        if self._monitor is not None:
+            return
+        self.root = root
+        self.main_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._monitor = threading.Thread(target=self._run_monitor, name="stall-watchdog", daemon=True)
+        self._monitor.start()
+        if root is not None:
+            self._after_id = root.after(self.interval_ms, self._heartbeat)
+
+    def stop(self):
+        """Stop monitoring"""
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+        if self.root is not None and self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass  # The root may already be destroyed
+        self._after_id = None
+
+    def _heartbeat(self):
+        self.beat()
+        self._after_id = self.root.after(self.interval_ms, self._heartbeat)
+
+    def beat(self):
+        """Record a heartbeat; a late heartbeat ends a stall"""
+        now = time.perf_counter()
+        with self._lock:
+            latency_ms = max(0.0, (now - self._last_beat) * 1000 - self.interval_ms)
+            self._last_beat = now
+            stack, action = self._sampled_stack, self._sampled_action
+            self._sampled_stack = self._sampled_action = None
+
+        self.heartbeats += 1
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        bucket = next((b for b in HISTOGRAM_BUCKETS_MS if latency_ms <= b), None)
+        self.histogram[bucket] += 1
+
+        if latency_ms >= self.threshold_ms:
+            stall = StallEvent(latency_ms, action or "unknown", stack or [])
+            if len(self.stalls) < MAX_RECORDED_STALLS:
+                self.stalls.append(stall)
+            self._log_stall(stall)
+            self.notify_observers('stall', stall=stall)
+
+    def _run_monitor(self):
+        poll = min(self.interval_ms, self.threshold_ms) / 2000
+        while not self._stop.wait(poll):
+            with self._lock:
+                overdue_ms = (time.perf_counter() - self._last_beat) * 1000 - self.interval_ms
+                if overdue_ms < self.threshold_ms or self._sampled_stack is not None:
+                    continue
+                frame = sys._current_frames().get(self.main_thread_id)
+                if frame is None:
+                    continue
+                self._sampled_stack = traceback.format_list(traceback.extract_stack(frame, limit=MAX_STACK_DEPTH))
+                self._sampled_action = self._actions[-1] if self._actions else self._callback_name(frame)
+
+    @staticmethod
+    def _callback_name(frame) -> Optional[str]:
+        """Name of the outermost function called from Tk's callback wrapper"""
+        name = None
+        while frame is not None:
+            code = frame.f_code
+            if code.co_name == "__call__" and code.co_filename.endswith(os.path.join("tkinter", "__init__.py")):
+                return name
+            name = getattr(code, "co_qualname", code.co_name)
+            frame = frame.f_back
+        return name
+
+    @contextmanager
+    def action(self, name: str):
+        """Label work on the monitored thread so stalls during it are attributed to name"""
+        if not self.enabled or threading.get_ident() != self.main_thread_id:
+            yield
+            return
+        self._actions.append(name)
+        try:
+            yield
+        finally:
+            self._actions.pop()
+
+    def _log_stall(self, stall: StallEvent):
+        print(f"UI stall: {stall.duration_ms:.0f} ms in {stall.action}")
+        if stall.stack:
+            print("".join(stall.stack[-8:]).rstrip())
+        if self.log_path:
+            try:
+                directory = os.path.dirname(self.log_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(stall)) + "\n")
+            except OSError as e:
+                print(f"Error writing stall log: {e}")
+
+    def summary(self) -> Dict[str, object]:
+        """Heartbeat latency histogram and stall totals"""
+        by_action: Dict[str, Dict[str, float]] = {}
+        for stall in self.stalls:
+            entry = by_action.setdefault(stall.action, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += stall.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], stall.duration_ms)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "heartbeats": self.heartbeats,
+            "max_latency_ms": self.max_latency_ms,
+            "stalls": len(self.stalls),
+            "stalled_ms": sum(stall.duration_ms for stall in self.stalls),
+            "histogram": {(f"<={bucket}ms" if bucket is not None else f">{HISTOGRAM_BUCKETS_MS[-1]}ms"): count
+                          for bucket, count in self.histogram.items()},
+            "by_action": by_action,
+        }
+
+    def format_summary(self) -> str:
+        """Plain text summary for the console"""
+        summary = self.summary()
+        lines = [f"UI responsiveness: {summary['heartbeats']} heartbeats, {summary['stalls']} stalls over "
+                 f"{self.threshold_ms:.0f} ms, max latency {summary['max_latency_ms']:.0f} ms"]
+        total = max(summary["heartbeats"], 1)
+        for label, count in summary["histogram"].items():
+            lines.append(f"  {label:>9} {count:>7} {'#' * round(40 * count / total)}")
+        for action, entry in sorted(summary["by_action"].items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(f"  {action}: {entry['count']} stalls, {entry['total_ms']:.0f} ms total, "
+                         f"max {entry['max_ms']:.0f} ms")
+        return "\n".join(lines)
+
+
+WATCHDOG = StallWatchdog()
+WATCHDOG.configure_from_env()
+
+
+@atexit.register
+def _print_summary_on_exit():
+    if WATCHDOG.enabled and WATCHDOG.heartbeats:
+        print(WATCHDOG.format_summary())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for memory-budget admission control
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from PIL import Image
+from texture_processor import ChannelUnpackerModel, ImageProcessor
+from admission import MemoryBudget, estimate_unpack_bytes
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """Test cases for admission and bulk runs under a memory budget"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def run_jobs(self, budget: MemoryBudget, sizes):
+        """Run one thread per job size and record the order jobs were admitted in"""
+        admitted = []
+        lock = threading.Lock()
+
+        def job(index, nbytes):
+            with budget.reserve(nbytes):
+                with lock:
+                    admitted.append(index)
+                time.sleep(0.02)
+
+        threads = []
+        for index, nbytes in enumerate(sizes):
+            thread = threading.Thread(target=job, args=(index, nbytes))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.002)  # Arrive in index order
+        for thread in threads:
+            thread.join(5)
+        return admitted
+
+    def test_budget_is_never_exceeded(self):
+        """Test that admitted jobs stay under the limit and arrive in order"""
+        budget = MemoryBudget(100)
+        admitted = self.run_jobs(budget, [40, 40, 40, 10, 60])
+        self.assertEqual(admitted, [0, 1, 2, 3, 4])
+        self.assertLessEqual(budget.stats["peak_bytes"], 100)
+        self.assertGreater(budget.stats["waited"], 0)
+        self.assertEqual(budget.in_use, 0)
+
+    def test_oversized_job_runs_alone(self):
+        """Test that a job larger than the budget waits for an empty budget and blocks later jobs"""
+        budget = MemoryBudget(100)
+        admitted = self.run_jobs(budget, [50, 500, 10])
+        self.assertEqual(admitted, [0, 1, 2])
+        self.assertEqual(budget.stats["oversized"], 1)
+        self.assertEqual(budget.stats["peak_bytes"], 500)
+
+    def test_estimate_from_header(self):
+        """Test that estimates scale with pixel count and unreadable files cost nothing"""
+        small = os.path.join(self.temp_dir, "small.png")
+        large = os.path.join(self.temp_dir, "large.png")
+        Image.new("RGBA", (32, 32)).save(small)
+        Image.new("RGBA", (64, 64)).save(large)
+        self.assertEqual(estimate_unpack_bytes(large), 4 * estimate_unpack_bytes(small))
+        # Even the low-memory path holds the decoded image, its RGBA copy and one plane
+        self.assertGreaterEqual(estimate_unpack_bytes(large), 64 * 64 * (4 + 4 + 1))
+
+        broken = os.path.join(self.temp_dir, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not a png")
+        self.assertEqual(estimate_unpack_bytes(broken), 0)
+
+    def test_bulk_unpack_with_budget(self):
+        """Test that a budgeted bulk run, including an oversized file, matches the normal output"""
+        paths = []
+        for index, size in enumerate((16, 16, 128)):
+            path = os.path.join(self.temp_dir, "input", f"tex{index}.png")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            Image.new("RGBA", (size, size), (index, 50, 100, 200)).save(path)
+            paths.append(path)
+        budget_bytes = estimate_unpack_bytes(paths[0]) * 2  # tex2 is oversized
+
+        output_dir = os.path.join(self.temp_dir, "output")
+        results = ChannelUnpackerModel().bulk_unpack_channels(paths, output_dir, max_workers=3,
+                                                              memory_budget=budget_bytes)
+        self.assertTrue(all(isinstance(files, list) for files in results.values()))
+
+        expected = ImageProcessor.unpack_channels(paths[2])
+        for channel, saved in zip(expected, results[paths[2]]):
+            with Image.open(saved) as image:
+                self.assertEqual(image.tobytes(), channel.tobytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
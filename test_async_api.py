@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the asyncio API
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from PIL import Image
+from async_api import AsyncImageProcessor
+from scanner import scan_images
+
+
+class TestAsyncImageProcessor(unittest.TestCase):
+    """Test cases for awaitable pack, unpack and bulk operations"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def make_image(self, name: str, mode: str = "RGBA", color=0) -> str:
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.new(mode, (16, 16), color).save(path)
+        return path
+
+    def test_pack_and_unpack(self):
+        """Test awaiting single pack and unpack operations"""
+        r_path = self.make_image("rock_r.png", "L", 10)
+        b_path = self.make_image("rock_b.png", "L", 30)
+        output_path = os.path.join(self.temp_dir, "rock.png")
+
+        async def run():
+            processor = AsyncImageProcessor()
+            image = await processor.pack(r_path, None, b_path, output_path=output_path)
+            channels = await processor.unpack(output_path)
+            return image, channels
+
+        image, channels = asyncio.run(run())
+        self.assertEqual(image.getpixel((0, 0)), (10, 255, 30, 255))
+        self.assertEqual([channel.getpixel((0, 0)) for channel in channels], [10, 255, 30, 255])
+
+    def test_bulk_unpack(self):
+        """Test streaming results from a scan and the bulk_unpack_channels compatible mapping"""
+        for name in ("a.png", "b.png", "sub/c.png"):
+            self.make_image(os.path.join("input", name))
+        broken = os.path.join(self.temp_dir, "input", "d.png")
+        with open(broken, "wb") as f:
+            f.write(b"not a png")
+        input_dir = os.path.join(self.temp_dir, "input")
+        output_dir = os.path.join(self.temp_dir, "output")
+
+        async def run():
+            processor = AsyncImageProcessor(concurrency=2)
+            streamed = [item async for item in processor.bulk_unpack(scan_images(input_dir), output_dir,
+                                                                     input_root=input_dir)]
+            results = await processor.bulk_unpack_all(sorted(scan_images(input_dir)), output_dir)
+            return streamed, results
+
+        streamed, results = asyncio.run(run())
+        self.assertEqual(len(streamed), 4)
+        self.assertIsInstance(dict(streamed)[broken], Exception)
+        self.assertTrue(os.path.isfile(os.path.join(output_dir, "sub", "c", "c_CHANNEL_G.png")))
+        self.assertEqual(list(results), sorted(scan_images(input_dir)))
+        self.assertTrue(results[broken].startswith("Error processing"))
+        self.assertEqual(len(results[os.path.join(input_dir, "a.png")]), 4)
+
+    def test_concurrency_limit_and_cancellation(self):
+        """Test that at most `concurrency` jobs run and cancelled jobs never start"""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0, "started": 0}
+
+        def job():
+            with lock:
+                state["running"] += 1
+                state["started"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+
+        async def run():
+            processor = AsyncImageProcessor(concurrency=2)
+            await asyncio.gather(*(processor.run(job) for _ in range(6)))
+            self.assertEqual(state["peak"], 2)
+
+            state["started"] = 0
+            tasks = asyncio.gather(*(processor.run(job) for _ in range(20)))
+            await asyncio.sleep(0.02)
+            tasks.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await tasks
+
+        asyncio.run(run())
+        time.sleep(0.1)
+        self.assertLessEqual(state["started"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
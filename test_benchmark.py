@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark suite
+"""
+
+import unittest
+import numpy as np
+from benchmark import TEXTURE_CASES, BenchmarkResult, generate_texture, compare_results
+
+
+def make_result(benchmark: str, median: float) -> BenchmarkResult:
+    """Build a result with a single timing"""
+    return BenchmarkResult(benchmark, "rgb8", 64, None, 1, [median], median, median, median, 1.0)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases for benchmark helpers"""
+    
+    def test_generate_texture_is_deterministic(self):
+        """Test that synthetic textures are reproducible"""
+        for case in TEXTURE_CASES:
+            first = np.array(generate_texture(64, case))
+            second = np.array(generate_texture(64, case))
+            self.assertTrue(np.array_equal(first, second), case.name)
+        
+        dense = np.array(generate_texture(64, TEXTURE_CASES[1]))[:, :, 3]
+        sparse = np.array(generate_texture(64, TEXTURE_CASES[0]))[:, :, 3]
+        self.assertGreater((dense == 0).mean(), (sparse == 0).mean())
+    
+    def test_compare_flags_regressions(self):
+        """Test regression detection beyond the threshold"""
+        baseline = {r.key: r for r in [make_result("a", 1.0), make_result("b", 1.0), make_result("c", 1.0)]}
+        current = {r.key: r for r in [make_result("a", 1.5), make_result("b", 1.05), make_result("d", 1.0)]}
+        
+        statuses = {key.split("/")[0]: status for key, _, _, status in compare_results(baseline, current, 0.1)}
+        self.assertEqual(statuses, {"a": "regression", "b": "ok", "c": "missing", "d": "new"})
+
+
+if __name__ == "__main__":
+    unittest.main()
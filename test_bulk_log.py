@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded bulk log
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from bulk_log import BulkLog
+
+
+class TestBulkLog(unittest.TestCase):
+    """Test cases for BulkLog"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "logs", "bulk.log")
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_ring_buffer_keeps_latest_lines(self):
+        """Test that memory is bounded while line indices stay absolute"""
+        log = BulkLog(capacity=10)
+        log.extend([f"line {i}" for i in range(25)])
+        
+        self.assertEqual(len(log), 10)
+        self.assertEqual(log.total_lines, 25)
+        self.assertEqual(log.first_index, 15)
+        self.assertEqual(log.lines(20, 3), ["line 20", "line 21", "line 22"])
+        # Evicted lines are no longer available, the window starts at the oldest kept line
+        self.assertEqual(log.lines(0, 2), ["line 15", "line 16"])
+        self.assertEqual(log.lines(24, 5), ["line 24"])
+    
+    def test_full_history_on_disk(self):
+        """Test that every line is written to the log file"""
+        log = BulkLog(capacity=5, path=self.path)
+        for i in range(12):
+            log.append(f"line {i}")
+        log.close()
+        
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), [f"line {i}" for i in range(12)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test script for sharded bulk processing
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from PIL import Image
+from distributed import Coordinator, run_worker, shard_files, spawn_local_workers
+
+
+class TestDistributed(unittest.TestCase):
+    """Test cases for sharding, worker pulls and shard reassignment"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "input")
+        self.output_dir = os.path.join(self.temp_dir, "output")
+        self.paths = []
+        for index, size in enumerate((256, 16, 16, 64, 16, 128, 16, 16)):
+            path = os.path.join(self.input_dir, "sub" if index % 2 else "", f"tex{index}.png")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            Image.new("RGBA", (size, size), (index, 0, 0, 255)).save(path)
+            self.paths.append(path)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def start_workers(self, coordinator, count: int, **kwargs):
+        threads = [threading.Thread(target=run_worker, args=(coordinator.address,), kwargs=kwargs, daemon=True)
+                   for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def test_shards_are_size_balanced(self):
+        """Test that the largest files are spread over different shards"""
+        shards = shard_files(self.paths, 3)
+        self.assertEqual(sorted(path for shard in shards for path in shard.paths), sorted(self.paths))
+        shard_of = {path: shard.id for shard in shards for path in shard.paths}
+        self.assertEqual(len({shard_of[self.paths[0]], shard_of[self.paths[5]], shard_of[self.paths[3]]}), 3)
+        self.assertEqual(shards[0].cost, max(shard.cost for shard in shards))
+
+    def test_results_match_bulk_unpack(self):
+        """Test a run over worker threads returns bulk_unpack_channels compatible results"""
+        coordinator = Coordinator("127.0.0.1", 0)
+        coordinator.start()
+        try:
+            workers = self.start_workers(coordinator, 2, threads=2)
+            broken = os.path.join(self.input_dir, "broken.png")
+            with open(broken, "wb") as f:
+                f.write(b"not a png")
+            results = coordinator.run(self.paths + [broken], self.output_dir, self.input_dir, workers=2, timeout=30)
+        finally:
+            coordinator.close()
+        for worker in workers:
+            worker.join(5)
+
+        self.assertEqual(list(results), self.paths + [broken])
+        self.assertTrue(results[broken].startswith("Error processing"))
+        self.assertEqual(len(results[self.paths[1]]), 4)
+        self.assertTrue(os.path.isfile(os.path.join(self.output_dir, "sub", "tex1", "tex1_CHANNEL_R.png")))
+
+    def test_failed_shard_is_reassigned(self):
+        """Test that a shard taken by a worker that disconnects is processed by another worker"""
+        coordinator = Coordinator("127.0.0.1", 0)
+        requeued = []
+
+        class Observer:
+            def on_shard_requeued(self, shard, worker, error):
+                requeued.append(worker)
+
+        coordinator.add_observer(Observer())
+        coordinator.start()
+        try:
+            # A worker that takes a shard and dies
+            with socket.create_connection(coordinator.address) as crashing:
+                stream = crashing.makefile("rwb")
+                stream.write(json.dumps({"type": "ready", "worker": "crashing"}).encode() + b"\n")
+                stream.flush()
+                run_thread = threading.Thread(target=lambda: results.update(
+                    coordinator.run(self.paths, self.output_dir, workers=1, shards_per_worker=2, timeout=30)))
+                results = {}
+                run_thread.start()
+                self.assertEqual(json.loads(stream.readline())["type"], "shard")
+                stream.close()
+            self.start_workers(coordinator, 1)
+            run_thread.join(30)
+        finally:
+            coordinator.close()
+
+        self.assertEqual(requeued, ["crashing"])
+        self.assertEqual(len(results), len(self.paths))
+        self.assertTrue(all(isinstance(files, list) for files in results.values()))
+
+    def test_timed_out_worker_stays_connected(self):
+        """Test that a shard is reassigned on timeout and the slow worker's late result is discarded"""
+        coordinator = Coordinator("127.0.0.1", 0, shard_timeout=0.3)
+        requeued = threading.Event()
+
+        class Observer:
+            def on_shard_requeued(self, shard, worker, error):
+                requeued.set()
+
+        def connect(name):
+            stream = socket.create_connection(coordinator.address).makefile("rwb")
+            stream.write(json.dumps({"type": "ready", "worker": name}).encode() + b"\n")
+            stream.flush()
+            return stream
+
+        def reply(stream, message):
+            stream.write(json.dumps(message).encode() + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+        coordinator.add_observer(Observer())
+        coordinator.start()
+        results = {}
+        try:
+            slow = connect("slow")
+            run_thread = threading.Thread(target=lambda: results.update(
+                coordinator.run(self.paths, self.output_dir, workers=1, shards_per_worker=1, timeout=30)))
+            run_thread.start()
+            shard = json.loads(slow.readline())["shard"]
+            self.assertTrue(requeued.wait(10))
+
+            fast = connect("fast")
+            self.assertEqual(json.loads(fast.readline())["shard"], shard)
+            late = {path: "late" for path in self.paths}
+            # The slow worker's result arrives after the reassignment and is ignored
+            slow.write(json.dumps({"type": "result", "shard": shard, "results": late}).encode() + b"\n")
+            slow.flush()
+            time.sleep(0.2)
+            self.assertEqual(results, {})
+            fast.write(json.dumps({"type": "result", "shard": shard,
+                                   "results": {path: ["ok"] for path in self.paths}}).encode() + b"\n")
+            fast.flush()
+            self.assertEqual(reply(fast, {"type": "ready", "worker": "fast"})["type"], "done")
+            run_thread.join(10)
+            # The slow worker was not disconnected and is told the run is over
+            self.assertEqual(reply(slow, {"type": "ready", "worker": "slow"})["type"], "done")
+            slow.close()
+            fast.close()
+        finally:
+            coordinator.close()
+
+        self.assertEqual(results, {path: ["ok"] for path in self.paths})
+
+    def test_invalid_token_is_refused(self):
+        """Test that workers without the shared secret get no shards"""
+        coordinator = Coordinator("127.0.0.1", 0, token="secret")
+        coordinator.start()
+        try:
+            with self.assertRaises(ValueError):
+                run_worker(coordinator.address, token="wrong")
+        finally:
+            coordinator.close()
+
+    def test_close_releases_waiting_workers(self):
+        """Test that closing the coordinator sends 'done' to workers waiting for shards"""
+        coordinator = Coordinator(port=0)
+        self.assertEqual(coordinator.address[0], "127.0.0.1")  # Localhost only without a token
+        coordinator.start()
+        processed = []
+        worker = threading.Thread(target=lambda: processed.append(run_worker(coordinator.address)), daemon=True)
+        worker.start()
+        time.sleep(0.2)  # Connected and waiting for run() to provide shards
+        coordinator.close()
+        worker.join(10)
+        self.assertEqual(processed, [0])
+
+    def test_local_worker_processes(self):
+        """Test a run over worker processes on this machine"""
+        coordinator = Coordinator("127.0.0.1", 0)
+        coordinator.start()
+        processes = spawn_local_workers(coordinator.address, 2)
+        try:
+            results = coordinator.run(self.paths, self.output_dir, self.input_dir, workers=2, timeout=60)
+        finally:
+            coordinator.close()
+            for process in processes:
+                process.wait(30)
+        self.assertEqual(len(results), len(self.paths))
+        self.assertEqual([process.returncode for process in processes], [0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
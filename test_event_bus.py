@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the observer event bus
+"""
+
+import threading
+import unittest
+from event_bus import EventBus, EventSpec
+
+
+class RecordingObserver:
+    """Observer recording every delivered event"""
+    
+    def __init__(self):
+        self.received = []
+    
+    def on_progress(self, progress: int, total: int):
+        self.received.append(("progress", progress))
+    
+    def on_file_done(self, path: str):
+        self.received.append(("file_done", path))
+    
+    def on_completed(self):
+        self.received.append(("completed", None))
+
+
+class BatchObserver:
+    """Observer taking file events in batches"""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def on_file_done_batch(self, events):
+        self.batches.append([event["path"] for event in events])
+
+
+class ManualScheduler:
+    """Stands in for Tk's after(); callbacks run when the test calls run_pending()"""
+    
+    def __init__(self):
+        self.pending = []
+    
+    def __call__(self, delay_ms, callback):
+        self.pending.append(callback)
+    
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+
+class TestEventBus(unittest.TestCase):
+    """Test cases for EventBus"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.bus = EventBus([
+            EventSpec("progress", ("progress", "total"), coalesce=True),
+            EventSpec("file_done", ("path",)),
+            EventSpec("completed"),
+        ])
+        self.observer = RecordingObserver()
+        self.bus.subscribe(self.observer)
+    
+    def test_synchronous_delivery_until_attached(self):
+        """Test that events are delivered at once on the publishing thread"""
+        self.bus.publish("progress", progress=1, total=2)
+        self.bus.publish("file_done", path="a.png")
+        self.assertEqual(self.observer.received, [("progress", 1), ("file_done", "a.png")])
+    
+    def test_typed_payloads(self):
+        """Test that registered events reject unexpected fields"""
+        with self.assertRaises(TypeError):
+            self.bus.publish("file_done", file="a.png")
+        # Unregistered events are passed through unchecked
+        self.bus.publish("unknown", anything=1)
+    
+    def test_worker_events_are_queued_and_coalesced(self):
+        """Test frame-rate delivery of events published from a worker thread"""
+        scheduler = ManualScheduler()
+        self.bus.attach(scheduler)
+        
+        def worker():
+            for i in range(100):
+                self.bus.publish("progress", progress=i + 1, total=100)
+                if i % 50 == 0:
+                    self.bus.publish("file_done", path=f"{i}.png")
+            self.bus.publish("completed")
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(self.observer.received, [])
+        
+        scheduler.run_pending()
+        self.assertEqual(self.observer.received,
+                         [("file_done", "0.png"), ("file_done", "50.png"), ("progress", 100), ("completed", None)])
+        self.assertEqual(self.bus.stats["coalesced"], 99)
+        # Polling continues while attached
+        self.assertEqual(len(scheduler.pending), 1)
+    
+    def test_owner_thread_flushes_queue_before_direct_delivery(self):
+        """Test that UI-thread events are not delivered ahead of queued ones"""
+        self.bus.attach(ManualScheduler())
+        self.bus.publish("progress", progress=5, total=10)
+        self.bus.publish("completed")
+        self.assertEqual(self.observer.received, [("progress", 5), ("completed", None)])
+    
+    def test_batch_handlers(self):
+        """Test that batch handlers receive consecutive events together"""
+        batch_observer = BatchObserver()
+        self.bus.subscribe(batch_observer)
+        scheduler = ManualScheduler()
+        self.bus.attach(scheduler)
+        
+        thread = threading.Thread(target=lambda: [self.bus.publish("file_done", path=f"{i}.png") for i in range(3)])
+        thread.start()
+        thread.join()
+        scheduler.run_pending()
+        
+        self.assertEqual(batch_observer.batches, [["0.png", "1.png", "2.png"]])
+        self.assertEqual(len([event for event in self.observer.received if event[0] == "file_done"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for crash-isolated bulk workers
+"""
+
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from PIL import Image
+from texture_processor import ChannelUnpackerModel, ImageProcessor
+from isolation import FileTimeoutError, IsolatedWorkerPool, WorkerCrashedError
+
+
+original_unpack = ImageProcessor.unpack_channels
+
+
+def raise_memory_error(*args, **kwargs):
+    raise MemoryError
+
+
+def misbehaving_unpack(image_path, apply_gamma_correction=False):
+    """Hang on files named hang*, kill the worker on files named crash*, run out of memory on oom*"""
+    name = os.path.basename(image_path)
+    if name.startswith("oom"):
+        # Only patched in the forked worker: reporting the error fails as well
+        multiprocessing.connection.Connection.send = raise_memory_error
+        raise MemoryError
+    if name.startswith("hang"):
+        time.sleep(60)
+    if name.startswith("crash"):
+        os._exit(3)
+    return original_unpack(image_path, apply_gamma_correction)
+
+
+class TestIsolatedWorkerPool(unittest.TestCase):
+    """Test cases for per-file limits and worker replacement"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, "output")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def make_image(self, name, size=(16, 16), mode="RGBA"):
+        path = os.path.join(self.temp_dir, name)
+        Image.new(mode, size).save(path)
+        return path
+
+    def test_matches_in_process_unpack(self):
+        """Test that isolated workers produce the normal results, including errors"""
+        paths = [self.make_image(f"tex{index}.png") for index in range(4)]
+        broken = os.path.join(self.temp_dir, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not a png")
+
+        results = ChannelUnpackerModel().bulk_unpack_channels(paths + [broken], self.output_dir,
+                                                              max_workers=2, file_timeout=30)
+        self.assertEqual(list(results), paths + [broken])
+        self.assertTrue(all(isinstance(results[path], list) for path in paths))
+        self.assertIsInstance(results[broken], str)
+        self.assertEqual(len(results[paths[0]]), 4)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork to patch workers")
+    def test_hung_and_crashed_files_are_isolated(self):
+        """Test that timeouts and crashes become errors and the batch continues"""
+        paths = [self.make_image("hang.png"), self.make_image("tex0.png"),
+                 self.make_image("crash.png"), self.make_image("tex1.png"), self.make_image("oom.png")]
+
+        with mock.patch.object(ImageProcessor, "unpack_channels", staticmethod(misbehaving_unpack)):
+            with IsolatedWorkerPool(workers=2, file_timeout=1.0, start_method="fork") as pool:
+                start = time.monotonic()
+                outcomes = dict(pool.unpack(paths, self.output_dir))
+                self.assertLess(time.monotonic() - start, 30)
+                self.assertEqual(pool.stats, {"respawned": 3, "timeouts": 1, "crashes": 1})
+
+        self.assertIsInstance(outcomes[paths[0]], FileTimeoutError)
+        self.assertIsInstance(outcomes[paths[2]], WorkerCrashedError)
+        self.assertIn("Out of memory", str(outcomes[paths[4]]))
+        for path in (paths[1], paths[3]):
+            saved_files, pixels = outcomes[path]
+            self.assertEqual(pixels, 256)
+            self.assertTrue(all(os.path.exists(saved) for saved in saved_files))
+
+    @unittest.skipUnless(os.path.exists("/proc/self/statm"), "needs /proc to size the limit")
+    def test_memory_limit(self):
+        """Test that a file too large for the memory limit fails while small files succeed"""
+        large = self.make_image("large.png", (8000, 8000), "L")  # 64 MB decoded
+        small = self.make_image("small.png")
+
+        results = ChannelUnpackerModel().bulk_unpack_channels([large, small], self.output_dir,
+                                                              memory_limit=16 * 1024 * 1024)
+        self.assertIn("Out of memory", results[large])
+        self.assertIsInstance(results[small], list)
+
+    def test_budget_and_isolation_are_exclusive(self):
+        """Test that memory_budget cannot be combined with isolated workers"""
+        with self.assertRaises(ValueError):
+            ChannelUnpackerModel().bulk_unpack_channels([self.make_image("tex.png")], self.output_dir,
+                                                        memory_budget=1024, file_timeout=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
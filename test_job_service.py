@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for the HTTP job service
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from PIL import Image
+from job_service import JobService, create_server
+
+
+class TestJobService(unittest.TestCase):
+    """Test cases for job submission, progress streaming and monitoring endpoints"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = JobService(workers=2)
+        self.server = create_server(self.service, "127.0.0.1", 0, quiet=True)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+    def make_image(self, name: str, mode: str = "RGBA", color=0) -> str:
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.new(mode, (16, 16), color).save(path)
+        return path
+
+    def request(self, method: str, path: str, body=None, headers=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers=headers or {"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, response.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode("utf-8")
+
+    def test_pack_and_wait(self):
+        """Test a pack job completed synchronously with ?wait=1"""
+        job = {
+            "type": "pack",
+            "channels": {"R": self.make_image("rock_r.png", "L", 10), "G": self.make_image("rock_g.png", "L", 20)},
+            "output": os.path.join(self.temp_dir, "out", "rock.png"),
+        }
+        status, body = self.request("POST", "/jobs?wait=1", job)
+        self.assertEqual(status, 200, body)
+        result = json.loads(body)
+        self.assertEqual(result["status"], "done")
+        self.assertEqual(result["result"]["size"], [16, 16])
+        with Image.open(job["output"]) as packed:
+            self.assertEqual(packed.getpixel((0, 0))[:2], (10, 20))
+
+    def test_bulk_job_streams_events(self):
+        """Test that a bulk job's progress is streamed until it finishes"""
+        for name in ("a.png", "sub/b.png"):
+            self.make_image(os.path.join("input", name))
+        status, body = self.request("POST", "/jobs", {
+            "type": "bulk_unpack", "input_dir": os.path.join(self.temp_dir, "input"),
+            "output_dir": os.path.join(self.temp_dir, "output"), "workers": 2,
+        })
+        self.assertEqual(status, 202, body)
+        job_id = json.loads(body)["id"]
+
+        status, body = self.request("GET", f"/jobs/{job_id}/events")
+        events = [json.loads(line) for line in body.splitlines()]
+        names = [event["event"] for event in events]
+        self.assertEqual(names[0], "queued")
+        self.assertEqual(names.count("progress"), 2)
+        self.assertEqual(names[-1], "done")
+        self.assertEqual(events[-1]["result"]["files"], 2)
+
+        status, body = self.request("GET", f"/jobs/{job_id}")
+        self.assertEqual(json.loads(body)["status"], "done")
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "output", "sub", "b", "b_CHANNEL_R.png")))
+
+    def test_failed_and_invalid_jobs(self):
+        """Test error reporting for bad requests and failing jobs"""
+        status, _ = self.request("POST", "/jobs", {"type": "convert"})
+        self.assertEqual(status, 400)
+        status, _ = self.request("POST", "/jobs", {"type": "unpack", "input": "x.png"})
+        self.assertEqual(status, 400)
+        status, _ = self.request("GET", "/jobs/missing")
+        self.assertEqual(status, 404)
+
+        status, body = self.request("POST", "/jobs?wait=1", {
+            "type": "unpack", "input": os.path.join(self.temp_dir, "missing.png"), "output_dir": self.temp_dir,
+        })
+        self.assertEqual(status, 500)
+        self.assertEqual(json.loads(body)["status"], "failed")
+
+    def test_health_and_metrics(self):
+        """Test the monitoring endpoints"""
+        self.request("POST", "/jobs?wait=1", {
+            "type": "unpack", "input": self.make_image("a.png"), "output_dir": os.path.join(self.temp_dir, "a"),
+        })
+        status, body = self.request("GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["workers"], 2)
+
+        status, body = self.request("GET", "/metrics")
+        self.assertEqual(status, 200)
+        self.assertIn('texture_service_jobs_total{type="unpack",status="done"} 1', body)
+        self.assertIn("texture_service_workers 2", body)
+
+    def test_rejects_non_json_and_unauthorized_requests(self):
+        """Test that simple cross-origin posts and requests without the token are refused"""
+        job = {"type": "unpack", "input": self.make_image("rock.png"), "output_dir": self.temp_dir}
+        status, _ = self.request("POST", "/jobs", job, headers={"Content-Type": "text/plain"})
+        self.assertEqual(status, 415)
+        self.assertEqual(self.service.list_jobs(), [])
+
+        self.server.token = "s3cret"
+        self.assertEqual(self.request("POST", "/jobs", job)[0], 401)
+        self.assertEqual(self.request("GET", "/jobs")[0], 401)
+        self.assertEqual(self.request("GET", "/health")[0], 200)
+        headers = {"Content-Type": "application/json", "X-Service-Token": "s3cret"}
+        self.assertEqual(self.request("POST", "/jobs?wait=1", job, headers=headers)[0], 200)
+
+    def test_refuses_foreign_hosts_without_token(self):
+        """Test that other Host headers and non-loopback addresses need a token"""
+        job = {"type": "unpack", "input": self.make_image("rock.png"), "output_dir": self.temp_dir}
+        rebound = {"Content-Type": "application/json", "Host": "attacker.example:8765"}
+        self.assertEqual(self.request("POST", "/jobs", job, headers=rebound)[0], 403)
+        self.assertEqual(self.service.list_jobs(), [])
+        self.assertEqual(self.request("GET", "/health", headers={"Host": "localhost:8765"})[0], 200)
+
+        with self.assertRaises(ValueError):
+            create_server(self.service, "0.0.0.0", 0, quiet=True)
+        server = create_server(self.service, "0.0.0.0", 0, quiet=True, token="s3cret")
+        server.server_close()
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets not available")
+    def test_unix_socket(self):
+        """Test serving on a Unix domain socket"""
+        path = os.path.join(self.temp_dir, "service.sock")
+        server = create_server(self.service, socket_path=path, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(path)
+                client.sendall(b"GET /health HTTP/1.0\r\n\r\n")
+                response = b""
+                while True:
+                    chunk = client.recv(4096)
+                    if not chunk:
+                        break
+                    response += chunk
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertTrue(response.startswith(b"HTTP/1.0 200"))
+        self.assertIn(b'"status": "ok"', response)
+
+
+if __name__ == '__main__':
+    unittest.main()
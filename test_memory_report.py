@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for memory accounting
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from PIL import Image
+from texture_processor import ChannelPackerModel, ChannelUnpackerModel, ThumbnailCache, ImagePyramid
+from memory_report import MEMORY_TRACKER, build_report, image_nbytes
+
+
+class TestMemoryReport(unittest.TestCase):
+    """Test cases for memory reports"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.gray_path = os.path.join(self.temp_dir, "gray.png")
+        Image.new("L", (64, 32), 128).save(self.gray_path)
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        MEMORY_TRACKER.disable()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_image_nbytes(self):
+        """Test pixel storage sizes per mode"""
+        self.assertEqual(image_nbytes(Image.new("L", (10, 10))), 100)
+        self.assertEqual(image_nbytes(Image.new("I;16", (10, 10))), 200)
+        self.assertEqual(image_nbytes(Image.new("RGB", (10, 10))), 400)
+        self.assertEqual(image_nbytes(Image.new("RGBA", (10, 10))), 400)
+        
+        with Image.open(self.gray_path) as lazy:
+            self.assertEqual(image_nbytes(lazy), 0)
+            lazy.load()
+            self.assertEqual(image_nbytes(lazy), 64 * 32)
+    
+    def test_packer_model_fields_and_shared_buffers(self):
+        """Test that buffers held by several fields are counted once"""
+        model = ChannelPackerModel()
+        model.set_channel_image("R", self.gray_path)
+        model.set_channel_image("G", self.gray_path)
+        for image in model.channel_images.values():
+            image.load()
+        model.create_merged_image()
+        
+        report = build_report({"packer": model})
+        fields = {entry.field: entry for entry in report.entries}
+        
+        self.assertEqual(fields["channel_images"].buffers, 2)
+        self.assertEqual(fields["channel_images"].nbytes, 2 * 64 * 32)
+        # Originals are the same objects as the current channel images
+        self.assertEqual(fields["original_channel_images"].shared_nbytes,
+                         fields["original_channel_images"].nbytes)
+        self.assertEqual(fields["merged_image"].nbytes, 64 * 32 * 4)
+        self.assertEqual(report.total_bytes, 2 * 64 * 32 + 64 * 32 * 4)
+        self.assertEqual(report.by_owner()["packer"], report.total_bytes)
+    
+    def test_caches_and_pyramid(self):
+        """Test cache and pyramid reporting"""
+        cache = ThumbnailCache()
+        image = Image.new("RGBA", (256, 256))
+        cache.get(image, (32, 32))
+        pyramid = ImagePyramid(image)
+        pyramid.build()
+        
+        report = build_report({"cache": cache, "pyramid": pyramid})
+        fields = {(entry.owner, entry.field): entry for entry in report.entries}
+        self.assertEqual(fields[("cache", "thumbnails")].nbytes, 32 * 32 * 4)
+        self.assertEqual(fields[("pyramid", "source")].nbytes, 256 * 256 * 4)
+        self.assertEqual(fields[("pyramid", "levels")].nbytes, (128 * 128 + 64 * 64) * 4)
+        self.assertIn("Total image memory", report.format())
+    
+    def test_operation_peak_tracking(self):
+        """Test per-operation peak measurement"""
+        model = ChannelUnpackerModel()
+        model.load_image(self.gray_path)
+        
+        model.unpack_channels()
+        self.assertIsNone(MEMORY_TRACKER.latest("unpack_channels"))
+        
+        MEMORY_TRACKER.enable()
+        model.unpack_channels()
+        peak = MEMORY_TRACKER.latest("unpack_channels")
+        self.assertIsNotNone(peak)
+        self.assertGreaterEqual(peak.python_peak_bytes, 0)
+        self.assertGreater(peak.seconds, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk run metrics
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from PIL import Image
+from texture_processor import ChannelUnpackerModel
+from metrics import BulkMetricsCollector, percentile
+
+
+class TestBulkMetricsCollector(unittest.TestCase):
+    """Test cases for BulkMetricsCollector"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 0.5), 50.0)
+        self.assertEqual(percentile(values, 0.99), 99.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+    
+    def test_bulk_run_writes_metrics(self):
+        """Test that a bulk run records files and writes Prometheus and JSON output"""
+        paths = []
+        for name in ["a", "b"]:
+            path = os.path.join(self.temp_dir, f"{name}.png")
+            Image.new("RGBA", (40, 20), (1, 2, 3, 4)).save(path)
+            paths.append(path)
+        paths.append(os.path.join(self.temp_dir, "bad.jpg"))
+        metrics_dir = os.path.join(self.temp_dir, "metrics")
+        collector = BulkMetricsCollector(output_dir=metrics_dir, top_n=2)
+        
+        ChannelUnpackerModel().bulk_unpack_channels(paths, os.path.join(self.temp_dir, "out"), metrics=collector)
+        
+        summary = collector.summary()
+        self.assertEqual(summary["successful_files"], 2)
+        self.assertEqual(summary["error_files"], 1)
+        self.assertEqual(summary["pixels"], 2 * 40 * 20)
+        self.assertGreater(summary["bytes_written"], 0)
+        self.assertEqual(len(summary["slowest_files"]), 2)
+        self.assertFalse(summary["running"])
+        
+        with open(collector.prometheus_path) as f:
+            prometheus = f.read()
+        self.assertIn('texture_bulk_files_total{job="bulk_unpack",status="success"} 2', prometheus)
+        self.assertIn('texture_bulk_file_latency_seconds{job="bulk_unpack",quantile="0.95"}', prometheus)
+        with open(collector.summary_path) as f:
+            self.assertEqual(json.load(f)["processed_files"], 3)
+    
+    def test_snapshot(self):
+        """Test live rates, ETA, active workers and error rate"""
+        collector = BulkMetricsCollector()
+        collector.start_run(total=4)
+        collector.file_started()
+        collector.file_started()
+        self.assertEqual(collector.snapshot()["active_workers"], 2)
+        
+        collector.record_file("a.png", 0.1, bytes_read=2_000_000)
+        collector.record_file("b.png", 0.1, error="broken")
+        snapshot = collector.snapshot()
+        
+        self.assertEqual(snapshot["active_workers"], 0)
+        self.assertEqual(snapshot["processed_files"], 2)
+        self.assertEqual(snapshot["error_rate"], 0.5)
+        self.assertGreater(snapshot["files_per_second"], 0)
+        self.assertGreater(snapshot["megabytes_per_second"], 0)
+        self.assertAlmostEqual(snapshot["eta_seconds"], 2 / snapshot["files_per_second"])
+        
+        collector.finish_run()
+        self.assertFalse(collector.snapshot()["running"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the dry-run planner
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from PIL import Image
+from texture_processor import ResizePolicy
+from planner import PlannedTask, group_channel_sets, main, order_by_cost, plan_pack, plan_unpack, probe_file, schedule_tasks
+
+
+class TestPlanner(unittest.TestCase):
+    """Test cases for the bulk job planner"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+    
+    def make_image(self, name: str, size=(64, 64), mode="RGBA") -> str:
+        path = os.path.join(self.temp_dir, name)
+        Image.new(mode, size).save(path)
+        return path
+    
+    def test_probe_reads_header_only(self):
+        """Test header probing of valid and broken files"""
+        probe = probe_file(self.make_image("a.png", (40, 20), "I;16"))
+        self.assertEqual((probe.size, probe.mode, probe.format), ((40, 20), "I;16", "PNG"))
+        self.assertEqual(probe.raw_bytes, 40 * 20 * 2)
+        
+        broken = os.path.join(self.temp_dir, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+        self.assertIn("Unsupported image format", probe_file(broken).error)
+    
+    def test_plan_unpack_reports_failures_and_totals(self):
+        """Test unpack validation, estimates and schedule"""
+        paths = [self.make_image("big.png", (256, 256)), self.make_image("small.png", (64, 64)),
+                 self.make_image("photo.jpg", mode="RGB")]
+        broken = os.path.join(self.temp_dir, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"\x89PNG truncated")
+        paths.append(broken)
+        
+        plan = plan_unpack(paths, workers=2)
+        failures = {task.name: task.errors for task in plan.failures}
+        self.assertEqual(set(failures), {"photo.jpg", "broken.png"})
+        self.assertIn("Unsupported image format", failures["photo.jpg"][0])
+        
+        big, small = plan.tasks[0], plan.tasks[1]
+        self.assertGreater(big.seconds, small.seconds)
+        self.assertEqual({big.worker, small.worker}, {0, 1})
+        self.assertAlmostEqual(plan.total_seconds, big.seconds)
+        self.assertEqual(plan.peak_bytes, big.peak_bytes + small.peak_bytes)
+        self.assertIn("2 will fail", plan.format())
+    
+    def test_schedule_is_longest_first(self):
+        """Test makespan and concurrent memory of the schedule"""
+        tasks = [PlannedTask(str(i), [], seconds=seconds, peak_bytes=100) for i, seconds in enumerate([3, 3, 2, 2, 2])]
+        makespan, peak = schedule_tasks(tasks, 2)
+        self.assertEqual(makespan, 7)
+        self.assertEqual(peak, 200)
+        self.assertEqual(schedule_tasks(tasks, 1), (12, 100))
+    
+    def test_order_by_cost(self):
+        """Test that paths are ordered most expensive first, with unreadable files last"""
+        broken = os.path.join(self.temp_dir, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+        small = self.make_image("small.png", (16, 16))
+        large = self.make_image("large.png", (128, 128))
+        deep = self.make_image("deep.png", (64, 64), "I;16")
+        self.assertEqual(order_by_cost([broken, small, large, deep]), [large, deep, small, broken])
+    
+    def test_plan_pack_checks_sizes_per_set(self):
+        """Test channel set grouping and size validation under resize policies"""
+        paths = [self.make_image("rock_r.png"), self.make_image("rock_G.png"),
+                 self.make_image("wood_r.png", (128, 128)), self.make_image("wood_alpha.png", (64, 64)),
+                 self.make_image("notes.png")]
+        sets, ungrouped = group_channel_sets(paths)
+        self.assertEqual(ungrouped, [paths[4]])
+        self.assertEqual(set(sets[os.path.join(self.temp_dir, "rock")]), {"R", "G"})
+        
+        strict = plan_pack(sets)
+        self.assertEqual([task.name for task in strict.failures], ["wood"])
+        self.assertIn("Size mismatch", strict.failures[0].errors[0])
+        
+        relaxed = plan_pack(sets, resize_policy=ResizePolicy.MATCH_SMALLEST)
+        self.assertFalse(relaxed.failures)
+        self.assertEqual({task.name: task.output_size for task in relaxed.tasks},
+                         {"rock": (64, 64), "wood": (64, 64)})
+    
+    def test_cli_writes_json(self):
+        """Test the command line entry point"""
+        self.make_image("a.png")
+        json_path = os.path.join(self.temp_dir, "plan.json")
+        self.assertEqual(main(["unpack", self.temp_dir, "--json", json_path]), 0)
+        with open(json_path) as f:
+            self.assertEqual(json.load(f)["tasks"], 1)
+    
+    def test_cli_scans_folders_like_the_bulk_run(self):
+        """Test that folders are scanned recursively, filtered to images and by include/exclude"""
+        self.make_image("a.png")
+        os.makedirs(os.path.join(self.temp_dir, "sub"))
+        self.make_image(os.path.join("sub", "b.png"))
+        with open(os.path.join(self.temp_dir, "readme.txt"), "w") as f:
+            f.write("not an image")
+        json_path = os.path.join(self.temp_dir, "plan.json")
+        
+        self.assertEqual(main(["unpack", self.temp_dir, "--json", json_path]), 0)
+        with open(json_path) as f:
+            self.assertEqual(json.load(f)["tasks"], 2)
+        self.assertEqual(main(["unpack", self.temp_dir, "--exclude", "sub", "--json", json_path]), 0)
+        with open(json_path) as f:
+            self.assertEqual(json.load(f)["tasks"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for on-demand profiling
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from PIL import Image
+from texture_processor import ChannelUnpackerModel
+from profiling import PROFILER
+
+
+class TestProfiler(unittest.TestCase):
+    """Test cases for Profiler"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.temp_dir, "packed.png")
+        Image.new("RGBA", (64, 64), (10, 20, 30, 40)).save(self.image_path)
+        self.profile_dir = os.path.join(self.temp_dir, "profiles")
+        self.previous = (PROFILER.mode, PROFILER.output_dir)
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        PROFILER.configure(*self.previous)
+        shutil.rmtree(self.temp_dir)
+    
+    def unpack(self):
+        model = ChannelUnpackerModel()
+        model.load_image(self.image_path)
+        model.unpack_channels()
+    
+    def test_disabled_by_default(self):
+        """Test that no profile is written while profiling is off"""
+        PROFILER.configure(None, self.profile_dir)
+        self.unpack()
+        self.assertFalse(os.path.exists(self.profile_dir))
+    
+    def test_cprofile_action_writes_pstats_and_speedscope(self):
+        """Test cProfile output for a profiled model action"""
+        PROFILER.configure("cprofile", self.profile_dir)
+        self.unpack()
+        
+        files = sorted(os.listdir(self.profile_dir))
+        self.assertEqual(len(files), 2)
+        self.assertTrue(files[0].startswith("unpack_channels_") and files[0].endswith(".pstats"))
+        with open(os.path.join(self.profile_dir, files[1])) as f:
+            speedscope = json.load(f)
+        profile = speedscope["profiles"][0]
+        self.assertEqual(profile["type"], "sampled")
+        self.assertEqual(len(profile["samples"]), len(profile["weights"]))
+        names = {frame["name"] for frame in speedscope["shared"]["frames"]}
+        self.assertIn("unpack_channels", names)
+    
+    def test_sampling_mode(self):
+        """Test sampling profiler output"""
+        PROFILER.configure("sampling", self.profile_dir)
+        with PROFILER.profile("busy"):
+            sum(i * i for i in range(300000))
+        
+        self.assertTrue(any(path.endswith(".speedscope.json") for path in PROFILER.last_outputs))
+        self.assertTrue(any(path.endswith(".folded.txt") for path in PROFILER.last_outputs))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the recursive input scanner
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from PIL import Image
+from texture_processor import ChannelUnpackerModel
+from scanner import parse_patterns, scan_images
+
+
+class TestScanner(unittest.TestCase):
+    """Test cases for scanning and streaming bulk inputs"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "input")
+        for relative in ("a.png", "b.DDS", "notes.txt", "sub/c.png", "sub/deep/d.png", "renders/e.png", "cache/f.png"):
+            path = os.path.join(self.input_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if relative.endswith(".txt"):
+                open(path, "w").close()
+            else:
+                Image.new("RGBA", (8, 8), (10, 20, 30, 40)).save(path, format="PNG")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def relative(self, paths):
+        return [os.path.relpath(path, self.input_dir).replace(os.sep, "/") for path in paths]
+
+    def test_recursive_scan_in_name_order(self):
+        """Test that nested supported files are found depth-first in name order"""
+        found = self.relative(scan_images(self.input_dir))
+        self.assertEqual(found, ["a.png", "b.DDS", "cache/f.png", "renders/e.png", "sub/c.png", "sub/deep/d.png"])
+
+        flat = self.relative(scan_images(self.input_dir, recursive=False))
+        self.assertEqual(flat, ["a.png", "b.DDS"])
+
+    def test_include_and_exclude_patterns(self):
+        """Test name patterns, path patterns and directory pruning"""
+        found = self.relative(scan_images(self.input_dir, include=["*.png"], exclude=["cache", "renders/*"]))
+        self.assertEqual(found, ["a.png", "sub/c.png", "sub/deep/d.png"])
+
+        found = self.relative(scan_images(self.input_dir, exclude=["sub"]))
+        self.assertNotIn("sub/deep/d.png", found)
+
+        self.assertEqual(parse_patterns(" *.png; *.dds ,cache;; "), ["*.png", "*.dds", "cache"])
+
+    def test_scan_is_lazy(self):
+        """Test that paths are yielded before the whole tree is walked"""
+        iterator = scan_images(self.input_dir)
+        self.assertEqual(self.relative([next(iterator)]), ["a.png"])
+
+    def test_bulk_unpack_streams_from_scan(self):
+        """Test bulk unpacking from a generator with outputs mirroring the input tree"""
+        output_dir = os.path.join(self.temp_dir, "output")
+        model = ChannelUnpackerModel()
+
+        class Observer:
+            totals = []
+
+            def on_bulk_progress(self, progress, total, current_file):
+                self.totals.append(total)
+
+        observer = Observer()
+        model.add_observer(observer)
+        results = model.bulk_unpack_channels(scan_images(self.input_dir, include=["*.png"]), output_dir,
+                                             max_workers=2, input_root=self.input_dir)
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(observer.totals)
+        self.assertTrue(all(total is None for total in observer.totals))
+        for relative in ("a", "sub/c", "sub/deep/d", "renders/e"):
+            self.assertTrue(os.path.isfile(os.path.join(output_dir, relative, f"{os.path.basename(relative)}_CHANNEL_R.png")))
+
+
+if __name__ == '__main__':
+    unittest.main()
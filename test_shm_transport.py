@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for shared memory plane transfer
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from PIL import Image
+from texture_processor import ImageProcessor
+import shm_transport
+from shm_transport import SharedMemoryUnpacker, SharedPlanePool, pack_into, unpack_into
+
+
+class TestSharedPlanePool(unittest.TestCase):
+    """Test cases for the segment pool and process pool transfers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        """Test copying images of each supported mode in and out of shared memory"""
+        with SharedPlanePool() as pool:
+            for mode, color in (("L", 7), ("I;16", 40000), ("RGB", (1, 2, 3)), ("RGBA", (1, 2, 3, 4))):
+                image = Image.new(mode, (5, 3), color)
+                handle = pool.put(image)
+                self.assertEqual(handle.nbytes, len(image.tobytes()))
+                self.assertEqual(pool.get(handle).tobytes(), image.tobytes())
+                pool.release(handle)
+
+            handle = pool.put(Image.new("RGBA", (4, 2), (9, 8, 7, 6)))
+            array = pool.array(handle)
+            self.assertEqual(array.shape, (2, 4, 4))
+            array[0, 0] = (1, 1, 1, 1)  # Views write through
+            self.assertEqual(pool.get(handle).getpixel((0, 0)), (1, 1, 1, 1))
+            del array
+
+    def test_segments_are_recycled_and_unlinked(self):
+        """Test that released segments are reused and close() unlinks them"""
+        pool = SharedPlanePool()
+        handles = pool.allocate("L", (64, 64), 4)
+        name = handles[0].segment
+        for handle in handles[:3]:
+            pool.release(handle)
+        self.assertNotEqual(pool.allocate("L", (8, 8))[0].segment, name)  # Still in use by one handle
+        pool.release(handles[3])
+
+        reused = pool.allocate("L", (32, 32), 2)
+        self.assertEqual(reused[0].segment, name)
+        self.assertEqual(pool.stats["reused"], 1)
+
+        pool.close()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+        with self.assertRaises(ValueError):
+            pool.allocate("L", (8, 8))
+
+    def test_unpack_on_process_pool(self):
+        """Test that planes decoded by worker processes match an in-process unpack"""
+        paths = []
+        for index in range(3):
+            path = os.path.join(self.temp_dir, f"tex{index}.png")
+            Image.new("RGBA", (32 + index, 16), (index * 10, 20, 30, 40)).save(path)
+            paths.append(path)
+        broken = os.path.join(self.temp_dir, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not a png")
+
+        with SharedPlanePool() as pool:
+            results = list(SharedMemoryUnpacker(pool, processes=2).unpack(paths + [broken]))
+            self.assertGreater(pool.stats["reused"] + pool.stats["created"], 0)
+
+        self.assertEqual([path for path, _ in results], paths + [broken])
+        self.assertIsInstance(results[-1][1], Exception)
+        for path, planes in results[:-1]:
+            expected = ImageProcessor.unpack_channels(path)
+            self.assertEqual([plane.tobytes() for plane in planes], [plane.tobytes() for plane in expected])
+
+    def test_pack_on_process_pool(self):
+        """Test packing planes in a worker process with only handles crossing the process boundary"""
+        with SharedPlanePool() as pool:
+            planes = [pool.put(Image.new("L", (8, 8), value)) for value in (10, 20, 30, 40)]
+            output = pool.allocate("RGBA", (8, 8))[0]
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                executor.submit(pack_into, planes, output).result()
+            self.assertEqual(pool.get(output).getpixel((3, 3)), (10, 20, 30, 40))
+
+
+    def test_worker_tasks_do_not_keep_segments_mapped(self):
+        """Test that worker-side tasks close the segments they mapped"""
+        path = os.path.join(self.temp_dir, "tex.png")
+        Image.new("RGBA", (8, 8), (1, 2, 3, 4)).save(path)
+        with SharedPlanePool(max_free_bytes=0) as pool:
+            handles = pool.allocate("L", (8, 8), 4)
+            unpack_into(path, handles)
+            output = pool.allocate("RGBA", (8, 8))[0]
+            pack_into(handles, output)
+            self.assertEqual(pool.get(output).getpixel((0, 0)), (1, 2, 3, 4))
+            self.assertNotIn(handles[0].segment, shm_transport._attached)
+            self.assertNotIn(output.segment, shm_transport._attached)
+
+
+if __name__ == '__main__':
+    unittest.main()
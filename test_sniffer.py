@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for content-sniffing format detection
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from PIL import Image
+from texture_processor import ChannelUnpackerModel, ImageProcessor
+from sniffer import sniff_file
+
+
+class TestSniffer(unittest.TestCase):
+    """Test cases for header sniffing and early rejection"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def make_image(self, name, mode="RGBA", size=(37, 21), **params):
+        path = os.path.join(self.temp_dir, name)
+        Image.new(mode, size).save(path, **params)
+        return path
+
+    def truncate(self, path, name):
+        with open(path, "rb") as f:
+            data = f.read()
+        truncated = os.path.join(self.temp_dir, name)
+        with open(truncated, "wb") as f:
+            f.write(data[:len(data) // 2])
+        return truncated
+
+    def test_matches_pillow(self):
+        """Test that format, mode and size agree with Image.open for each format and mode"""
+        paths = [self.make_image(f"{mode.replace(';', '')}.{extension}", mode)
+                 for extension in ("png", "tga", "tif") for mode in ("1", "L", "LA", "RGB", "RGBA", "P")]
+        paths += [self.make_image("gray16.png", "I;16"), self.make_image("gray16.tif", "I;16")]
+        paths += [self.make_image(f"{mode}.dds", mode) for mode in ("L", "LA", "RGB", "RGBA")]
+        paths += [self.make_image(f"{pixel_format}.dds", pixel_format=pixel_format)
+                  for pixel_format in ("DXT1", "DXT3", "DXT5")]
+        paths.append(self.make_image("bc5.dds", "RGB", pixel_format="BC5"))
+
+        for path in paths:
+            sniffed = sniff_file(path)
+            with Image.open(path) as img:
+                self.assertEqual((sniffed.format, sniffed.mode, sniffed.size), (img.format, img.mode, img.size), path)
+            self.assertTrue(sniffed.ok, path)
+
+    def test_rejects_unsupported_and_truncated(self):
+        """Test rejection of other formats, misnamed files and cut-off files"""
+        jpeg = os.path.join(self.temp_dir, "photo.png")
+        Image.new("RGB", (8, 8)).save(jpeg, format="JPEG")  # Misnamed
+        self.assertIn("Unsupported image format", sniff_file(jpeg).error)
+
+        empty = os.path.join(self.temp_dir, "empty.png")
+        open(empty, "wb").close()
+        self.assertFalse(sniff_file(empty).ok)
+
+        for name, params in (("big.png", {"compress_level": 0}), ("big.tga", {}), ("big.dds", {}),
+                             ("big.tif", {})):
+            path = self.make_image(name, "RGBA", (64, 64), **params)
+            self.assertTrue(sniff_file(path).ok)
+            truncated = sniff_file(self.truncate(path, "cut_" + name))
+            self.assertIn("Truncated", truncated.error, name)
+
+        self.assertFalse(ImageProcessor.validate_image_format(jpeg))
+        self.assertTrue(ImageProcessor.validate_image_format(self.make_image("real.png")))
+
+    def test_png_with_trailing_data(self):
+        """Test that data appended after IEND does not make a PNG look truncated"""
+        path = self.make_image("padded.png", "RGBA", (64, 64), compress_level=0)
+        with open(path, "ab") as f:
+            f.write(b"\0" * 4096)
+        self.assertTrue(sniff_file(path).ok)
+        self.assertTrue(ImageProcessor.validate_image_format(path))
+
+    def test_bulk_rejects_before_queueing(self):
+        """Test that bad files are reported without reaching a worker"""
+        good = [self.make_image(f"tex{index}.png") for index in range(3)]
+        truncated = self.truncate(self.make_image("big.png", size=(64, 64), compress_level=0), "cut.png")
+        paths = [good[0], truncated, good[1], good[2]]
+
+        model = ChannelUnpackerModel()
+        with mock.patch.object(model, "unpack_file", wraps=model.unpack_file) as unpack:
+            results = model.bulk_unpack_channels(paths, os.path.join(self.temp_dir, "out"), max_workers=2)
+        self.assertEqual(list(results), paths)
+        self.assertIn("Truncated PNG file", results[truncated])
+        self.assertTrue(all(isinstance(results[path], list) for path in good))
+        self.assertNotIn(truncated, [call.args[0] for call in unpack.call_args_list])
+
+
+    def test_bulk_reads_each_header_once(self):
+        """Test that ordering, admission and unpacking share one sniff per file"""
+        paths = [self.make_image(f"tex{index}.png", size=(16 * (index + 1), 16)) for index in range(4)]
+        sniffed = []
+
+        def counting_sniff(path):
+            sniffed.append(path)
+            return sniff_file(path)
+
+        with mock.patch("texture_processor.sniff_file", counting_sniff), \
+                mock.patch("sniffer.sniff_file", counting_sniff), mock.patch("planner.sniff_file", counting_sniff):
+            results = ChannelUnpackerModel().bulk_unpack_channels(paths, os.path.join(self.temp_dir, "out"),
+                                                                  max_workers=2, memory_budget=1024 ** 3)
+        self.assertTrue(all(isinstance(files, list) for files in results.values()))
+        self.assertEqual(sorted(sniffed), sorted(paths))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the UI stall watchdog
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from stall_watchdog import StallWatchdog
+
+
+class TestStallWatchdog(unittest.TestCase):
+    """Test cases for StallWatchdog"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "stalls.jsonl")
+        self.watchdog = StallWatchdog(threshold_ms=60, interval_ms=10, log_path=self.log_path)
+        self.watchdog.enabled = True
+        self.watchdog.start()
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.watchdog.stop()
+        shutil.rmtree(self.temp_dir)
+    
+    def blocking_work(self):
+        time.sleep(0.25)
+    
+    def test_records_stall_with_action_and_stack(self):
+        """Test that a blocked loop is recorded with its action and stack"""
+        self.watchdog.beat()
+        with self.watchdog.action("decode"):
+            self.blocking_work()
+        self.watchdog.beat()
+        
+        self.assertEqual(len(self.watchdog.stalls), 1)
+        stall = self.watchdog.stalls[0]
+        self.assertGreaterEqual(stall.duration_ms, 150)
+        self.assertEqual(stall.action, "decode")
+        self.assertIn("blocking_work", "".join(stall.stack))
+        
+        with open(self.log_path) as f:
+            logged = [json.loads(line) for line in f]
+        self.assertEqual(logged[0]["action"], "decode")
+    
+    def test_fast_heartbeats_are_not_stalls(self):
+        """Test that on-time heartbeats only feed the histogram"""
+        for _ in range(5):
+            time.sleep(0.01)
+            self.watchdog.beat()
+        
+        summary = self.watchdog.summary()
+        self.assertEqual(summary["stalls"], 0)
+        self.assertEqual(summary["heartbeats"], 5)
+        self.assertEqual(sum(summary["histogram"].values()), 5)
+        self.assertFalse(os.path.exists(self.log_path))
+    
+    def test_summary_groups_by_action(self):
+        """Test per-action stall totals"""
+        for name in ("merge", "merge", "viewer"):
+            self.watchdog.beat()
+            with self.watchdog.action(name):
+                time.sleep(0.12)
+            self.watchdog.beat()
+        
+        by_action = self.watchdog.summary()["by_action"]
+        self.assertEqual(by_action["merge"]["count"], 2)
+        self.assertEqual(by_action["viewer"]["count"], 1)
+        self.assertIn("merge", self.watchdog.format_summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,8 +6,9 @@ Test script for the refactored texture processor
 import unittest
 import tempfile
 import os
+import queue
 from PIL import Image
-from texture_processor import ImageProcessor, ChannelType, ChannelPackerModel, ChannelUnpackerModel
+from texture_processor import ImageProcessor, ChannelType, ChannelPackerModel, ChannelUnpackerModel, ZoomableImageViewer, ImagePyramid, ThumbnailCache, DiskThumbnailCache, FileDropHandler, ResizePolicy
 
 
 class TestImageProcessor(unittest.TestCase):
@@ -63,6 +64,79 @@ class TestImageProcessor(unittest.TestCase):
         self.assertEqual(packed.mode, "RGBA")
         self.assertEqual(packed.size, (100, 100))
     
+    def test_resize_policies(self):
+        """Test packing mismatched sizes under each resize policy"""
+        small_path = os.path.join(self.temp_dir, "small.png")
+        Image.new("RGBA", (50, 50), (0, 0, 255, 255)).save(small_path)
+        paths = [self.test_image_path, small_path]
+        
+        self.assertEqual(ImageProcessor.validate_image_sizes(paths, ResizePolicy.MATCH_LARGEST), (100, 100))
+        self.assertEqual(ImageProcessor.validate_image_sizes(paths, ResizePolicy.MATCH_SMALLEST), (50, 50))
+        self.assertEqual(ImageProcessor.validate_image_sizes(paths, ResizePolicy.EXPLICIT, (64, 32)), (64, 32))
+        with self.assertRaises(ValueError):
+            ImageProcessor.validate_image_sizes(paths, ResizePolicy.EXPLICIT)
+        
+        packed = ImageProcessor.pack_channels(r_path=self.test_image_path, b_path=small_path,
+                                              resize_policy=ResizePolicy.MATCH_SMALLEST)
+        self.assertEqual(packed.size, (50, 50))
+        self.assertEqual(packed.getpixel((10, 10)), (255, 255, 0, 255))
+        
+        model = ChannelPackerModel()
+        model.set_channel_image("R", self.test_image_path)
+        model.set_channel_image("G", small_path)
+        model.resize_policy = ResizePolicy.MATCH_LARGEST
+        self.assertEqual(model.create_merged_image().size, (100, 100))
+    
+    def test_resize_plane_reduces_power_of_two(self):
+        """Test that power-of-two downscales use reduce() and others finish with a filter"""
+        plane = Image.linear_gradient("L").resize((256, 128))
+        
+        halved = ImageProcessor.resize_plane(plane, (128, 64))
+        self.assertEqual(halved.tobytes(), plane.reduce(2).tobytes())
+        self.assertEqual(ImageProcessor.resize_plane(plane, (64, 64)).tobytes(), plane.reduce((4, 2)).tobytes())
+        self.assertEqual(ImageProcessor.resize_plane(plane, (100, 50)).size, (100, 50))
+        self.assertEqual(ImageProcessor.resize_plane(plane, (512, 256)).size, (512, 256))
+    
+    def test_create_thumbnail_is_memoized(self):
+        """Test that thumbnails are cached per source and size"""
+        source = Image.new("RGBA", (1000, 500), (255, 0, 0, 255))
+        cache = ThumbnailCache(max_entries=2)
+        
+        thumb = cache.get(source, (170, 170))
+        self.assertEqual(thumb.size, (170, 85))
+        self.assertIs(cache.get(source, (170, 170)), thumb)
+        self.assertIsNot(cache.get(source, (100, 100)), thumb)
+        
+        # File keys survive reloading the same unchanged file
+        key = ThumbnailCache.source_key(self.test_image_path)
+        file_thumb = cache.get(Image.open(self.test_image_path), (50, 50), key)
+        self.assertIs(cache.get(Image.open(self.test_image_path), (50, 50), key), file_thumb)
+    
+    def test_disk_thumbnail_cache(self):
+        """Test that disk thumbnails are reused until the source changes"""
+        cache = DiskThumbnailCache(os.path.join(self.temp_dir, "thumbs"))
+        
+        thumb = cache.get(self.test_image_path, (32, 32))
+        cached_path = cache.cache_path(self.test_image_path, (32, 32))
+        self.assertEqual(thumb.size, (32, 32))
+        self.assertTrue(os.path.isfile(cached_path))
+        
+        os.utime(self.test_image_path, ns=(0, 0))
+        self.assertNotEqual(cache.cache_path(self.test_image_path, (32, 32)), cached_path)
+    
+    def test_save_image_keeps_existing_file_on_failure(self):
+        """Test that a failed encode leaves the previous output and no temporary file"""
+        with open(self.test_image_path, "rb") as f:
+            original = f.read()
+        with self.assertRaises(OSError):
+            ImageProcessor.save_image(Image.new("F", (8, 8)), self.test_image_path)  # PNG cannot store mode F
+        with open(self.test_image_path, "rb") as f:
+            self.assertEqual(f.read(), original)
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ["test.png", "test2.png"])
+        
+        nbytes = ImageProcessor.save_image(Image.new("L", (8, 8)), self.test_image_path)
+        self.assertEqual(nbytes, os.path.getsize(self.test_image_path))
+    
     def test_unpack_channels(self):
         """Test channel unpacking"""
         # Create a packed image first
@@ -114,6 +188,121 @@ class TestChannelPackerModel(unittest.TestCase):
         
         self.assertIsNone(self.model.channel_paths[ChannelType.RED.value])
         self.assertNotIn(ChannelType.RED.value, self.model.channel_images)
+    
+    def test_assign_files_to_channels(self):
+        """Test channel assignment by suffix and drop order"""
+        assignments = ChannelPackerModel.assign_files_to_channels(
+            ["a.png", "rough_G.png", "b.png", "tex_CHANNEL_A.png", "c.png"], ChannelType.BLUE.value
+        )
+        
+        self.assertEqual(assignments, {"G": "rough_G.png", "A": "tex_CHANNEL_A.png", "B": "a.png", "R": "b.png"})
+    
+    def test_parse_multi_file_drop(self):
+        """Test parsing dropped data with several paths"""
+        paths = FileDropHandler.parse_drop_data("{C:/My Textures/a_R.png} C:/b_G.png")
+        self.assertEqual(paths, ["C:/My Textures/a_R.png", "C:/b_G.png"])
+    
+    def test_set_channel_images_async(self):
+        """Test background loading of several channels"""
+        green_path = os.path.join(self.temp_dir, "mask_G.png")
+        Image.new("L", (100, 100), 128).save(green_path)
+        delivered = queue.Queue()
+        self.model.call_soon = delivered.put
+        
+        assignments = self.model.set_channel_images_async([green_path, self.test_image_path])
+        for _ in assignments:
+            delivered.get(timeout=5)()
+        
+        self.assertEqual(self.model.channel_paths[ChannelType.GREEN.value], green_path)
+        self.assertEqual(self.model.channel_paths[ChannelType.RED.value], self.test_image_path)
+    
+    def test_merge_refused_while_channels_load(self):
+        """Test that preview and save wait for every pending channel load"""
+        delivered = queue.Queue()
+        self.model.call_soon = delivered.put
+        
+        self.model.set_channel_image_async(ChannelType.RED.value, self.test_image_path)
+        with self.assertRaisesRegex(ValueError, "Channels still loading: R"):
+            self.model.create_merged_image()
+        
+        delivered.get(timeout=5)()
+        self.assertEqual(self.model.create_merged_image().size, (100, 100))
+        self.model.set_channel_image_async(ChannelType.GREEN.value, self.test_image_path)
+        with self.assertRaisesRegex(ValueError, "Channels still loading: G"):
+            self.model.save_merged_image(os.path.join(self.temp_dir, "merged.png"))
+        delivered.get(timeout=5)()
+
+
+class TestChannelUnpackerModel(unittest.TestCase):
+    """Test cases for ChannelUnpackerModel bulk runs"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for index, size in enumerate([16, 16, 96, 16, 128, 16]):
+            path = os.path.join(self.temp_dir, f"tex{index}.png")
+            Image.new("RGBA", (size, size), (index, 0, 0, 255)).save(path)
+            self.paths.append(path)
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def test_bulk_largest_first(self):
+        """Test that parallel runs start the most expensive files first but keep results in input order"""
+        started = []
+        
+        class RecordingModel(ChannelUnpackerModel):
+            def unpack_file(self, image_path, *args, **kwargs):
+                started.append(image_path)
+                return super().unpack_file(image_path, *args, **kwargs)
+        
+        output_dir = os.path.join(self.temp_dir, "out")
+        results = RecordingModel().bulk_unpack_channels(self.paths, output_dir, max_workers=2)
+        self.assertEqual(set(started[:2]), {self.paths[4], self.paths[2]})
+        self.assertEqual(list(results), self.paths)
+        
+        started.clear()
+        RecordingModel().bulk_unpack_channels(self.paths, output_dir, max_workers=1)
+        self.assertEqual(started, self.paths)  # One worker: order does not change the total time
+        
+        with self.assertRaises(ValueError):
+            ChannelUnpackerModel().bulk_unpack_channels(self.paths, output_dir, order="random")
+
+
+class TestZoomableImageViewer(unittest.TestCase):
+    """Test cases for ZoomableImageViewer viewport math"""
+    
+    def test_render_window_is_bounded_by_viewport(self):
+        """Test that only the visible region plus margin is rendered at high zoom"""
+        source_box, dest_box = ZoomableImageViewer.compute_render_window(
+            (4096, 4096), 10.0, (1000, 2000, 1600, 2600), margin=100
+        )
+        
+        self.assertEqual(dest_box, (900, 1900, 1700, 2700))
+        self.assertAlmostEqual(source_box[0], 90.0)
+        self.assertAlmostEqual(source_box[3], 270.0)
+    
+    def test_render_window_clamped_to_image(self):
+        """Test clamping when the view extends beyond the zoomed image"""
+        source_box, dest_box = ZoomableImageViewer.compute_render_window(
+            (100, 50), 0.5, (0, 0, 600, 600), margin=256
+        )
+        
+        self.assertEqual(dest_box, (0, 0, 50, 25))
+        self.assertEqual(source_box, (0.0, 0.0, 100, 50))
+    
+    def test_pyramid_level_selection(self):
+        """Test that the smallest level with enough resolution is chosen"""
+        pyramid = ImagePyramid(Image.new("RGB", (512, 256), (10, 20, 30)))
+        pyramid.build()
+        
+        self.assertEqual([level.size for level in pyramid.levels], [(512, 256), (256, 128), (128, 64)])
+        self.assertEqual(pyramid.level_for(0.3)[0].size, (256, 128))
+        self.assertEqual(pyramid.level_for(0.1)[0].size, (128, 64))
+        self.assertEqual(pyramid.level_for(2.0)[0].size, (512, 256))
 
 
 def run_tests():
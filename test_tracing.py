@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for pipeline tracing
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from PIL import Image
+from texture_processor import ImageProcessor
+from tracing import Tracer, TRACER
+
+
+class RecordingObserver:
+    """Observer collecting trace spans"""
+    
+    def __init__(self):
+        self.spans = []
+    
+    def on_trace_span(self, span):
+        self.spans.append(span)
+
+
+class TestTracer(unittest.TestCase):
+    """Test cases for Tracer"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.temp_dir, "packed.png")
+        Image.new("RGBA", (32, 32), (255, 0, 0, 0)).save(self.image_path)
+        self.observer = RecordingObserver()
+        TRACER.clear()
+        TRACER.add_observer(self.observer)
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        TRACER.disable()
+        TRACER.clear()
+        TRACER.remove_observer(self.observer)
+        shutil.rmtree(self.temp_dir)
+    
+    def test_disabled_tracer_records_nothing(self):
+        """Test that no spans are recorded while disabled"""
+        ImageProcessor.unpack_channels(self.image_path)
+        self.assertEqual(TRACER.spans, [])
+        self.assertEqual(self.observer.spans, [])
+    
+    def test_pipeline_stages_are_traced(self):
+        """Test per-file stage spans and Chrome trace output"""
+        TRACER.enable()
+        channels = ImageProcessor.unpack_channels(self.image_path, apply_gamma_correction=True)
+        ImageProcessor.save_channels(channels, self.temp_dir, "packed")
+        ImageProcessor.pack_channels(r_path=self.image_path, preserve_transparent=False)
+        
+        stages = {span.stage for span in TRACER.spans}
+        for stage in ["decode", "convert_rgba", "split", "gamma", "encode", "flatten", "merge"]:
+            self.assertIn(stage, stages)
+        self.assertEqual(len(self.observer.spans), len(TRACER.spans))
+        self.assertEqual(TRACER.spans[0].file, self.image_path)
+        
+        trace_path = os.path.join(self.temp_dir, "trace.json")
+        TRACER.write_chrome_trace(trace_path)
+        with open(trace_path) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), len(TRACER.spans))
+        self.assertEqual(events[0]["ph"], "X")
+    
+    def test_span_records_errors(self):
+        """Test that failing stages are still recorded"""
+        tracer = Tracer()
+        tracer.enable()
+        with self.assertRaises(RuntimeError):
+            with tracer.span("decode", "bad.png"):
+                raise RuntimeError("boom")
+        self.assertEqual(tracer.spans[0].args["error"], "RuntimeError")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for the watch-folder daemon
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from PIL import Image
+from scanner import path_matches
+from watch_folder import Debouncer, WatchFolderDaemon
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class JobRecorder:
+    def __init__(self):
+        self.done = []
+        self.failed = []
+        self.event = threading.Event()
+
+    def on_watch_job_done(self, job, inputs, outputs, seconds, latency):
+        self.done.append((job, outputs))
+        self.event.set()
+
+    def on_watch_job_failed(self, job, inputs, error):
+        self.failed.append((job, error))
+        self.event.set()
+
+    def wait(self, count: int, timeout: float = 10.0) -> bool:
+        while len(self.done) + len(self.failed) < count:
+            if not self.event.wait(timeout):
+                return False
+            self.event.clear()
+        return True
+
+
+class TestWatchFolder(unittest.TestCase):
+    """Test cases for debouncing and automatic processing"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.drop_dir = os.path.join(self.temp_dir, "drop")
+        self.output_dir = os.path.join(self.temp_dir, "output")
+        os.makedirs(self.drop_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def write_image(self, relative: str, mode: str = "RGBA", color=0) -> str:
+        path = os.path.join(self.drop_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.new(mode, (16, 16), color).save(path, format="PNG")
+        return path
+
+    def test_debouncer_waits_for_stable_files(self):
+        """Test that growing or empty files are held back until unchanged for the settle time"""
+        clock = FakeClock()
+        debouncer = Debouncer(settle_seconds=2.0, clock=clock)
+        path = os.path.join(self.drop_dir, "export.png")
+        with open(path, "wb") as f:
+            f.write(b"")
+        debouncer.touch(path)
+
+        clock.now = 5.0
+        self.assertEqual(debouncer.ready(), [])  # Empty: still being created
+
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        clock.now = 6.0
+        self.assertEqual(debouncer.ready(), [])  # Size changed
+        clock.now = 7.0
+        self.assertEqual(debouncer.ready(), [])  # Stable for 1s only
+        clock.now = 8.5
+        self.assertEqual(debouncer.ready(), [(path, 0.0)])
+        self.assertEqual(debouncer.pending_paths(), [])
+
+        debouncer.touch(os.path.join(self.drop_dir, "missing.png"))
+        self.assertEqual(debouncer.ready(), [])
+        self.assertEqual(debouncer.pending_paths(), [])
+
+    def test_path_matches(self):
+        """Test that single paths are filtered like scanned ones"""
+        root = self.drop_dir
+        self.assertTrue(path_matches(os.path.join(root, "sub", "a.png"), root))
+        self.assertFalse(path_matches(os.path.join(root, "a.txt"), root))
+        self.assertFalse(path_matches(os.path.join(root, "cache", "a.png"), root, exclude=["cache"]))
+        self.assertFalse(path_matches(os.path.join(self.temp_dir, "a.png"), root))
+
+    def test_unpack_new_files(self):
+        """Test that existing and newly dropped files are unpacked once settled"""
+        self.write_image("existing.png")
+        daemon = WatchFolderDaemon(self.drop_dir, self.output_dir, "unpack", settle_seconds=0.1,
+                                   poll_interval=0.05, backend="poll")
+        recorder = JobRecorder()
+        daemon.add_observer(recorder)
+        daemon.start(process_existing=True)
+        try:
+            self.write_image("sub/new.png")
+            self.assertTrue(recorder.wait(2))
+        finally:
+            daemon.stop()
+
+        self.assertEqual(recorder.failed, [])
+        self.assertEqual(sorted(job for job, _ in recorder.done), ["existing.png", os.path.join("sub", "new.png")])
+        self.assertTrue(os.path.isfile(os.path.join(self.output_dir, "sub", "new", "new_CHANNEL_A.png")))
+
+    def test_pack_channel_sets(self):
+        """Test that a channel set is packed once all its files have settled"""
+        daemon = WatchFolderDaemon(self.drop_dir, self.output_dir, "pack", settle_seconds=0.1,
+                                   poll_interval=0.05, backend="poll")
+        recorder = JobRecorder()
+        daemon.add_observer(recorder)
+        self.write_image("rock_r.png", "L", 10)
+        self.write_image("rock_g.png", "L", 20)
+        self.write_image("rock_b.png", "L", 30)
+        self.write_image("other.png")  # No channel suffix, not part of a set
+        daemon.start(process_existing=True)
+        try:
+            self.assertTrue(recorder.wait(1))
+        finally:
+            daemon.stop()
+
+        self.assertEqual(recorder.failed, [])
+        output_path = os.path.join(self.output_dir, "rock.png")
+        with Image.open(output_path) as packed:
+            self.assertEqual(packed.mode, "RGBA")
+            self.assertEqual(packed.getpixel((0, 0))[:3], (10, 20, 30))
+
+    def test_invalid_mode(self):
+        """Test that unknown modes are rejected"""
+        with self.assertRaises(ValueError):
+            WatchFolderDaemon(self.drop_dir, self.output_dir, "convert")
+
+
+if __name__ == '__main__':
+    unittest.main()
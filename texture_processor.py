@@ -1,15 +1,27 @@
 from PIL import Image, ImageTk
 import os
-from typing import Optional, Dict, List, Tuple, Union
+import math
+import hashlib
+from typing import Optional, Dict, Iterable, List, Tuple, Union, Callable
 import numpy as np
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinterdnd2 import TkinterDnD, DND_FILES
 from dataclasses import dataclass
 from enum import Enum
+import re
 import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
 import customtkinter as ctk
+from tracing import TRACER
+from profiling import profiled
+from memory_report import memory_tracked
+from event_bus import EventBus, EventSpec
+from sniffer import SniffResult, sniff_file, sniff_files
 
 class ChannelType(Enum):
     """Enum for channel types"""
@@ -19,6 +31,14 @@ class ChannelType(Enum):
     ALPHA = "A"
 
 
+class ResizePolicy(Enum):
+    """How channel images of different sizes are packed together"""
+    STRICT = "strict"                  # Reject size mismatches
+    MATCH_LARGEST = "match_largest"    # Upscale smaller planes to the largest image
+    MATCH_SMALLEST = "match_smallest"  # Downscale larger planes to the smallest image
+    EXPLICIT = "explicit"              # Resize every plane to a given size
+
+
 TEMP_DIR = "temp_channels"
 
 
@@ -26,13 +46,46 @@ TEMP_DIR = "temp_channels"
 @dataclass
 class ImageConfig:
     """Configuration class for image processing"""
-    SUPPORTED_FORMATS = [".png", ".dds"]
+    SUPPORTED_FORMATS = [".png", ".dds", ".tga", ".tif", ".tiff"]
     DROP_SIZE = (170, 170)
     PREVIEW_SIZE = (300, 300)
     CHANNEL_PREVIEW_SIZE = (180, 180)
     ZOOM_FACTOR = 1.2
     MAX_ZOOM = 10.0
     MIN_ZOOM = 0.1
+    VIEWER_RENDER_MARGIN = 256
+    VIEWER_REFINE_DELAY_MS = 150
+    PYRAMID_MIN_SIZE = 64
+    THUMBNAIL_CACHE_SIZE = 64
+    THUMBNAIL_DISK_CACHE_DIR = os.path.join(str(Path.home()), ".texture_processor", "thumbnails")
+    GRID_CELL_SIZE = (128, 128)
+    GRID_WORKERS = 4
+    LOAD_WORKERS = 4
+    BULK_LOG_CAPACITY = 1000
+    BULK_LOG_DIR = os.path.join(str(Path.home()), ".texture_processor", "logs")
+    DASHBOARD_REFRESH_MS = 500
+    BULK_MEMORY_BUDGET_FRACTION = 0.5
+    BULK_ORDER = "largest_first"
+    BULK_WORKERS = 4
+    WATCH_SETTLE_SECONDS = 2.0
+    WATCH_POLL_INTERVAL = 1.0
+    WATCH_WORKERS = 2
+    SERVICE_HOST = "127.0.0.1"
+    SERVICE_PORT = 8765
+    SERVICE_WORKERS = 4
+    SERVICE_JOB_HISTORY = 500
+    ASYNC_WORKERS = 4
+    ASYNC_CONCURRENCY = 8
+    CLUSTER_PORT = 8766
+    CLUSTER_SHARDS_PER_WORKER = 4
+    CLUSTER_MAX_ATTEMPTS = 3
+    DEFAULT_RESIZE_POLICY = ResizePolicy.STRICT
+    CHANNEL_SUFFIXES = {
+        "R": ("_r", "_red", "_channel_r"),
+        "G": ("_g", "_green", "_channel_g"),
+        "B": ("_b", "_blue", "_channel_b"),
+        "A": ("_a", "_alpha", "_channel_a"),
+    }
 
 
 class ImageProcessor:
@@ -40,14 +93,18 @@ class ImageProcessor:
     
     @staticmethod
     def validate_image_format(file_path: str) -> bool:
-        """Validate if file format is supported"""
+        """Validate if file format is supported: by content for existing files, else by extension"""
+        if os.path.isfile(file_path):
+            return sniff_file(file_path).ok
         return any(file_path.lower().endswith(fmt) for fmt in ImageConfig.SUPPORTED_FORMATS)
     
     @staticmethod
-    def validate_image_sizes(image_paths: List[Optional[str]]) -> Optional[Tuple[int, int]]:
+    def validate_image_sizes(image_paths: List[Optional[str]],
+                             policy: ResizePolicy = ResizePolicy.STRICT,
+                             target_size: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
         """
-        Validate that all images have the same size
-        Returns the size if valid, None if no images, raises ValueError if sizes mismatch
+        Validate image sizes against a resize policy and return the packed size
+        Returns None if no images; with the strict policy, raises ValueError if sizes mismatch
         """
         valid_paths = [path for path in image_paths if path is not None]
         
@@ -66,9 +123,31 @@ class ImageProcessor:
             except Exception as e:
                 raise ValueError(f"Cannot open image {path}: {e}")
         
+        return ImageProcessor.resolve_pack_size(
+            [(info["name"], info["size"]) for info in images_info], policy, target_size
+        )
+    
+    @staticmethod
+    def resolve_pack_size(named_sizes: List[Tuple[str, Tuple[int, int]]],
+                          policy: ResizePolicy = ResizePolicy.STRICT,
+                          target_size: Optional[Tuple[int, int]] = None) -> Tuple[int, int]:
+        """
+        Return the packed size for (name, size) pairs under a resize policy
+        Raises ValueError on a size mismatch with the strict policy
+        """
+        images_info = [{"name": name, "size": tuple(size)} for name, size in named_sizes]
+        if policy == ResizePolicy.EXPLICIT:
+            if target_size is None or min(target_size) < 1:
+                raise ValueError("An explicit target size is required for the explicit resize policy")
+            return tuple(target_size)
+        if policy == ResizePolicy.MATCH_SMALLEST:
+            return min(images_info, key=lambda i: i["size"][0] * i["size"][1])["size"]
+        
         # Find largest image by pixel count
         reference = max(images_info, key=lambda i: i["size"][0] * i["size"][1])
         expected_size = reference["size"]
+        if policy == ResizePolicy.MATCH_LARGEST:
+            return expected_size
         
         # Check all images have same size
         for img_info in images_info:
@@ -88,34 +167,65 @@ class ImageProcessor:
             return Image.new("L", size, 255)
         
         try:
-            img = Image.open(path).convert("RGBA")
-            
-            if img.size != size:
-                img = img.resize(size, Image.Resampling.BICUBIC)
+            with TRACER.span("decode", path):
+                img = Image.open(path)
+                img.load()
+            with TRACER.span("convert_rgba", path):
+                img = img.convert("RGBA")
             
             if not preserve_transparent:
-                # Convert transparent pixels to white
-                pixels = img.load()
-                for y in range(img.height):
-                    for x in range(img.width):
-                        r, g, b, a = pixels[x, y]
-                        if a == 0:
-                            pixels[x, y] = (255, 255, 255, 0)
+                with TRACER.span("flatten", path):
+                    # Convert transparent pixels to white
+                    pixels = img.load()
+                    for y in range(img.height):
+                        for x in range(img.width):
+                            r, g, b, a = pixels[x, y]
+                            if a == 0:
+                                pixels[x, y] = (255, 255, 255, 0)
+            
+            with TRACER.span("split", path):
+                plane = img.getchannel(0)  # Only the first channel is packed, as grayscale
             
-            return img.split()[0]  # Return only first channel as grayscale
+            if plane.size != size:
+                with TRACER.span("resize", path):
+                    plane = ImageProcessor.resize_plane(plane, size)
+            return plane
             
         except Exception as e:
             raise ValueError(f"Error loading image {path}: {e}")
     
+    @staticmethod
+    def resize_plane(plane: Image.Image, size: Tuple[int, int],
+                     resample: Image.Resampling = Image.Resampling.BICUBIC) -> Image.Image:
+        """
+        Resize a single channel plane
+        Downscaling by power-of-two factors uses integer reduce() first, so the filter
+        only runs when the remaining factor is not exact.
+        """
+        factors = []
+        for source, target in zip(plane.size, size):
+            factor = 1
+            while source >= target * factor * 2:
+                factor *= 2
+            factors.append(factor)
+        if max(factors) > 1:
+            plane = plane.reduce(tuple(factors))
+        if plane.size != size:
+            plane = plane.resize(size, resample)
+        return plane
+    
     @staticmethod
     def pack_channels(r_path: Optional[str] = None, g_path: Optional[str] = None, 
                      b_path: Optional[str] = None, a_path: Optional[str] = None,
-                     preserve_transparent: bool = True) -> Image.Image:
-        """Pack individual channel images into RGBA image"""
+                     preserve_transparent: bool = True,
+                     resize_policy: ResizePolicy = ResizePolicy.STRICT,
+                     target_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+        """Pack individual channel images into RGBA image, resizing planes as the policy allows"""
         paths = [r_path, g_path, b_path, a_path]
         
         # Validate sizes
-        size = ImageProcessor.validate_image_sizes(paths)
+        with TRACER.span("validate_sizes"):
+            size = ImageProcessor.validate_image_sizes(paths, resize_policy, target_size)
         if size is None:
             raise ValueError("No input images provided for channel packing")
         
@@ -125,17 +235,24 @@ class ImageProcessor:
         b = ImageProcessor.load_or_create_white_channel(b_path, size, preserve_transparent)
         a = ImageProcessor.load_or_create_white_channel(a_path, size, preserve_transparent)
         
-        return Image.merge("RGBA", (r, g, b, a))
+        with TRACER.span("merge"):
+            return Image.merge("RGBA", (r, g, b, a))
     
     @staticmethod
     def unpack_channels(image_path: str, apply_gamma_correction: bool = False) -> List[Image.Image]:
         """Unpack RGBA image into individual channel images"""
         try:
-            img = Image.open(image_path).convert("RGBA")
-            r, g, b, a = img.split()
+            with TRACER.span("decode", image_path):
+                img = Image.open(image_path)
+                img.load()
+            with TRACER.span("convert_rgba", image_path):
+                img = img.convert("RGBA")
+            with TRACER.span("split", image_path):
+                r, g, b, a = img.split()
             
             if apply_gamma_correction:
-                channels = [ImageProcessor._apply_gamma_correction(channel) for channel in [r, g, b, a]]
+                with TRACER.span("gamma", image_path):
+                    channels = [ImageProcessor._apply_gamma_correction(channel) for channel in [r, g, b, a]]
             else:
                 channels = [r, g, b, a]
             
@@ -154,11 +271,38 @@ class ImageProcessor:
         return Image.fromarray((arr * 255).astype("uint8"))
     
     @staticmethod
-    def create_thumbnail(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
-        """Create thumbnail of specified size"""
-        thumb = img.copy()
-        thumb.thumbnail(size, Image.Resampling.LANCZOS)
-        return thumb
+    def create_thumbnail(img: Image.Image, size: Tuple[int, int],
+                         source_key: Optional[tuple] = None) -> Image.Image:
+        """
+        Create thumbnail of specified size through the shared thumbnail cache
+        The returned image may be shared between callers and must not be modified
+        """
+        return THUMBNAIL_CACHE.get(img, size, source_key)
+    
+    @staticmethod
+    def save_image(image: Image.Image, file_path: str) -> int:
+        """
+        Encode image straight into a temporary file next to file_path, then move it into place;
+        the format follows the file extension and an existing file is only replaced on success
+        Returns the number of bytes written
+        """
+        image_format = Image.registered_extensions().get(os.path.splitext(file_path)[1].lower())
+        if image_format is None:
+            raise ValueError(f"Unknown file extension: {file_path}")
+        
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # Pillow writes while it encodes, so the span covers both
+            with TRACER.span("encode", file_path, format=image_format):
+                with open(temp_path, "wb") as f:
+                    image.save(f, format=image_format)
+                    size = f.tell()
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return size
     
     @staticmethod
     def save_channels(channels: List[Image.Image], output_dir: str, base_name: str) -> List[str]:
@@ -171,15 +315,208 @@ class ImageProcessor:
         for i, channel in enumerate(channels):
             filename = f"{base_name}_CHANNEL_{channel_names[i]}.png"
             filepath = os.path.join(output_dir, filename)
-            channel.save(filepath)
+            ImageProcessor.save_image(channel, filepath)
             saved_files.append(filepath)
         
         return saved_files
+    
+    @staticmethod
+    def save_channels_streaming(image_path: str, output_dir: str, base_name: str,
+                                apply_gamma_correction: bool = False) -> List[str]:
+        """
+        Unpack and save channels one at a time, for images too large to hold all four planes
+        The decoded image (and its RGBA copy for other modes) stays in memory, so the peak is
+        the full image plus one plane. Produces the same files as unpack_channels followed by
+        save_channels.
+        """
+        try:
+            with TRACER.span("decode", image_path):
+                img = Image.open(image_path)
+                img.load()
+            if img.mode != "RGBA":
+                with TRACER.span("convert_rgba", image_path):
+                    img = img.convert("RGBA")
+        except Exception as e:
+            raise ValueError(f"Error unpacking channels from {image_path}: {e}")
+        
+        os.makedirs(output_dir, exist_ok=True)
+        saved_files = []
+        for i, channel_name in enumerate(["R", "G", "B", "A"]):
+            channel = img.getchannel(i)
+            if apply_gamma_correction:
+                channel = ImageProcessor._apply_gamma_correction(channel)
+            filepath = os.path.join(output_dir, f"{base_name}_CHANNEL_{channel_name}.png")
+            ImageProcessor.save_image(channel, filepath)
+            saved_files.append(filepath)
+            del channel
+        return saved_files
+
+
+class ThumbnailCache:
+    """Small in-memory LRU cache of thumbnails shared by all preview widgets"""
+    
+    def __init__(self, max_entries: int = ImageConfig.THUMBNAIL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[Optional[weakref.ref], Image.Image]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def source_key(path: Optional[str]) -> Optional[tuple]:
+        """Build a cache key identifying a file on disk, or None if it is not a file"""
+        if not path or not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        return ("file", os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    
+    @staticmethod
+    def make_thumbnail(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        """Scale image to fit within size without copying the full-resolution source"""
+        scale = min(size[0] / img.width, size[1] / img.height, 1.0)
+        target = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        if target == img.size:
+            return img.copy()
+        
+        # Integer box reduction first, so the final filter only touches a small image
+        factor = min(img.width // target[0], img.height // target[1])
+        if factor >= 2:
+            try:
+                img = img.reduce(factor)
+            except ValueError:
+                pass  # Modes like I;16 and P are not supported by reduce()
+        return img.resize(target, Image.Resampling.LANCZOS)
+    
+    def get(self, img: Image.Image, size: Tuple[int, int],
+            source_key: Optional[tuple] = None) -> Image.Image:
+        """Return cached thumbnail for (source, size), creating it if needed"""
+        if source_key is None:
+            key = ("image", id(img), tuple(size))
+            ref = weakref.ref(img)
+        else:
+            key = (source_key, tuple(size))
+            ref = None
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            # Identity keys are only valid while the original object is alive
+            if entry is not None and (entry[0] is None or entry[0]() is img):
+                self._entries.move_to_end(key)
+                return entry[1]
+        
+        thumb = self.make_thumbnail(img, size)
+        
+        with self._lock:
+            self._entries[key] = (ref, thumb)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return thumb
+    
+    def clear(self):
+        """Drop all cached thumbnails"""
+        with self._lock:
+            self._entries.clear()
+    
+    def memory_usage(self) -> Dict[str, List[Image.Image]]:
+        """Return the image buffers held by each field"""
+        with self._lock:
+            return {"thumbnails": [thumb for _, thumb in self._entries.values()]}
+
+
+THUMBNAIL_CACHE = ThumbnailCache()
+
+
+class DiskThumbnailCache:
+    """Persistent thumbnail cache keyed by file path, modification time and thumbnail size"""
+    
+    def __init__(self, cache_dir: str = ImageConfig.THUMBNAIL_DISK_CACHE_DIR):
+        self.cache_dir = cache_dir
+    
+    def cache_path(self, image_path: str, size: Tuple[int, int]) -> str:
+        """Return the cache file path for an image at its current modification time"""
+        stat = os.stat(image_path)
+        key = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.png")
+    
+    def get(self, image_path: str, size: Tuple[int, int]) -> Image.Image:
+        """Load thumbnail from disk, generating and storing it on a cache miss"""
+        cached_path = self.cache_path(image_path, size)
+        if os.path.isfile(cached_path):
+            try:
+                with Image.open(cached_path) as cached:
+                    cached.load()
+                    return cached
+            except OSError:
+                pass  # Corrupt cache entry, regenerate below
+        
+        with Image.open(image_path) as img:
+            thumb = ThumbnailCache.make_thumbnail(img, size)
+        if thumb.mode not in ("L", "RGB", "RGBA"):
+            thumb = thumb.convert("RGBA")
+        
+        # Write atomically so concurrent readers never see a partial file
+        os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+        temp_path = f"{cached_path}.{threading.get_ident()}.tmp"
+        thumb.save(temp_path, format="PNG")
+        os.replace(temp_path, cached_path)
+        return thumb
+
+
+class ImagePyramid:
+    """Mip pyramid of an image, each level half the size of the previous one"""
+    
+    def __init__(self, image: Image.Image):
+        self.levels: List[Image.Image] = [image]
+        self.ready = False
+        self._lock = threading.Lock()
+    
+    def build(self):
+        """Build all levels down to ImageConfig.PYRAMID_MIN_SIZE"""
+        level = self.levels[0]
+        while min(level.size) // 2 >= ImageConfig.PYRAMID_MIN_SIZE:
+            try:
+                level = level.reduce(2)
+            except ValueError:
+                # Modes like I;16 and P are not supported by reduce()
+                level = level.resize((level.width // 2, level.height // 2), Image.Resampling.BOX)
+            with self._lock:
+                self.levels.append(level)
+        self.ready = True
+    
+    def build_async(self) -> threading.Thread:
+        """Build the pyramid in a background thread"""
+        thread = threading.Thread(target=self.build, daemon=True)
+        thread.start()
+        return thread
+    
+    def level_for(self, zoom: float) -> Tuple[Image.Image, float, float]:
+        """
+        Return the smallest built level that still has at least the requested resolution
+        Returns (level_image, x_scale, y_scale) with scales relative to the original image
+        """
+        with self._lock:
+            levels = list(self.levels)
+        
+        original = levels[0]
+        chosen = original
+        for level in levels[1:]:
+            if level.width / original.width < zoom or level.height / original.height < zoom:
+                break
+            chosen = level
+        return chosen, chosen.width / original.width, chosen.height / original.height
+    
+    def memory_usage(self) -> Dict[str, List[Image.Image]]:
+        """Return the image buffers held by each field (level 0 is the source image)"""
+        with self._lock:
+            return {"source": self.levels[:1], "levels": self.levels[1:]}
 
 
 class ZoomableImageViewer:
     """Reusable zoomable image viewer widget"""
     
+    # Open viewers, for memory reporting
+    instances: "weakref.WeakSet[ZoomableImageViewer]" = weakref.WeakSet()
+    
     def __init__(self, parent: tk.Widget, title: str = "Image Viewer"):
         self.window = tk.Toplevel(parent)
         self.window.title(title)
@@ -190,9 +527,24 @@ class ZoomableImageViewer:
         self.current_image = None
         self.photo = None
         self.image_item = None
+        self.rendered_box = None
+        self.pyramid: Optional[ImagePyramid] = None
+        self._render_pending = None
+        self._refine_pending = None
         
         self._setup_ui()
         self._bind_events()
+        ZoomableImageViewer.instances.add(self)
+    
+    def memory_usage(self) -> Dict[str, list]:
+        """Return the image buffers held by each field"""
+        usage = self.pyramid.memory_usage() if self.pyramid is not None else {"source": [], "levels": []}
+        return {
+            "original_image": usage["source"],
+            "pyramid_levels": usage["levels"],
+            "render_buffer": [self.current_image] if self.current_image is not None else [],
+            "photo": [self.photo] if self.photo is not None else [],
+        }
     
     def _setup_ui(self):
         """Setup the UI components"""
@@ -201,8 +553,8 @@ class ZoomableImageViewer:
         canvas_frame.pack(fill="both", expand=True)
         
         self.canvas = tk.Canvas(canvas_frame, bg="gray")
-        h_scrollbar = tk.Scrollbar(canvas_frame, orient="horizontal", command=self.canvas.xview)
-        v_scrollbar = tk.Scrollbar(canvas_frame, orient="vertical", command=self.canvas.yview)
+        h_scrollbar = tk.Scrollbar(canvas_frame, orient="horizontal", command=self._on_xscroll)
+        v_scrollbar = tk.Scrollbar(canvas_frame, orient="vertical", command=self._on_yscroll)
         self.canvas.configure(xscrollcommand=h_scrollbar.set, yscrollcommand=v_scrollbar.set)
         
         h_scrollbar.pack(side="bottom", fill="x")
@@ -212,37 +564,126 @@ class ZoomableImageViewer:
     def _bind_events(self):
         """Bind zoom and navigation events"""
         self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Configure>", lambda e: self._schedule_render())
         self.window.bind("<Key>", self._on_key_press)
         self.window.focus_set()
     
     def display_image(self, image: Image.Image):
         """Display an image in the viewer"""
         self.original_image = image
+        self.pyramid = ImagePyramid(image)
+        self.pyramid.build_async()
         self.zoom_factor = 1.0
         self._update_display()
     
+    @staticmethod
+    def compute_render_window(image_size: Tuple[int, int], zoom: float,
+                              view_box: Tuple[float, float, float, float],
+                              margin: int) -> Optional[Tuple[Tuple[float, float, float, float], Tuple[int, int, int, int]]]:
+        """
+        Compute the part of the image to render for the visible canvas area
+        Returns (source_box, dest_box) where source_box is in original image pixels and
+        dest_box is in zoomed canvas pixels, or None if nothing is visible
+        """
+        virtual_width = math.ceil(image_size[0] * zoom)
+        virtual_height = math.ceil(image_size[1] * zoom)
+        
+        x0 = max(0, int(view_box[0]) - margin)
+        y0 = max(0, int(view_box[1]) - margin)
+        x1 = min(virtual_width, math.ceil(view_box[2]) + margin)
+        y1 = min(virtual_height, math.ceil(view_box[3]) + margin)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        
+        source_box = (
+            x0 / zoom,
+            y0 / zoom,
+            min(x1 / zoom, image_size[0]),
+            min(y1 / zoom, image_size[1])
+        )
+        return source_box, (x0, y0, x1, y1)
+    
     def _update_display(self):
         """Update the display with current zoom"""
         if self.original_image is None:
             return
         
-        # Calculate new size
+        # The scroll region covers the whole zoomed image, but only the visible part is rendered
         original_size = self.original_image.size
-        new_width = int(original_size[0] * self.zoom_factor)
-        new_height = int(original_size[1] * self.zoom_factor)
+        virtual_width = math.ceil(original_size[0] * self.zoom_factor)
+        virtual_height = math.ceil(original_size[1] * self.zoom_factor)
+        self.canvas.configure(scrollregion=(0, 0, virtual_width, virtual_height))
+        
+        self._schedule_render()
+        self.window.title(f"Image Viewer - Zoom: {self.zoom_factor:.2f}x")
+    
+    def _render_viewport(self, refine: bool = True):
+        """
+        Render the visible canvas region plus a margin
+        A draft render uses a fast filter; the refine pass uses LANCZOS
+        """
+        if self.original_image is None:
+            return
+        
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        view_box = (left, top,
+                    left + max(self.canvas.winfo_width(), 1),
+                    top + max(self.canvas.winfo_height(), 1))
+        window = self.compute_render_window(
+            self.original_image.size, self.zoom_factor, view_box, ImageConfig.VIEWER_RENDER_MARGIN
+        )
+        if window is None:
+            return
         
-        # Resize image
-        self.current_image = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        source_box, dest_box = window
+        dest_size = (dest_box[2] - dest_box[0], dest_box[3] - dest_box[1])
+        
+        # Sample from the nearest pyramid level that still has enough resolution
+        source, x_scale, y_scale = self.pyramid.level_for(self.zoom_factor)
+        level_box = (source_box[0] * x_scale, source_box[1] * y_scale,
+                     source_box[2] * x_scale, source_box[3] * y_scale)
+        resample = Image.Resampling.LANCZOS if refine else Image.Resampling.BILINEAR
+        self.current_image = source.resize(dest_size, resample, box=level_box)
         self.photo = ImageTk.PhotoImage(self.current_image)
+        self.rendered_box = dest_box
         
         # Update canvas
         if self.image_item:
             self.canvas.delete(self.image_item)
-        self.image_item = self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+        self.image_item = self.canvas.create_image(dest_box[0], dest_box[1], anchor="nw", image=self.photo)
+    
+    def _schedule_render(self):
+        """
+        Coalesce redraw requests: one draft render once pending events are processed,
+        followed by a high-quality refine pass after input has settled
+        """
+        if self._render_pending is None:
+            self._render_pending = self.window.after_idle(self._render_draft)
         
-        # Update scroll region and title
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        self.window.title(f"Image Viewer - Zoom: {self.zoom_factor:.2f}x")
+        if self._refine_pending is not None:
+            self.window.after_cancel(self._refine_pending)
+        self._refine_pending = self.window.after(ImageConfig.VIEWER_REFINE_DELAY_MS, self._render_refined)
+    
+    def _render_draft(self):
+        """Draw the viewport quickly from the nearest pyramid level"""
+        self._render_pending = None
+        self._render_viewport(refine=False)
+    
+    def _render_refined(self):
+        """Redraw the viewport with a high-quality filter"""
+        self._refine_pending = None
+        self._render_viewport(refine=True)
+    
+    def _on_xscroll(self, *args):
+        """Handle horizontal scrollbar movement"""
+        self.canvas.xview(*args)
+        self._schedule_render()
+    
+    def _on_yscroll(self, *args):
+        """Handle vertical scrollbar movement"""
+        self.canvas.yview(*args)
+        self._schedule_render()
     
     def _zoom(self, factor: float):
         """Apply zoom factor"""
@@ -272,8 +713,14 @@ class ZoomableImageViewer:
 class FileDropHandler:
     """Handles file drop operations with validation"""
     
-    def __init__(self, on_file_dropped_callback):
+    def __init__(self, on_file_dropped_callback, on_files_dropped_callback=None):
         self.on_file_dropped = on_file_dropped_callback
+        self.on_files_dropped = on_files_dropped_callback
+    
+    @staticmethod
+    def parse_drop_data(data: str) -> List[str]:
+        """Split dropped data into paths; paths containing spaces are wrapped in braces"""
+        return [braced or plain for braced, plain in re.findall(r"\{([^}]*)\}|(\S+)", data)]
     
     def handle_drop(self, event, **kwargs):
         """Handle file drop event with validation"""
@@ -282,22 +729,22 @@ class FileDropHandler:
             if not filepaths_raw:
                 return
             
-            raw = filepaths_raw.strip("{}")
-            path = raw.split()[-1]
-            
-            if not os.path.isfile(path):
-                print(
-                    f"Dropped item is not a valid file: {path}\n",
-                    f"path: {path}\n",
-                    f"filepaths_raw: {filepaths_raw}"
-                    
-                )
-                raise ValueError(f"Not a valid file: {path}")
-            
-            if not ImageProcessor.validate_image_format(path):
-                raise ValueError(f"Unsupported file format. Please use: {', '.join(ImageConfig.SUPPORTED_FORMATS)}")
+            paths = self.parse_drop_data(filepaths_raw)
+            for path in paths:
+                if not os.path.isfile(path):
+                    print(
+                        f"Dropped item is not a valid file: {path}\n",
+                        f"filepaths_raw: {filepaths_raw}"
+                    )
+                    raise ValueError(f"Not a valid file: {path}")
+                
+                if not ImageProcessor.validate_image_format(path):
+                    raise ValueError(f"Unsupported file format. Please use: {', '.join(ImageConfig.SUPPORTED_FORMATS)}")
             
-            self.on_file_dropped(path, **kwargs)
+            if self.on_files_dropped is not None:
+                self.on_files_dropped(paths, **kwargs)
+            elif paths:
+                self.on_file_dropped(paths[-1], **kwargs)
             
         except Exception as e:
             messagebox.showerror("File Drop Error", str(e))
@@ -306,6 +753,16 @@ class FileDropHandler:
 class ChannelPackerModel:
     """Model class for channel packing functionality"""
     
+    EVENTS = (
+        EventSpec("channel_updated", ("channel", "image", "path")),
+        EventSpec("channel_loading", ("channel", "path")),
+        EventSpec("channel_load_error", ("channel", "path", "error")),
+        EventSpec("channel_cleared", ("channel",)),
+        EventSpec("image_loaded", ("image", "path")),
+        EventSpec("image_merged", ("image",)),
+        EventSpec("image_saved", ("path",)),
+    )
+    
     def __init__(self):
         self.channel_paths: Dict[str, Optional[str]] = {ch.value: None for ch in ChannelType}
         self.channel_images: Dict[str, Image.Image] = {}
@@ -313,17 +770,33 @@ class ChannelPackerModel:
         self.original_channel_paths: Dict[str, Optional[str]] = {ch.value: None for ch in ChannelType}
         self.original_channel_images: Dict[str, Image.Image] = {}
         self.merged_image: Optional[Image.Image] = None
-        self.observers = []
+        self.resize_policy = ImageConfig.DEFAULT_RESIZE_POLICY
+        self.target_size: Optional[Tuple[int, int]] = None
+        self.events = EventBus(self.EVENTS)
+        # Background decoding; call_soon delivers results to the thread that owns the model
+        self.call_soon: Callable[[Callable[[], None]], None] = lambda callback: callback()
+        self.load_executor: Optional[ThreadPoolExecutor] = None
+        self._load_tokens: Dict[str, object] = {}
+    
+    @property
+    def observers(self) -> list:
+        return self.events.observers
     
     def add_observer(self, observer):
         """Add observer for model changes"""
-        self.observers.append(observer)
+        self.events.subscribe(observer)
     
     def notify_observers(self, event: str, **kwargs):
         """Notify all observers of changes"""
-        for observer in self.observers:
-            if hasattr(observer, f'on_{event}'):
-                getattr(observer, f'on_{event}')(**kwargs)
+        self.events.publish(event, **kwargs)
+    
+    def memory_usage(self) -> Dict[str, List[Image.Image]]:
+        """Return the image buffers held by each field"""
+        return {
+            "channel_images": list(self.channel_images.values()),
+            "original_channel_images": list(self.original_channel_images.values()),
+            "merged_image": [self.merged_image] if self.merged_image is not None else [],
+        }
     
     def set_channel_image_with_another_channel(self, curr_channel: str, source_channel: str):
         """Set image for a specific channel using another channel's image"""
@@ -442,20 +915,106 @@ class ChannelPackerModel:
         """Set image for a specific channel"""
         try:
             image = Image.open(image_path)
-            
-            # Store as original if this is the first time setting this channel
-            if channel not in self.channel_images:
-                self.original_channel_paths[channel] = image_path
-                self.original_channel_images[channel] = image
-            
-            self.channel_paths[channel] = image_path
-            self.channel_images[channel] = image
-            self.notify_observers('channel_updated', channel=channel, image=image, path=image_path)
         except Exception as e:
             raise ValueError(f"Error loading image for channel {channel}: {e}")
+        
+        self._load_tokens.pop(channel, None)
+        self._apply_channel_image(channel, image_path, image)
+    
+    def _apply_channel_image(self, channel: str, image_path: str, image: Image.Image):
+        """Store a loaded image for a channel and notify observers"""
+        # Store as original if this is the first time setting this channel
+        if channel not in self.channel_images:
+            self.original_channel_paths[channel] = image_path
+            self.original_channel_images[channel] = image
+        
+        self.channel_paths[channel] = image_path
+        self.channel_images[channel] = image
+        self.notify_observers('channel_updated', channel=channel, image=image, path=image_path)
+    
+    @staticmethod
+    def assign_files_to_channels(paths: List[str], start_channel: str = ChannelType.RED.value) -> Dict[str, str]:
+        """
+        Assign dropped files to channels
+        Files whose name ends with a known channel suffix (e.g. _R, _green, _CHANNEL_B) go to that
+        channel; the rest fill the remaining channels in drop order starting at start_channel.
+        Files beyond the four channels are ignored.
+        """
+        channels = [ch.value for ch in ChannelType]
+        assignments: Dict[str, str] = {}
+        unmatched = []
+        
+        for path in paths:
+            stem = Path(path).stem.lower()
+            matched = next(
+                (ch for ch, suffixes in ImageConfig.CHANNEL_SUFFIXES.items()
+                 if ch not in assignments and stem.endswith(suffixes)),
+                None
+            )
+            if matched is None:
+                unmatched.append(path)
+            else:
+                assignments[matched] = path
+        
+        start = channels.index(start_channel)
+        free_channels = [ch for ch in channels[start:] + channels[:start] if ch not in assignments]
+        for channel, path in zip(free_channels, unmatched):
+            assignments[channel] = path
+        
+        return assignments
+    
+    @staticmethod
+    def _decode_image(image_path: str) -> Image.Image:
+        """Fully decode an image and warm its thumbnail; runs on a worker thread"""
+        image = Image.open(image_path)
+        image.load()
+        ImageProcessor.create_thumbnail(image, ImageConfig.DROP_SIZE, ThumbnailCache.source_key(image_path))
+        return image
+    
+    def set_channel_image_async(self, channel: str, image_path: str) -> Future:
+        """
+        Decode image for a channel in the background
+        Observers get 'channel_loading' immediately and 'channel_updated' or 'channel_load_error'
+        (delivered through call_soon) once decoding finishes. A newer load or clear for the same
+        channel supersedes this one.
+        """
+        if self.load_executor is None:
+            self.load_executor = ThreadPoolExecutor(max_workers=ImageConfig.LOAD_WORKERS)
+        
+        token = object()
+        self._load_tokens[channel] = token
+        self.notify_observers('channel_loading', channel=channel, path=image_path)
+        
+        future = self.load_executor.submit(self._decode_image, image_path)
+        future.add_done_callback(
+            lambda f: self.call_soon(lambda: self._finish_channel_load(channel, image_path, token, f))
+        )
+        return future
+    
+    def set_channel_images_async(self, paths: List[str], start_channel: str = ChannelType.RED.value) -> Dict[str, str]:
+        """Assign several files to channels and decode them concurrently"""
+        assignments = self.assign_files_to_channels(paths, start_channel)
+        for channel, path in assignments.items():
+            self.set_channel_image_async(channel, path)
+        return assignments
+    
+    def _finish_channel_load(self, channel: str, image_path: str, token: object, future: Future):
+        """Apply a finished background decode unless it has been superseded"""
+        if self._load_tokens.get(channel) is not token:
+            return
+        del self._load_tokens[channel]
+        
+        try:
+            image = future.result()
+        except Exception as e:
+            self.notify_observers('channel_load_error', channel=channel, path=image_path,
+                                  error=f"Error loading image for channel {channel}: {e}")
+            return
+        self._apply_channel_image(channel, image_path, image)
     
     def clear_channel(self, channel: str):
         """Clear a specific channel"""
+        self._load_tokens.pop(channel, None)
         self.channel_paths[channel] = None
         self.channel_images.pop(channel, None)
         
@@ -465,20 +1024,32 @@ class ChannelPackerModel:
         
         self.notify_observers('channel_cleared', channel=channel)
     
+    def _check_loaded(self):
+        """Raise while background loads are pending, so a merge never silently skips a channel"""
+        if self._load_tokens:
+            raise ValueError(f"Channels still loading: {', '.join(sorted(self._load_tokens))}")
+    
+    @profiled("create_merged_image")
+    @memory_tracked("create_merged_image")
     def create_merged_image(self, target_bit_depth: int = 8) -> Image.Image:
         """Create merged image from all channels with specified bit depth"""
+        self._check_loaded()
         try:
             # First create the merged RGBA image
             print("Creating merged image with channels:", self.channel_paths)
-            merged_rgba = ImageProcessor.pack_channels(
-                r_path=self.channel_paths[ChannelType.RED.value],
-                g_path=self.channel_paths[ChannelType.GREEN.value],
-                b_path=self.channel_paths[ChannelType.BLUE.value],
-                a_path=self.channel_paths[ChannelType.ALPHA.value]
-            )
+            with TRACER.span("pack_channels"):
+                merged_rgba = ImageProcessor.pack_channels(
+                    r_path=self.channel_paths[ChannelType.RED.value],
+                    g_path=self.channel_paths[ChannelType.GREEN.value],
+                    b_path=self.channel_paths[ChannelType.BLUE.value],
+                    a_path=self.channel_paths[ChannelType.ALPHA.value],
+                    resize_policy=self.resize_policy,
+                    target_size=self.target_size
+                )
             
             # Apply bit depth conversion
-            self.merged_image = self._convert_to_target_format(merged_rgba, target_bit_depth)
+            with TRACER.span("convert_bit_depth", bit_depth=target_bit_depth):
+                self.merged_image = self._convert_to_target_format(merged_rgba, target_bit_depth)
             self.notify_observers('image_merged', image=self.merged_image)
             return self.merged_image
         except Exception as e:
@@ -505,9 +1076,10 @@ class ChannelPackerModel:
         """Save the merged image"""
         if self.merged_image is None:
             raise ValueError("No merged image to save")
+        self._check_loaded()
         
         try:
-            self.merged_image.save(output_path)
+            ImageProcessor.save_image(self.merged_image, output_path)
             
             self.notify_observers('image_saved', path=output_path)
         except Exception as e:
@@ -517,22 +1089,41 @@ class ChannelPackerModel:
 class ChannelUnpackerModel:
     """Model class for channel unpacking functionality"""
     
+    EVENTS = (
+        EventSpec("image_loaded", ("image", "path")),
+        EventSpec("channels_unpacked", ("channels",)),
+        EventSpec("channels_saved", ("files",)),
+        EventSpec("bulk_progress", ("progress", "total", "current_file"), coalesce=True),
+        EventSpec("bulk_channels_unpacked", ("current_file", "saved_files", "progress", "total")),
+        EventSpec("bulk_unpack_error", ("file", "error", "progress", "total")),
+        EventSpec("bulk_unpack_completed", ("results",)),
+    )
+    
     def __init__(self):
         self.source_image: Optional[Image.Image] = None
         self.source_path: Optional[str] = None
         self.unpacked_channels: List[Image.Image] = []
         self.apply_gamma_correction = False
-        self.observers = []
+        self.events = EventBus(self.EVENTS)
+    
+    @property
+    def observers(self) -> list:
+        return self.events.observers
     
     def add_observer(self, observer):
         """Add observer for model changes"""
-        self.observers.append(observer)
+        self.events.subscribe(observer)
     
     def notify_observers(self, event: str, **kwargs):
         """Notify all observers of changes"""
-        for observer in self.observers:
-            if hasattr(observer, f'on_{event}'):
-                getattr(observer, f'on_{event}')(**kwargs)
+        self.events.publish(event, **kwargs)
+    
+    def memory_usage(self) -> Dict[str, List[Image.Image]]:
+        """Return the image buffers held by each field"""
+        return {
+            "source_image": [self.source_image] if self.source_image is not None else [],
+            "unpacked_channels": list(self.unpacked_channels),
+        }
     
     def load_image(self, image_path: str):
         """Load image for unpacking"""
@@ -543,79 +1134,323 @@ class ChannelUnpackerModel:
         except Exception as e:
             raise ValueError(f"Error loading image: {e}")
     
-    def bulk_unpack_channels(self, image_paths: List[str], output_dir: str, progress_callback=None) -> Dict[str, List[str]]:
+    @profiled("bulk_unpack_channels")
+    @memory_tracked("bulk_unpack_channels")
+    def bulk_unpack_channels(self, image_paths: Iterable[str], output_dir: str, progress_callback=None,
+                             max_workers: int = 1, metrics=None, input_root: Optional[str] = None,
+                             memory_budget: Optional[int] = None, order: Optional[str] = None,
+                             file_timeout: Optional[float] = None,
+                             memory_limit: Optional[int] = None) -> Dict[str, List[str]]:
         """
         Bulk unpack multiple images into channels
         
         Args:
-            image_paths: List of image file paths to process
+            image_paths: Image file paths to process; may be a lazy iterator (e.g. scanner.scan_images),
+                in which case processing starts before it is exhausted and totals are reported as None
             output_dir: Directory to save unpacked channels
             progress_callback: Optional callback function for progress updates (current_index, total_count, current_file)
+            max_workers: Number of worker threads; progress_callback is always called from the
+                calling thread, observers too unless the model's event bus is attached to a UI
+            metrics: Optional metrics.BulkMetricsCollector receiving per-file timings and sizes
+            input_root: Optional folder the inputs were found under; outputs mirror their
+                location below it instead of all going directly into output_dir
+            memory_budget: Optional limit in bytes on the estimated memory of files processed at
+                once (see admission.MemoryBudget); files larger than the budget run alone on a
+                low-memory path
+            order: "input" to process files in the given order, or "largest_first" to start the
+                files with the highest estimated cost first, so a few large textures do not run
+                on their own at the end of a parallel run (default: ImageConfig.BULK_ORDER).
+                Only applies to lists and tuples with max_workers > 1; results keep the input order.
+            file_timeout: Optional wall-clock limit in seconds per file
+            memory_limit: Optional limit in bytes on the memory a worker may allocate per file.
+                With file_timeout or memory_limit, files are processed by max_workers separate
+                processes (see isolation.IsolatedWorkerPool); a file that times out, runs out of
+                memory or crashes its worker is recorded as an error and the worker is replaced.
+                Cannot be combined with memory_budget.
         
         Returns:
             Dictionary mapping source file paths to their saved channel file paths
         """
-        if not image_paths:
-            raise ValueError("No image paths provided for bulk unpacking")
+        if isinstance(image_paths, (list, tuple)):
+            if not image_paths:
+                raise ValueError("No image paths provided for bulk unpacking")
+            total_count = len(image_paths)
+        else:
+            total_count = None
+        
+        order = order or ImageConfig.BULK_ORDER
+        if order not in ("input", "largest_first"):
+            raise ValueError(f"Unknown bulk order: {order}")
+        isolated = file_timeout is not None or memory_limit is not None
+        if isolated and memory_budget is not None:
+            raise ValueError("memory_budget cannot be combined with isolated workers; use memory_limit")
+        # Each file's header is read once; the result is reused for ordering, admission and unpacking
+        sniffs: Dict[str, SniffResult] = {}
+        input_order = None
+        if order == "largest_first" and total_count is not None and max_workers > 1:
+            from planner import order_by_cost, probe_file
+            input_order = list(image_paths)
+            sniffs = dict(zip(input_order, sniff_files(input_order)))
+            image_paths = order_by_cost(input_order, self.apply_gamma_correction,
+                                        probes=[probe_file(path, sniffs[path]) for path in input_order])
         
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
         results = {}
-        total_count = len(image_paths)
+        consumed = []
+        rejected = []
+        if metrics is not None:
+            metrics.start_run(total_count)
         
-        for i, image_path in enumerate(image_paths):
-            try:
-                # Update progress if callback provided
-                if progress_callback:
-                    progress_callback(i, total_count, image_path)
-                
-                # Validate image format
-                if not ImageProcessor.validate_image_format(image_path):
-                    raise ValueError(f"Unsupported image format: {image_path}")
-                
-                # Unpack channels
-                channels = ImageProcessor.unpack_channels(image_path, self.apply_gamma_correction)
-                
-                # Generate base filename
-                base_name = Path(image_path).stem
-                
-                # Create a new folder for each image to put the channels
-                image_output_dir = os.path.join(output_dir, base_name)
-                os.makedirs(image_output_dir, exist_ok=True)
-                
-                # Save channels
-                saved_files = ImageProcessor.save_channels(channels, image_output_dir, base_name)
-                results[image_path] = saved_files
-                
-                self.notify_observers('bulk_channels_unpacked',
-                                    current_file=image_path, 
-                                    saved_files=saved_files,
-                                    progress=i + 1,
-                                    total=total_count)
-                
-            except Exception as e:
-                error_msg = f"Error processing {image_path}: {e}"
+        def tracked_paths():
+            for path in image_paths:
+                consumed.append(path)
+                # Unsupported and truncated files are rejected from their header, before they are queued
+                sniffed = sniffs.get(path) or sniff_file(path)
+                sniffs[path] = sniffed
+                if not sniffed.ok:
+                    if metrics is not None:
+                        metrics.file_started()
+                        metrics.record_file(path, 0.0, error=sniffed.error)
+                    rejected.append((path, ValueError(sniffed.error)))
+                    continue
+                yield path
+        
+        unpack = lambda path, *args: self.unpack_file(path, *args, sniffed=sniffs.pop(path, None))
+        if memory_budget is not None:
+            from admission import MemoryBudget
+            budget = MemoryBudget(memory_budget)
+            unpack = lambda path, *args: self._unpack_within_budget(budget, path, *args,
+                                                                    sniffed=sniffs.pop(path, None))
+        
+        if isolated:
+            outcomes = self._iter_isolated_outcomes(tracked_paths(), total_count, output_dir, progress_callback,
+                                                    max_workers, metrics, input_root, file_timeout, memory_limit,
+                                                    sniffs)
+        else:
+            outcomes = self._iter_bulk_outcomes(tracked_paths(), total_count, output_dir, progress_callback,
+                                                max_workers, metrics, input_root, unpack)
+        
+        def with_rejected():
+            for outcome in outcomes:
+                while rejected:
+                    yield rejected.pop(0)
+                yield outcome
+            while rejected:
+                yield rejected.pop(0)
+        
+        for i, (image_path, outcome) in enumerate(with_rejected()):
+            if isinstance(outcome, Exception):
+                error_msg = f"Error processing {image_path}: {outcome}"
                 results[image_path] = error_msg
                 self.notify_observers('bulk_unpack_error', 
                                     file=image_path, 
                                     error=error_msg,
                                     progress=i + 1,
                                     total=total_count)
+            else:
+                results[image_path] = outcome
+                self.notify_observers('bulk_channels_unpacked',
+                                    current_file=image_path, 
+                                    saved_files=outcome,
+                                    progress=i + 1,
+                                    total=total_count)
+            self.notify_observers('bulk_progress', progress=i + 1, total=total_count, current_file=image_path)
+        
+        # Keep results in input order regardless of processing and completion order
+        results = {path: results[path] for path in (input_order or consumed)}
+        if metrics is not None:
+            metrics.finish_run()
+        if not results:
+            raise ValueError("No image paths provided for bulk unpacking")
         
         # Notify completion
         self.notify_observers('bulk_unpack_completed', results=results)
         return results
     
+    def _iter_bulk_outcomes(self, image_paths: Iterable[str], total_count: Optional[int], output_dir: str,
+                            progress_callback, max_workers: int, metrics=None, input_root: Optional[str] = None,
+                            unpack: Optional[Callable] = None):
+        """Yield (image_path, saved_files or exception) as files finish processing"""
+        unpack = unpack or self.unpack_file
+        if max_workers <= 1:
+            for i, image_path in enumerate(image_paths):
+                # Update progress if callback provided
+                if progress_callback:
+                    progress_callback(i, total_count, image_path)
+                try:
+                    saved_files = unpack(image_path, output_dir, metrics, input_root)
+                except Exception as e:
+                    yield image_path, e
+                    continue
+                yield image_path, saved_files
+            return
+        
+        # Keep a bounded number of files in flight so lazy inputs are consumed as workers free up
+        paths = iter(image_paths)
+        max_in_flight = max_workers * 2
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            
+            def submit_next() -> bool:
+                path = next(paths, None)
+                if path is None:
+                    return False
+                futures[executor.submit(unpack, path, output_dir, metrics, input_root)] = path
+                return True
+            
+            while len(futures) < max_in_flight and submit_next():
+                pass
+            i = 0
+            while futures:
+                done = next(as_completed(futures))
+                image_path = futures.pop(done)
+                submit_next()
+                if progress_callback:
+                    progress_callback(i, total_count, image_path)
+                i += 1
+                try:
+                    saved_files = done.result()
+                except Exception as e:
+                    yield image_path, e
+                    continue
+                yield image_path, saved_files
+    
+    def _iter_isolated_outcomes(self, image_paths: Iterable[str], total_count: Optional[int], output_dir: str,
+                                progress_callback, max_workers: int, metrics=None, input_root: Optional[str] = None,
+                                file_timeout: Optional[float] = None, memory_limit: Optional[int] = None,
+                                sniffs: Optional[Dict[str, SniffResult]] = None):
+        """Yield (image_path, saved_files or exception) from crash-isolated worker processes"""
+        from isolation import IsolatedWorkerPool
+        started = {}
+        
+        def on_start(image_path: str):
+            started[image_path] = time.perf_counter()
+            if metrics is not None:
+                metrics.file_started()
+        
+        with IsolatedWorkerPool(max_workers, file_timeout, memory_limit, self.apply_gamma_correction) as pool:
+            outcomes = pool.unpack(image_paths, output_dir, input_root, on_start, sniffs)
+            for i, (image_path, outcome) in enumerate(outcomes):
+                if progress_callback:
+                    progress_callback(i, total_count, image_path)
+                seconds = time.perf_counter() - started.pop(image_path, time.perf_counter())
+                if isinstance(outcome, Exception):
+                    if metrics is not None:
+                        metrics.record_file(image_path, seconds, error=str(outcome))
+                    yield image_path, outcome
+                    continue
+                saved_files, pixels = outcome
+                if metrics is not None:
+                    metrics.record_file(
+                        image_path,
+                        seconds,
+                        bytes_read=os.path.getsize(image_path),
+                        bytes_written=sum(os.path.getsize(path) for path in saved_files),
+                        pixels=pixels
+                    )
+                yield image_path, saved_files
+    
+    @staticmethod
+    def output_dir_for(image_path: str, output_dir: str, input_root: Optional[str] = None) -> str:
+        """Folder for an image's channels, mirroring its location below input_root"""
+        base_dir = output_dir
+        if input_root:
+            relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(image_path)), os.path.abspath(input_root))
+            if relative_dir != "." and not relative_dir.startswith(".."):
+                base_dir = os.path.join(output_dir, relative_dir)
+        return os.path.join(base_dir, Path(image_path).stem)
+    
+    def _unpack_within_budget(self, budget, image_path: str, output_dir: str, metrics=None,
+                              input_root: Optional[str] = None, sniffed: Optional[SniffResult] = None) -> List[str]:
+        """Unpack one image once its estimated memory fits into the budget"""
+        from admission import estimate_unpack_bytes
+        sniffed = sniffed or sniff_file(image_path)
+        nbytes = estimate_unpack_bytes(image_path, self.apply_gamma_correction, sniffed)
+        with budget.reserve(nbytes):
+            return self.unpack_file(image_path, output_dir, metrics, input_root,
+                                    low_memory=budget.oversized(nbytes), sniffed=sniffed)
+    
+    def unpack_file(self, image_path: str, output_dir: str, metrics=None,
+                    input_root: Optional[str] = None, low_memory: bool = False,
+                    sniffed: Optional[SniffResult] = None) -> List[str]:
+        """
+        Unpack one image into its own folder under output_dir and return the saved channel files
+        
+        Args:
+            image_path: Image to unpack
+            output_dir: Directory the image's channel folder is created in
+            metrics: Optional metrics.BulkMetricsCollector receiving the file's timing and sizes
+            input_root: Optional folder the image was found under; its channel folder mirrors
+                the image's location below it (see output_dir_for)
+            low_memory: Extract and save one plane at a time instead of all four
+                (see ImageProcessor.save_channels_streaming)
+            sniffed: The image's sniffer.SniffResult, if the caller has already read its header
+        
+        Raises ValueError if the image cannot be read or unpacked.
+        """
+        if metrics is not None:
+            metrics.file_started()
+        start = time.perf_counter()
+        try:
+            # Validate image format from the file header
+            sniffed = sniffed or sniff_file(image_path)
+            if not sniffed.ok:
+                raise ValueError(sniffed.error)
+            
+            with TRACER.span("bulk_file", image_path):
+                # Generate base filename
+                base_name = Path(image_path).stem
+                
+                # Create a new folder for each image to put the channels
+                image_output_dir = self.output_dir_for(image_path, output_dir, input_root)
+                
+                if low_memory:
+                    # Full decoded image plus one plane at a time, instead of all four planes
+                    saved_files = ImageProcessor.save_channels_streaming(
+                        image_path, image_output_dir, base_name, self.apply_gamma_correction
+                    )
+                    if sniffed.size:
+                        pixels = sniffed.size[0] * sniffed.size[1]
+                    else:
+                        with Image.open(image_path) as img:
+                            pixels = img.width * img.height
+                else:
+                    # Unpack channels
+                    channels = ImageProcessor.unpack_channels(image_path, self.apply_gamma_correction)
+                    pixels = channels[0].width * channels[0].height
+                    os.makedirs(image_output_dir, exist_ok=True)
+                    
+                    # Save channels
+                    saved_files = ImageProcessor.save_channels(channels, image_output_dir, base_name)
+        except Exception as e:
+            if metrics is not None:
+                metrics.record_file(image_path, time.perf_counter() - start, error=str(e))
+            raise
+        
+        if metrics is not None:
+            metrics.record_file(
+                image_path,
+                time.perf_counter() - start,
+                bytes_read=os.path.getsize(image_path),
+                bytes_written=sum(os.path.getsize(path) for path in saved_files),
+                pixels=pixels
+            )
+        return saved_files
+    
+    @profiled("unpack_channels")
+    @memory_tracked("unpack_channels")
     def unpack_channels(self):
         """Unpack the loaded image into channels"""
         if self.source_path is None:
             raise ValueError("No image loaded to unpack")
         
         try:
-            self.unpacked_channels = ImageProcessor.unpack_channels(
-                self.source_path, self.apply_gamma_correction
-            )
+            with TRACER.span("unpack_channels", self.source_path):
+                self.unpacked_channels = ImageProcessor.unpack_channels(
+                    self.source_path, self.apply_gamma_correction
+                )
             self.notify_observers('channels_unpacked', channels=self.unpacked_channels)
             return self.unpacked_channels
         except Exception as e:
@@ -7,6 +7,17 @@ import customtkinter as ctk
 from CTkColorPicker import *
 from tkinter import colorchooser
 from os.path import isfile, join
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from metrics import BulkMetricsCollector
+from bulk_log import BulkLog
+from planner import plan_unpack
+from scanner import scan_images, parse_patterns, default_include_patterns
+from admission import default_memory_budget
+from event_bus import EventBus, EventSpec
+from profiling import PROFILER
+from memory_report import MEMORY_TRACKER, build_report, format_bytes
+from stall_watchdog import WATCHDOG
 
 def get_color_bit_depth(im: Image.Image) -> Tuple[int, int]:
     mode = im.mode
@@ -65,12 +76,27 @@ class BasePanel:
         self.parent = parent
         self.frame = tk.Frame(parent)
         self.status_label = None
+        self.pending_callbacks = queue.Queue()
         self._setup_ui()
+        self._process_pending_callbacks()
     
     def _setup_ui(self):
         """Override in subclasses"""
         pass
     
+    def _call_soon(self, callback):
+        """Queue a callback from a worker thread to run on the Tk thread"""
+        self.pending_callbacks.put(callback)
+    
+    def _process_pending_callbacks(self):
+        """Run callbacks queued by worker threads"""
+        try:
+            while True:
+                self.pending_callbacks.get_nowait()()
+        except queue.Empty:
+            pass
+        self.frame.after(30, self._process_pending_callbacks)
+    
     def show(self):
         """Show this panel"""
         self.frame.pack(fill="both", expand=True)
@@ -176,18 +202,25 @@ class ChannelThumbnail:
     def update_thumbnail(self, image: Image.Image, image_path: str):
         """Update the thumbnail display"""
         # Create and set thumbnail
-        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.DROP_SIZE)
+        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.DROP_SIZE,
+                                               ThumbnailCache.source_key(image_path))
         photo = ImageTk.PhotoImage(thumb)
-        self.thumb_label.config(image=photo, bg=None)
+        self.thumb_label.config(image=photo, text="", bg=None)
         self.thumb_label.image = photo
         
         # Update resolution display
         w, h = image.size
         self.res_label.config(text=f"{w} × {h}")
     
+    def show_loading(self, image_path: str):
+        """Show a placeholder while the image decodes in the background"""
+        self.thumb_label.config(image="", text="Loading...", bg="lightgray")
+        self.thumb_label.image = None
+        self.res_label.config(text=os.path.basename(image_path))
+    
     def clear_thumbnail(self):
         """Clear the thumbnail display"""
-        self.thumb_label.config(image="", bg="lightgray")
+        self.thumb_label.config(image="", text="", bg="lightgray")
         self.thumb_label.image = None
         self.res_label.config(text="")
     def open_color_picker(self):
@@ -211,12 +244,15 @@ class ChannelPackerPanel(BasePanel):
     def __init__(self, parent: tk.Widget):
         self.model = ChannelPackerModel()
         self.model.add_observer(self)
+        self.model.call_soon = self._call_soon
         self.thumbnails = {}
-        self.drop_handler = FileDropHandler(self._on_file_dropped)
+        self.drop_handler = FileDropHandler(self._on_file_dropped, self._on_files_dropped)
         self.preview_widget = None
         self.output_filename_var = tk.StringVar(value="packed_texture.png")
         self.output_directory_var = tk.StringVar(value=os.getcwd())
         self.bit_depth_var = tk.StringVar(value="8")
+        self.resize_policy_var = tk.StringVar(value=ImageConfig.DEFAULT_RESIZE_POLICY.value)
+        self.target_size_var = tk.StringVar(value="2048x2048")
         
         
         super().__init__(parent)
@@ -283,6 +319,29 @@ class ChannelPackerPanel(BasePanel):
         tk.Radiobutton(depth_frame, text="32-bit (RGBA)", variable=self.bit_depth_var, 
                       value="32", font=("Arial", 10)).pack(side="left", padx=2)
         tk.Label(self.frame, text="Downgrading color depth not supported", fg="red").pack(pady=0)
+        
+        # Size mismatch policy
+        resize_frame = tk.Frame(self.frame)
+        resize_frame.pack(pady=(4, 0))
+        
+        tk.Label(resize_frame, text="Size Mismatch:", font=("Arial", 12)).pack(side="left", padx=5)
+        for policy, label in [(ResizePolicy.STRICT, "Error"), (ResizePolicy.MATCH_LARGEST, "Match largest"),
+                              (ResizePolicy.MATCH_SMALLEST, "Match smallest"), (ResizePolicy.EXPLICIT, "Size:")]:
+            tk.Radiobutton(resize_frame, text=label, variable=self.resize_policy_var,
+                          value=policy.value, font=("Arial", 10)).pack(side="left", padx=2)
+        tk.Entry(resize_frame, textvariable=self.target_size_var, width=10).pack(side="left", padx=2)
+    
+    def _sync_resize_policy(self):
+        """Copy the size mismatch settings to the model"""
+        policy = ResizePolicy(self.resize_policy_var.get())
+        target_size = None
+        if policy == ResizePolicy.EXPLICIT:
+            match = re.fullmatch(r"\s*(\d+)\s*[xX]\s*(\d+)\s*", self.target_size_var.get())
+            if not match:
+                raise ValueError("Enter the target size as WIDTHxHEIGHT, e.g. 2048x2048")
+            target_size = (int(match.group(1)), int(match.group(2)))
+        self.model.resize_policy = policy
+        self.model.target_size = target_size
     
     def _setup_preview(self):
         """Setup preview section"""
@@ -321,20 +380,37 @@ class ChannelPackerPanel(BasePanel):
         self.drop_handler.handle_drop(event, channel=channel)
     
     def _on_file_dropped(self, file_path: str, channel: str):
-        """Handle file drop on channel"""
-        print("_on_file_dropped")
+        """Handle file drop on channel; a single file always goes to the slot it was dropped on"""
         try:
-            self.model.set_channel_image(channel, file_path)
+            self.model.set_channel_image_async(channel, file_path)
             self.output_directory_var.set(os.path.dirname(file_path))
         except Exception as e:
             self.show_error(str(e))
     
+    def _on_files_dropped(self, file_paths: List[str], channel: str):
+        """Handle one or more files dropped on a channel; several files are routed by name suffix"""
+        if len(file_paths) == 1:
+            self._on_file_dropped(file_paths[0], channel)
+            return
+        try:
+            assignments = self.model.set_channel_images_async(file_paths, channel)
+            if file_paths:
+                self.output_directory_var.set(os.path.dirname(file_paths[0]))
+            ignored = len(file_paths) - len(assignments)
+            if ignored:
+                self.update_status(f"Loading {len(assignments)} files, {ignored} ignored (only 4 channels)", "orange")
+        except Exception as e:
+            self.show_error(str(e))
+    
     def _create_preview(self):
         """Create preview of merged image"""
         try:
             # Get selected bit depth and convert to integer
             selected_bit_depth = int(self.bit_depth_var.get())
-            self.model.create_merged_image(target_bit_depth=selected_bit_depth)
+            self._sync_resize_policy()
+            # Merging runs on the Tk thread; label it for the stall watchdog
+            with WATCHDOG.action("pack preview"):
+                self.model.create_merged_image(target_bit_depth=selected_bit_depth)
         except Exception as e:
             self.show_error(str(e))
     
@@ -345,12 +421,14 @@ class ChannelPackerPanel(BasePanel):
             directory = self.output_directory_var.get() or os.getcwd()
             full_path = os.path.join(directory, filename)
             
-            # Ensure we have a merged image with the current bit depth settings
-            if self.model.merged_image is None:
-                selected_bit_depth = int(self.bit_depth_var.get())
-                self.model.create_merged_image(target_bit_depth=selected_bit_depth)
-            
-            self.model.save_merged_image(full_path)
+            with WATCHDOG.action("pack save"):
+                # Ensure we have a merged image with the current bit depth settings
+                if self.model.merged_image is None:
+                    selected_bit_depth = int(self.bit_depth_var.get())
+                    self._sync_resize_policy()
+                    self.model.create_merged_image(target_bit_depth=selected_bit_depth)
+                
+                self.model.save_merged_image(full_path)
         except Exception as e:
             self.show_error(str(e))
     
@@ -379,6 +457,16 @@ class ChannelPackerPanel(BasePanel):
         
         self.show_success(f"{channel} channel loaded: {os.path.basename(path)}")
     
+    def on_channel_loading(self, channel: str, path: str):
+        """Called when a channel starts decoding in the background"""
+        self.thumbnails[channel].show_loading(path)
+        self.update_status(f"Loading {channel} channel: {os.path.basename(path)}")
+    
+    def on_channel_load_error(self, channel: str, path: str, error: str):
+        """Called when a background decode fails"""
+        self.thumbnails[channel].clear_thumbnail()
+        self.show_error(error)
+    
     def on_channel_cleared(self, channel: str):
         """Called when a channel is cleared"""
         self.thumbnails[channel].clear_thumbnail()
@@ -399,15 +487,11 @@ class ChannelPackerPanel(BasePanel):
         
     def _browse_file_for_channel(self, channel: str):
         """Browse for file for a specific channel"""
-        filetypes = [("PNG files", "*.png"), ("DDS files", "*.dds"), ("All files", "*.*")]
+        filetypes = [("PNG files", "*.png"), ("DDS files", "*.dds"), ("TGA files", "*.tga"), ("TIFF files", "*.tif *.tiff"), ("All files", "*.*")]
         filename = filedialog.askopenfilename(title=f"Select image file for {channel} channel", filetypes=filetypes)
         
         if filename:
-            try:
-                self.model.set_channel_image(channel, filename)
-                self.output_directory_var.set(os.path.dirname(filename))
-            except Exception as e:
-                self.show_error(str(e))
+            self._on_file_dropped(filename, channel)
 
 
 class ChannelPreviewWidget:
@@ -446,9 +530,8 @@ class ChannelPreviewWidget:
     
     def update_preview(self, image: Image.Image):
         """Update the preview with channel image"""
-        # Convert grayscale to RGB for display
-        rgb_image = Image.merge("RGB", (image, image, image))
-        thumb = ImageProcessor.create_thumbnail(rgb_image, ImageConfig.CHANNEL_PREVIEW_SIZE)
+        # Convert grayscale to RGB for display after downscaling
+        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.CHANNEL_PREVIEW_SIZE).convert("RGB")
         photo = ImageTk.PhotoImage(thumb)
         self.preview_button.config(image=photo, bg=None)
         self.preview_button.image = photo
@@ -567,7 +650,7 @@ class ChannelUnpackerPanel(BasePanel):
     
     def _browse_file(self):
         """Browse for file"""
-        filetypes = [("PNG files", "*.png"), ("DDS files", "*.dds"), ("All files", "*.*")]
+        filetypes = [("PNG files", "*.png"), ("DDS files", "*.dds"), ("TGA files", "*.tga"), ("TIFF files", "*.tif *.tiff"), ("All files", "*.*")]
         filename = filedialog.askopenfilename(title="Select image file", filetypes=filetypes)
         
         if filename:
@@ -614,7 +697,7 @@ class ChannelUnpackerPanel(BasePanel):
     def on_image_loaded(self, image: Image.Image, path: str):
         """Called when image is loaded"""
         # Update drop area preview
-        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.PREVIEW_SIZE)
+        thumb = ImageProcessor.create_thumbnail(image, ImageConfig.PREVIEW_SIZE, ThumbnailCache.source_key(path))
         photo = ImageTk.PhotoImage(thumb)
         self.drop_label.config(image=photo, bg=None, text="")
         self.drop_label.image = photo
@@ -632,6 +715,262 @@ class ChannelUnpackerPanel(BasePanel):
         """Called when channels are saved"""
         self.show_success(f"Saved {len(files)} channel files")
 
+class ThumbnailGridBrowser:
+    """Virtualized thumbnail grid that only creates thumbnails for visible cells"""
+    
+    LABEL_HEIGHT = 18
+    PADDING = 6
+    POLL_INTERVAL_MS = 30
+    
+    def __init__(self, parent: tk.Widget, cell_size: Tuple[int, int] = ImageConfig.GRID_CELL_SIZE,
+                 disk_cache: Optional[DiskThumbnailCache] = None, height: int = 220,
+                 on_error: Optional[Callable[[str, str], None]] = None):
+        self.cell_size = cell_size
+        self.on_error = on_error
+        self.disk_cache = disk_cache or DiskThumbnailCache()
+        self.executor = ThreadPoolExecutor(max_workers=ImageConfig.GRID_WORKERS)
+        self.results = queue.Queue()
+        
+        self.paths: List[str] = []
+        self.columns = 1
+        self.generation = 0
+        self.thumbnails: "OrderedDict[int, Image.Image]" = OrderedDict()
+        self.max_cached_thumbnails = 512
+        self.pending = set()
+        self.visible = set()
+        self.visible_lock = threading.Lock()
+        self.cell_items: Dict[int, List[int]] = {}
+        self.photos: Dict[int, ImageTk.PhotoImage] = {}
+        self._refresh_pending = None
+        
+        self._create_widget(parent, height)
+        self._poll_results()
+    
+    def _create_widget(self, parent, height: int):
+        """Create the canvas and scrollbar"""
+        self.container = tk.Frame(parent)
+        
+        self.canvas = tk.Canvas(self.container, height=height, bg="white", highlightthickness=0)
+        scrollbar = tk.Scrollbar(self.container, orient="vertical", command=self._on_yscroll)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        
+        scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.container.bind("<Destroy>", self._on_destroy)
+    
+    @property
+    def cell_width(self) -> int:
+        return self.cell_size[0] + self.PADDING
+    
+    @property
+    def cell_height(self) -> int:
+        return self.cell_size[1] + self.LABEL_HEIGHT + self.PADDING
+    
+    def memory_usage(self) -> Dict[str, list]:
+        """Return the image buffers held by each field"""
+        return {"thumbnails": list(self.thumbnails.values()), "photos": list(self.photos.values())}
+    
+    def set_files(self, paths: List[str]):
+        """Show a new list of files, discarding the previous grid"""
+        self.generation += 1
+        self.paths = list(paths)
+        self.thumbnails.clear()
+        self.pending.clear()
+        self.canvas.delete("all")
+        self.cell_items.clear()
+        self.photos.clear()
+        self.canvas.yview_moveto(0)
+        self._update_scroll_region()
+        self._schedule_refresh()
+    
+    def _update_scroll_region(self):
+        """Size the scroll region for all rows, not just the rendered ones"""
+        self.columns = max(1, self.canvas.winfo_width() // self.cell_width)
+        rows = math.ceil(len(self.paths) / self.columns)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.cell_width, rows * self.cell_height))
+    
+    def _visible_range(self) -> range:
+        """Return the indices of cells currently inside the viewport"""
+        top = self.canvas.canvasy(0)
+        bottom = top + max(self.canvas.winfo_height(), 1)
+        first_row = max(0, int(top // self.cell_height))
+        last_row = int(bottom // self.cell_height)
+        return range(first_row * self.columns, min(len(self.paths), (last_row + 1) * self.columns))
+    
+    def _schedule_refresh(self):
+        """Coalesce refresh requests from scroll and resize events"""
+        if self._refresh_pending is None:
+            self._refresh_pending = self.canvas.after_idle(self._refresh)
+    
+    def _refresh(self):
+        """Create cells entering the viewport and release cells leaving it"""
+        self._refresh_pending = None
+        visible = set(self._visible_range())
+        with self.visible_lock:
+            self.visible = visible
+        
+        for index in list(self.cell_items):
+            if index not in visible:
+                for item in self.cell_items.pop(index):
+                    self.canvas.delete(item)
+                self.photos.pop(index, None)
+        
+        for index in sorted(visible):
+            if index not in self.cell_items:
+                self._draw_cell(index)
+    
+    def _draw_cell(self, index: int):
+        """Draw a cell with its thumbnail, or a placeholder while it loads"""
+        column, row = index % self.columns, index // self.columns
+        x, y = column * self.cell_width, row * self.cell_height
+        w, h = self.cell_size
+        
+        items = [
+            self.canvas.create_rectangle(x, y, x + w, y + h, fill="lightgray", outline=""),
+            self.canvas.create_text(x + w // 2, y + h + 2, anchor="n", width=w, font=("Arial", 8),
+                                    text=os.path.basename(self.paths[index]))
+        ]
+        
+        thumb = self.thumbnails.get(index)
+        if thumb is not None:
+            self.thumbnails.move_to_end(index)
+            photo = ImageTk.PhotoImage(thumb)
+            self.photos[index] = photo
+            items.append(self.canvas.create_image(x + w // 2, y + h // 2, anchor="center", image=photo))
+        elif index not in self.pending:
+            self.pending.add(index)
+            self.executor.submit(self._load_thumbnail, self.generation, index, self.paths[index])
+        self.cell_items[index] = items
+    
+    def _load_thumbnail(self, generation: int, index: int, path: str):
+        """Worker: load a thumbnail unless the cell has scrolled away in the meantime"""
+        with self.visible_lock:
+            wanted = generation == self.generation and index in self.visible
+        if not wanted:
+            self.results.put((generation, index, None, None))
+            return
+        try:
+            self.results.put((generation, index, self.disk_cache.get(path, self.cell_size), None))
+        except Exception as e:
+            # Reported from _poll_results on the UI thread
+            self.results.put((generation, index, None, str(e)))
+    
+    def _poll_results(self):
+        """Move finished thumbnails from the worker pool onto the canvas"""
+        try:
+            while True:
+                generation, index, thumb, error = self.results.get_nowait()
+                if generation != self.generation:
+                    continue
+                self.pending.discard(index)
+                if error is not None and self.on_error:
+                    self.on_error(self.paths[index], error)
+                if thumb is None:
+                    continue
+                
+                self.thumbnails[index] = thumb
+                while len(self.thumbnails) > self.max_cached_thumbnails:
+                    self.thumbnails.popitem(last=False)
+                
+                # Redraw the cell if it is still on screen
+                if index in self.cell_items:
+                    for item in self.cell_items.pop(index):
+                        self.canvas.delete(item)
+                    self._draw_cell(index)
+        except queue.Empty:
+            pass
+        self._poll_pending = self.canvas.after(self.POLL_INTERVAL_MS, self._poll_results)
+    
+    def _on_yscroll(self, *args):
+        """Handle scrollbar movement"""
+        self.canvas.yview(*args)
+        self._schedule_refresh()
+    
+    def _on_mousewheel(self, event):
+        """Scroll the grid with the mouse wheel"""
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+        self._schedule_refresh()
+    
+    def _on_configure(self, event):
+        """Re-layout cells when the number of columns changes"""
+        columns = max(1, event.width // self.cell_width)
+        if columns != self.columns:
+            self.canvas.delete("all")
+            self.cell_items.clear()
+            self.photos.clear()
+        self._update_scroll_region()
+        self._schedule_refresh()
+    
+    def _on_destroy(self, event):
+        """Stop background work when the widget goes away"""
+        if event.widget is self.container:
+            self.canvas.after_cancel(self._poll_pending)
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class VirtualLogView:
+    """Log view over a BulkLog; only the visible rows are ever inserted into the listbox"""
+    
+    def __init__(self, parent: tk.Widget, log: BulkLog, rows: int = 15):
+        self.log = log
+        self.rows = rows
+        self.top = 0
+        self.follow = True  # Stick to the newest lines until the user scrolls up
+        self._create_widget(parent)
+    
+    def _create_widget(self, parent):
+        """Create the listbox and scrollbar"""
+        self.container = tk.Frame(parent)
+        self.scrollbar = ttk.Scrollbar(self.container, command=self._on_yscroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox = tk.Listbox(self.container, height=self.rows)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.listbox.bind("<MouseWheel>", self._on_mousewheel)
+    
+    def set_log(self, log: BulkLog):
+        """Show a different log"""
+        self.log = log
+        self.top = 0
+        self.follow = True
+        self.refresh()
+    
+    def refresh(self):
+        """Redraw the visible rows"""
+        first, buffered = self.log.first_index, len(self.log)
+        last_top = max(first, self.log.total_lines - self.rows)
+        self.top = last_top if self.follow else min(max(self.top, first), last_top)
+        
+        self.listbox.delete(0, tk.END)
+        lines = self.log.lines(self.top, self.rows)
+        if lines:
+            self.listbox.insert(tk.END, *lines)
+        if buffered:
+            self.scrollbar.set((self.top - first) / buffered, min(1.0, (self.top - first + self.rows) / buffered))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _scroll_to(self, top: int):
+        self.top = top
+        self.follow = top + self.rows >= self.log.total_lines
+        self.refresh()
+    
+    def _on_yscroll(self, *args):
+        """Scrollbar command"""
+        if args[0] == "moveto":
+            self._scroll_to(self.log.first_index + int(float(args[1]) * len(self.log)))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self._scroll_to(self.top + int(args[1]) * step)
+    
+    def _on_mousewheel(self, event):
+        """Mouse wheel scrolling"""
+        self._scroll_to(self.top - 3 * (1 if event.delta > 0 else -1))
+        return "break"
+
+
 class BulkChannelUnpackerPanel(BasePanel):
     """Panel for channel unpacking functionality"""
     
@@ -641,10 +980,30 @@ class BulkChannelUnpackerPanel(BasePanel):
         # self.drop_handler = FileDropHandler(self._on_file_dropped)
         self.output_folder_var = tk.StringVar()
         self.input_folder_var = tk.StringVar()
-        self.total_images = []
+        self.include_var = tk.StringVar(value="; ".join(default_include_patterns()))
+        self.exclude_var = tk.StringVar()
+        self.workers_var = tk.IntVar(value=ImageConfig.BULK_WORKERS)
+        self.total_images: List[str] = []  # Full paths found by the last completed scan
+        self.scan_generation = 0
+        self.scan_complete = False
         self.processed_images = []
+        self.metrics: Optional[BulkMetricsCollector] = None
+        self.bulk_thread: Optional[threading.Thread] = None
+        self.log = BulkLog(ImageConfig.BULK_LOG_CAPACITY)
+        # Results of the panel's own background work (folder scans, dry runs)
+        self.tasks = EventBus([
+            EventSpec("input_scan_progress", ("generation", "count"), coalesce=True),
+            EventSpec("input_scan_ready", ("generation", "paths")),
+            EventSpec("bulk_plan_ready", ("plan",)),
+            EventSpec("bulk_plan_failed", ("error",)),
+            EventSpec("bulk_unpack_failed", ("error",)),
+        ])
+        self.tasks.subscribe(self)
 
         super().__init__(parent)
+        # Bulk runs publish from a worker thread; deliver on the Tk thread, batched per frame
+        self.model.events.attach(self.frame.after)
+        self.tasks.attach(self.frame.after)
     
     def _setup_ui(self):
         """Setup the channel unpacking UI"""
@@ -673,9 +1032,32 @@ class BulkChannelUnpackerPanel(BasePanel):
         output_entry = tk.Entry(output_folder_frame, textvariable=self.output_folder_var, width=30, state="readonly", font=("Arial", 20))
         output_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
         tk.Button(output_folder_frame, text="Browse", command=self._browse_output_folder).pack(side="right")
+        
+        # Recursive scan filters
+        filter_frame = tk.Frame(input_frame)
+        filter_frame.pack(fill="x", pady=(10, 0))
+        tk.Label(filter_frame, text="Include:", font=("Arial", 10)).pack(side="left")
+        tk.Entry(filter_frame, textvariable=self.include_var, width=20).pack(side="left", padx=(2, 10))
+        tk.Label(filter_frame, text="Exclude:", font=("Arial", 10)).pack(side="left")
+        tk.Entry(filter_frame, textvariable=self.exclude_var, width=20).pack(side="left", padx=2)
+        tk.Button(filter_frame, text="Rescan", command=self._scan_input_folder).pack(side="right")
+        tk.Label(filter_frame, text="Workers:", font=("Arial", 10)).pack(side="left", padx=(10, 0))
+        tk.Spinbox(filter_frame, from_=1, to=64, textvariable=self.workers_var, width=4).pack(side="left", padx=2)
+        
+        # Input folder contents
+        self.input_count_label = tk.Label(self.frame, text="", font=("Arial", 10))
+        self.input_count_label.pack(anchor="w", padx=20)
+        self.grid_browser = ThumbnailGridBrowser(self.frame, on_error=self._on_thumbnail_error)
+        self.grid_browser.container.pack(fill="x", padx=20)
 
-        tk.Button(self.frame, text="Start Unpacking", font=("Arial", 15), 
-                 command=self._start_bulk_unpacking).pack(pady=20)
+        button_frame = tk.Frame(self.frame)
+        button_frame.pack(pady=20)
+        self.start_button = tk.Button(button_frame, text="Start Unpacking", font=("Arial", 15), 
+                                     command=self._start_bulk_unpacking)
+        self.start_button.pack(side="left", padx=10)
+        self.plan_button = tk.Button(button_frame, text="Dry Run", font=("Arial", 15),
+                                    command=self._start_dry_run)
+        self.plan_button.pack(side="left", padx=10)
     
         # Progress bar
         self.progress_frame = tk.Frame(self.frame)
@@ -689,22 +1071,24 @@ class BulkChannelUnpackerPanel(BasePanel):
         self.progress_label = tk.Label(self.progress_frame, text="Ready", font=("Arial", 10))
         self.progress_label.pack(anchor="w", pady=(2, 0))
         
+        # Live throughput dashboard
+        dashboard = tk.Frame(self.progress_frame)
+        dashboard.pack(fill="x", pady=(5, 0))
+        self.dashboard_labels = {}
+        for column, (key, title) in enumerate([("rate", "Files/s"), ("bandwidth", "MB/s"), ("eta", "ETA"),
+                                               ("workers", "Active workers"), ("errors", "Error rate")]):
+            tk.Label(dashboard, text=title, font=("Arial", 9), fg="gray").grid(row=0, column=column, padx=8)
+            self.dashboard_labels[key] = tk.Label(dashboard, text="-", font=("Arial", 11, "bold"))
+            self.dashboard_labels[key].grid(row=1, column=column, padx=8)
+        
         # Status label
         self.status_label = tk.Label(self.frame, text="", font=("Arial", 12), fg="purple")
         self.status_label.pack(pady=1)
     
         # Process log
         tk.Label(self.frame, text="Processing Log:", font=("Arial", 12, "bold")).pack(anchor="w", padx=20, pady=(10, 5))
-        process_items_frame = tk.Frame(self.frame)
-        process_items_frame.pack(pady=5, fill="both", expand=True, padx=20)
-        
-        scrollbar = ttk.Scrollbar(process_items_frame)
-        scrollbar.pack(side="right", fill="y")
-        
-        self.log_listbox = tk.Listbox(process_items_frame, height=15, yscrollcommand=scrollbar.set)
-        self.log_listbox.pack(side="left", fill="both", expand=True)
-        
-        scrollbar.config(command=self.log_listbox.yview)
+        self.log_view = VirtualLogView(self.frame, self.log)
+        self.log_view.container.pack(pady=5, fill="both", expand=True, padx=20)
     
     
     
@@ -722,94 +1106,211 @@ class BulkChannelUnpackerPanel(BasePanel):
             self.show_error("Please select an output folder")
             return
         
-        if not self.total_images:
+        if self.scan_complete and not self.total_images:
             self.show_error("No supported image files found in input folder")
             return
         
-        # Clear previous results
-        self.log_listbox.delete(0, tk.END)
+        if self.bulk_thread is not None and self.bulk_thread.is_alive():
+            return
+        
+        workers = self._read_workers()
+        if workers is None:
+            return
+        
+        # Start a new log; the full history goes to disk, the view keeps the latest lines
+        self.log.close()
+        self.log = BulkLog(ImageConfig.BULK_LOG_CAPACITY, BulkLog.default_path(ImageConfig.BULK_LOG_DIR))
+        self.log_view.set_log(self.log)
         self.processed_images = []
         self.progress_var.set(0)
-        self.progress_label.config(text=f"Processing {len(self.total_images)} images...")
         
-        # Build full paths
-        image_paths = [os.path.join(input_folder, img) for img in self.total_images]
+        # Use the finished scan, or stream a fresh one so processing starts while it runs
+        if self.scan_complete:
+            image_paths = list(self.total_images)
+            self.progress_label.config(text=f"Processing {len(image_paths)} images...")
+        else:
+            image_paths = self._iter_input_images(input_folder)
+            self.progress_label.config(text="Scanning and processing...")
+        
+        # Metrics files are only written when TEXTURE_METRICS_DIR is set
+        self.metrics = BulkMetricsCollector(output_dir=os.environ.get("TEXTURE_METRICS_DIR"))
+        
+        # Run off the Tk thread; progress arrives through the model's event bus
+        self.start_button.config(state="disabled")
+        self.bulk_thread = threading.Thread(target=self._run_bulk_unpacking,
+                                            args=(image_paths, output_folder, input_folder, workers), daemon=True)
+        self.bulk_thread.start()
+        self._refresh_dashboard()
+    
+    def _start_dry_run(self):
+        """Validate the input folder and estimate the run without decoding any pixels"""
+        if not self.scan_complete or not self.total_images:
+            self.show_error("Please select an input folder with images and wait for the scan to finish")
+            return
+        
+        workers = self._read_workers()
+        if workers is None:
+            return
         
+        image_paths = list(self.total_images)
+        self.plan_button.config(state="disabled")
+        self.update_status(f"Planning {len(image_paths)} images...")
+        threading.Thread(target=self._run_dry_run, args=(image_paths, workers), daemon=True).start()
+    
+    def _run_dry_run(self, image_paths: List[str], workers: int):
+        """Worker thread body for a dry run"""
         try:
-            # Start bulk unpacking with progress callback
-            self.model.bulk_unpack_channels(
-                image_paths, 
-                output_folder, 
-                progress_callback=self._update_progress
-            )
+            plan = plan_unpack(image_paths, workers, apply_gamma_correction=self.model.apply_gamma_correction)
         except Exception as e:
-            self.show_error(str(e))
+            self.tasks.publish('bulk_plan_failed', error=f"Dry run failed: {e}")
+            return
+        self.tasks.publish('bulk_plan_ready', plan=plan)
+    
+    def on_bulk_plan_ready(self, plan):
+        """Called with the result of a dry run"""
+        self.plan_button.config(state="normal")
+        self.log.extend(["=== DRY RUN ==="] + plan.format().splitlines())
+        self.log_view.refresh()
+        if plan.failures:
+            self.update_status(f"Dry run: {len(plan.failures)} files will fail. Check log for details.", "orange")
+        else:
+            self.show_success(f"Dry run: all {len(plan.tasks)} files ok, about {plan.total_seconds:.0f}s")
+    
+    def on_bulk_plan_failed(self, error: str):
+        """Called when a dry run could not be completed; leaves any running bulk run alone"""
+        self.plan_button.config(state="normal")
+        self.show_error(error)
+    
+    def _refresh_dashboard(self):
+        """Update the throughput dashboard at a fixed rate while a run is active"""
+        if self.metrics is not None:
+            snapshot = self.metrics.snapshot()
+            eta = snapshot["eta_seconds"]
+            self.dashboard_labels["rate"].config(text=f"{snapshot['files_per_second']:.1f}")
+            self.dashboard_labels["bandwidth"].config(text=f"{snapshot['megabytes_per_second']:.1f}")
+            self.dashboard_labels["eta"].config(
+                text="-" if eta is None else f"{int(eta // 60)}:{int(eta % 60):02d}")
+            self.dashboard_labels["workers"].config(text=str(snapshot["active_workers"]))
+            self.dashboard_labels["errors"].config(text=f"{snapshot['error_rate'] * 100:.1f}%")
+        if self.bulk_thread is not None and self.bulk_thread.is_alive():
+            self.frame.after(ImageConfig.DASHBOARD_REFRESH_MS, self._refresh_dashboard)
+    
+    def _read_workers(self) -> Optional[int]:
+        """Worker count from the panel, or None after reporting an invalid entry"""
+        try:
+            workers = self.workers_var.get()
+        except tk.TclError:
+            workers = 0
+        if workers < 1:
+            self.show_error("Workers must be a whole number of at least 1")
+            return None
+        return workers
+    
+    def _run_bulk_unpacking(self, image_paths: Iterable[str], output_folder: str, input_folder: str, workers: int):
+        """Worker thread body for a bulk run; outputs mirror the input folder tree"""
+        try:
+            self.model.bulk_unpack_channels(image_paths, output_folder, max_workers=workers, metrics=self.metrics,
+                                            input_root=input_folder, memory_budget=default_memory_budget())
+        except Exception as e:
+            self.tasks.publish('bulk_unpack_failed', error=str(e))
+    
+    def _iter_input_images(self, folder: str):
+        """Stream images below folder matching the include/exclude patterns"""
+        return scan_images(folder, parse_patterns(self.include_var.get()) or None,
+                           parse_patterns(self.exclude_var.get()))
     
     def _browse_input_folder(self):
         """Browse for input folder"""
         folder = filedialog.askdirectory(title="Select input folder containing images")
         if folder:
             self.input_folder_var.set(folder)
-            self.total_images = [f for f in os.listdir(folder) if isfile(join(folder, f)) and f.lower().endswith(('.png', '.dds'))]
-            
+            self._scan_input_folder()
     
+    def _scan_input_folder(self):
+        """Scan the input folder tree in the background"""
+        folder = self.input_folder_var.get()
+        if not folder:
+            return
+        self.scan_generation += 1
+        self.scan_complete = False
+        self.total_images = []
+        self.input_count_label.config(text="Scanning...")
+        self.grid_browser.set_files([])
+        threading.Thread(target=self._run_scan, args=(folder, self.scan_generation), daemon=True).start()
+    
+    def _run_scan(self, folder: str, generation: int):
+        """Worker thread body for a folder scan"""
+        paths = []
+        for path in self._iter_input_images(folder):
+            paths.append(path)
+            if len(paths) % 500 == 0:
+                self.tasks.publish('input_scan_progress', generation=generation, count=len(paths))
+        self.tasks.publish('input_scan_ready', generation=generation, paths=paths)
+    
+    def on_input_scan_progress(self, generation: int, count: int):
+        """Called with the running file count of a scan"""
+        if generation == self.scan_generation:
+            self.input_count_label.config(text=f"Scanning... {count} images found")
+    
+    def on_input_scan_ready(self, generation: int, paths: List[str]):
+        """Called when a folder scan has finished"""
+        if generation != self.scan_generation:
+            return  # A newer scan was started
+        self.total_images = paths
+        self.scan_complete = True
+        self.input_count_label.config(text=f"{len(paths)} images found")
+        self.grid_browser.set_files(paths)
+
+    def _on_thumbnail_error(self, path: str, error: str):
+        """Called on the UI thread when a grid thumbnail cannot be created"""
+        self.update_status(f"Cannot create thumbnail for {os.path.basename(path)}: {error}", "red")
+
     def _browse_output_folder(self):
         """Browse for output folder"""
         folder = filedialog.askdirectory(title="Select output folder for unpacked channels")
         if folder:
             self.output_folder_var.set(folder)
     
-    def _update_progress(self, current_index: int, total_count: int, current_file: str):
-        """Update progress display during bulk processing"""
-        progress_percent = (current_index / total_count) * 100
-        self.progress_var.set(progress_percent)
-        self.progress_label.config(text=f"Processing {current_index + 1}/{total_count}: {os.path.basename(current_file)}")
-        
-        # Force UI update
-        self.frame.update_idletasks()
-
     def _on_file_dropped(self, file_path: str):
         """Handle file drop"""
         return
 
     # Model observer methods
-    def on_bulk_channels_unpacked(self, current_file: str, saved_files: List[str], progress: int, total: int):
-        """Called when a file is successfully processed during bulk unpacking"""
-        self.processed_images.append(current_file)
-        filename = os.path.basename(current_file)
-        
-        # Add success entry to log
-        log_entry = f"✓ {filename} → {len(saved_files)} channels saved"
-        self.log_listbox.insert(tk.END, log_entry)
-        self.log_listbox.see(tk.END)  # Auto-scroll to bottom
-        
-        # Update progress
-        progress_percent = (progress / total) * 100
-        self.progress_var.set(progress_percent)
-        self.progress_label.config(text=f"Processed {progress}/{total}: {filename}")
-        
-        # Force UI update
-        self.frame.update_idletasks()
-    
-    def on_bulk_unpack_error(self, file: str, error: str, progress: int, total: int):
-        """Called when an error occurs during bulk unpacking"""
-        filename = os.path.basename(file)
-        
-        # Add error entry to log
-        log_entry = f"✗ {filename} → ERROR: {error}"
-        self.log_listbox.insert(tk.END, log_entry)
-        self.log_listbox.see(tk.END)  # Auto-scroll to bottom
-        
-        # Update progress
-        progress_percent = (progress / total) * 100
-        self.progress_var.set(progress_percent)
-        self.progress_label.config(text=f"Error processing {progress}/{total}: {filename}")
-        
-        # Force UI update
-        self.frame.update_idletasks()
+    def on_bulk_progress(self, progress: int, total: int, current_file: str):
+        """Called with the latest progress, at most once per frame"""
+        if total is None:
+            # Streaming from a scan that is still running
+            self.progress_label.config(text=f"Processed {progress}: {os.path.basename(current_file)}")
+            return
+        self.progress_var.set((progress / total) * 100)
+        self.progress_label.config(text=f"Processed {progress}/{total}: {os.path.basename(current_file)}")
+    
+    def on_bulk_channels_unpacked_batch(self, events: List[Dict[str, object]]):
+        """Called with the files successfully processed since the last frame"""
+        self.processed_images.extend(event["current_file"] for event in events)
+        self.log.extend([
+            f"✓ {os.path.basename(event['current_file'])} → {len(event['saved_files'])} channels saved"
+            for event in events
+        ])
+        self.log_view.refresh()
+    
+    def on_bulk_unpack_error_batch(self, events: List[Dict[str, object]]):
+        """Called with the files that failed since the last frame"""
+        self.log.extend([
+            f"✗ {os.path.basename(event['file'])} → ERROR: {event['error']}" for event in events
+        ])
+        self.log_view.refresh()
+    
+    def on_bulk_unpack_failed(self, error: str):
+        """Called when a bulk run could not be started or aborted"""
+        self.start_button.config(state="normal")
+        self.plan_button.config(state="normal")
+        self.log.close()
+        self.show_error(error)
     
     def on_bulk_unpack_completed(self, results: Dict[str, Union[List[str], str]]):
         """Called when bulk unpacking is completed"""
+        self.start_button.config(state="normal")
         success_count = sum(1 for result in results.values() if isinstance(result, list))
         error_count = len(results) - success_count
         
@@ -818,12 +1319,21 @@ class BulkChannelUnpackerPanel(BasePanel):
         self.progress_label.config(text=f"Completed: {success_count} successful, {error_count} errors")
         
         # Add completion summary to log
-        self.log_listbox.insert(tk.END, "")
-        self.log_listbox.insert(tk.END, f"=== COMPLETED ===")
-        self.log_listbox.insert(tk.END, f"Total files: {len(results)}")
-        self.log_listbox.insert(tk.END, f"Successful: {success_count}")
-        self.log_listbox.insert(tk.END, f"Errors: {error_count}")
-        self.log_listbox.see(tk.END)
+        summary_lines = ["", "=== COMPLETED ===", f"Total files: {len(results)}",
+                         f"Successful: {success_count}", f"Errors: {error_count}"]
+        if self.metrics is not None:
+            summary = self.metrics.summary()
+            latency = summary["latency_seconds"]
+            summary_lines.append(f"Throughput: {summary['images_per_second']:.2f} images/s, "
+                                 f"{summary['megapixels_per_second']:.1f} MP/s")
+            summary_lines.append(f"Latency p50/p95/p99: {latency['p50']:.3f}s / "
+                                 f"{latency['p95']:.3f}s / {latency['p99']:.3f}s")
+        if self.log.path:
+            summary_lines.append(f"Full log: {self.log.path}")
+        self.log.extend(summary_lines)
+        self.log.close()
+        self.log_view.refresh()
+        self._refresh_dashboard()
         
         # Show completion message
         if error_count == 0:
@@ -831,6 +1341,71 @@ class BulkChannelUnpackerPanel(BasePanel):
         else:
             self.update_status(f"Bulk unpacking completed with {error_count} errors. Check log for details.", "orange")
 
+class MemoryReportWindow:
+    """Window listing the memory held by models, caches and previews"""
+    
+    def __init__(self, parent: tk.Widget, get_sources):
+        self.get_sources = get_sources
+        self.window = tk.Toplevel(parent)
+        self.window.title("Memory Report")
+        self.window.geometry("640x420")
+        self._create_widget()
+        self.refresh()
+    
+    def _create_widget(self):
+        """Create the report table and controls"""
+        columns = ("field", "buffers", "size", "shared")
+        self.tree = ttk.Treeview(self.window, columns=columns)
+        self.tree.heading("#0", text="Owner")
+        for column, title, width in zip(columns, ("Field", "Buffers", "Size", "Shared"), (180, 60, 90, 90)):
+            self.tree.heading(column, text=title)
+            self.tree.column(column, width=width, anchor="w" if column == "field" else "e")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+        
+        self.summary_label = tk.Label(self.window, justify="left", anchor="w", font=("Arial", 10))
+        self.summary_label.pack(fill="x", padx=10)
+        
+        controls = tk.Frame(self.window)
+        controls.pack(fill="x", padx=10, pady=5)
+        self.track_var = tk.BooleanVar(value=MEMORY_TRACKER.enabled)
+        tk.Checkbutton(controls, text="Measure operation peaks", variable=self.track_var,
+                      command=self._on_track_toggled).pack(side="left")
+        tk.Button(controls, text="Refresh", command=self.refresh).pack(side="right")
+    
+    def _on_track_toggled(self):
+        """Enable or disable per-operation peak measurement"""
+        if self.track_var.get():
+            MEMORY_TRACKER.enable()
+        else:
+            MEMORY_TRACKER.disable()
+    
+    def refresh(self):
+        """Rebuild the report"""
+        report = build_report(self.get_sources())
+        self.tree.delete(*self.tree.get_children())
+        owner_totals = report.by_owner()
+        owner_items = {}
+        for entry in report.entries:
+            if entry.owner not in owner_items:
+                owner_items[entry.owner] = self.tree.insert(
+                    "", "end", text=entry.owner, open=True,
+                    values=("", "", format_bytes(owner_totals[entry.owner]), ""))
+            shared = format_bytes(entry.shared_nbytes) if entry.shared_nbytes else ""
+            self.tree.insert(owner_items[entry.owner], "end", text="",
+                            values=(entry.field, entry.buffers, format_bytes(entry.nbytes), shared))
+        
+        lines = [f"Total image memory: {format_bytes(report.total_bytes)}"]
+        if report.rss_bytes is not None:
+            lines.append(f"Process RSS: {format_bytes(report.rss_bytes)}"
+                         f" (peak {format_bytes(report.peak_rss_bytes or 0)})")
+        for peak in list(MEMORY_TRACKER.peaks)[-3:]:
+            growth = peak.rss_growth_bytes
+            rss = f", RSS +{format_bytes(growth)}" if growth is not None else ""
+            lines.append(f"{peak.action}: Python peak {format_bytes(peak.python_peak_bytes)}{rss} "
+                         f"in {peak.seconds:.2f}s")
+        self.summary_label.config(text="\n".join(lines))
+
+
 class TextureProcessorApp:
     """Main application class"""
     
@@ -844,6 +1419,65 @@ class TextureProcessorApp:
         
         self._setup_ui()
         self._show_panel("packer")  # Show packer panel by default
+        
+        # Hidden profiling toggle for slowness reports
+        PROFILER.add_observer(self)
+        self.root.bind_all("<Control-Alt-p>", self._toggle_profiling)
+        self._update_title()
+        
+        self.memory_window: Optional[MemoryReportWindow] = None
+        self.root.bind_all("<Control-Alt-m>", self._show_memory_report)
+        
+        if WATCHDOG.enabled:
+            WATCHDOG.start(self.root)
+    
+    def _update_title(self):
+        """Show the profiling state in the window title"""
+        suffix = f" [profiling: {PROFILER.mode}]" if PROFILER.enabled else ""
+        self.root.title(f"Texture Channel Processor{suffix}")
+    
+    def _toggle_profiling(self, event=None):
+        """Toggle profiling of pack/unpack/bulk actions"""
+        PROFILER.configure(None if PROFILER.enabled else "cprofile")
+        self._update_title()
+        if PROFILER.enabled:
+            message = f"Profiling enabled, profiles go to {os.path.abspath(PROFILER.output_dir)}"
+        else:
+            message = "Profiling disabled"
+        print(message)
+        self.panels[self.current_panel].update_status(message)
+    
+    def on_profile_saved(self, action: str, paths: List[str], elapsed: float):
+        """Called when a profiled action has written its profile; may run on a bulk worker thread"""
+        message = f"Profiled {action} ({elapsed:.2f}s): {', '.join(paths)}"
+        print(message)
+        panel = self.panels[self.current_panel]
+        panel._call_soon(lambda: panel.update_status(message))
+    
+    def memory_sources(self) -> Dict[str, object]:
+        """Objects reported in the memory report"""
+        sources = {
+            "Packer model": self.panels["packer"].model,
+            "Unpacker model": self.panels["unpacker"].model,
+            "Bulk unpacker model": self.panels["bulk_unpacker"].model,
+            "Bulk input grid": self.panels["bulk_unpacker"].grid_browser,
+            "Thumbnail cache": THUMBNAIL_CACHE,
+        }
+        for index, viewer in enumerate(list(ZoomableImageViewer.instances), start=1):
+            try:
+                title = viewer.window.title()
+            except tk.TclError:
+                title = "closed"
+            sources[f"Viewer {index}: {title}"] = viewer
+        return sources
+    
+    def _show_memory_report(self, event=None):
+        """Open the memory report window, or refresh it if already open"""
+        if self.memory_window is not None and self.memory_window.window.winfo_exists():
+            self.memory_window.refresh()
+            self.memory_window.window.lift()
+        else:
+            self.memory_window = MemoryReportWindow(self.root, self.memory_sources)
     
     def _setup_ui(self):
         """Setup the main UI"""
@@ -882,6 +1516,8 @@ class TextureProcessorApp:
             self.root.mainloop()
         except KeyboardInterrupt:
             self.root.destroy()
+        finally:
+            WATCHDOG.stop()
 
 
 def main():
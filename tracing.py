@@ -0,0 +1,169 @@
+"""
+Lightweight per-stage tracing for the texture processing pipelines
+
+Spans are recorded only while the tracer is enabled; when disabled, TRACER.span()
+returns a shared no-op context manager so instrumented code pays a single call.
+Set the TEXTURE_TRACE environment variable to a file path to enable tracing at
+startup and write a Chrome trace-event JSON file on exit.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class TraceSpan:
+    """A timed pipeline stage, optionally tied to a file"""
+    stage: str
+    start: float
+    duration: float
+    thread_id: int
+    file: Optional[str] = None
+    args: Dict[str, object] = field(default_factory=dict)
+
+
+class _NullSpan:
+    """No-op context manager returned while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    """Context manager that records a span on exit"""
+
+    __slots__ = ("tracer", "stage", "file", "args", "start")
+
+    def __init__(self, tracer: "Tracer", stage: str, file: Optional[str], args: Dict[str, object]):
+        self.tracer = tracer
+        self.stage = stage
+        self.file = file
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(TraceSpan(self.stage, self.start, duration, threading.get_ident(), self.file, self.args))
+        return False
+
+
+class Tracer:
+    """Collects spans and forwards them to observers as 'trace_span' events"""
+
+    def __init__(self, max_spans: int = 1_000_000):
+        self.enabled = False
+        self.max_spans = max_spans
+        self.spans: List[TraceSpan] = []
+        self.observers = []
+        self.output_path: Optional[str] = None
+        self.epoch = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_observer(self, observer):
+        """Add observer for recorded spans"""
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """Remove a previously added observer"""
+        if observer in self.observers:
+            self.observers.remove(observer)
+
+    def notify_observers(self, event: str, **kwargs):
+        """Notify all observers of changes"""
+        for observer in self.observers:
+            if hasattr(observer, f'on_{event}'):
+                getattr(observer, f'on_{event}')(**kwargs)
+
+    def enable(self, output_path: Optional[str] = None):
+        """Start recording spans, optionally writing a Chrome trace to output_path at exit"""
+        self.enabled = True
+        if output_path and self.output_path is None:
+            atexit.register(self._write_on_exit)
+        self.output_path = output_path or self.output_path
+
+    def disable(self):
+        """Stop recording spans"""
+        self.enabled = False
+
+    def clear(self):
+        """Drop all recorded spans"""
+        with self._lock:
+            self.spans = []
+
+    def span(self, stage: str, file: Optional[str] = None, **args):
+        """Return a context manager timing one stage"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, stage, file, args)
+
+    def record(self, span: TraceSpan):
+        """Store a finished span and notify observers"""
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+        self.notify_observers('trace_span', span=span)
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Total seconds spent per stage across all recorded spans"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span.stage] = totals.get(span.stage, 0.0) + span.duration
+        return totals
+
+    def to_chrome_trace(self) -> Dict[str, object]:
+        """Convert recorded spans to the Chrome trace-event format"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+
+        events = []
+        for span in spans:
+            args = dict(span.args)
+            if span.file is not None:
+                args["file"] = span.file
+            events.append({
+                "name": span.stage,
+                "cat": "texture",
+                "ph": "X",
+                "ts": (span.start - self.epoch) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        """Write recorded spans as Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def _write_on_exit(self):
+        if self.output_path and self.spans:
+            self.write_chrome_trace(self.output_path)
+
+
+TRACER = Tracer()
+
+if os.environ.get("TEXTURE_TRACE"):
+    TRACER.enable(os.environ["TEXTURE_TRACE"])
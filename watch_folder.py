@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Watch-folder daemon for automatic unpacking and packing
+
+WatchFolderDaemon watches a drop folder and processes new or changed images without
+anyone pressing a button:
+
+- unpack mode: every image is unpacked into its own folder, mirroring the drop folder tree
+- pack mode: files are grouped into channel sets by suffix (rock_r.png, rock_g.png, ...)
+  and each set is packed into <set name>.png; a set is repacked when one of its files changes
+
+Changes are picked up with the watchdog package (inotify on Linux) when it is installed,
+otherwise by polling file sizes and modification times. A file is only processed once
+its size and modification time have been stable for the settle time, so partially
+written exports are skipped until the exporter has finished. Jobs run on a pool of
+worker threads that is started and warmed up once, when the daemon starts.
+
+Usage:
+    python watch_folder.py unpack drop/ unpacked/
+    python watch_folder.py pack drop/ packed/ --policy match_largest --workers 4
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from event_bus import EventBus, EventSpec
+from planner import group_channel_sets
+from scanner import parse_patterns, path_matches, scan_images
+from texture_processor import ChannelType, ChannelUnpackerModel, ImageConfig, ImageProcessor, ResizePolicy
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+
+WATCH_MODES = ("unpack", "pack")
+WATCH_BACKENDS = ("auto", "native", "poll")
+# Temporary files written by exporters and editors while saving
+TEMPORARY_PATTERNS = ("*.tmp", "*.part", "*~", ".*")
+
+Signature = Tuple[int, int]  # (size, modification time in ns)
+
+
+def file_signature(path: str) -> Optional[Signature]:
+    """Size and modification time of a file, or None if it cannot be read"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class Debouncer:
+    """Holds changed files back until their size and modification time stop changing"""
+
+    def __init__(self, settle_seconds: float = ImageConfig.WATCH_SETTLE_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        # path -> [signature, time of last change, time first seen]
+        self._pending: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, path: str):
+        """Record a change notification for path"""
+        now = self.clock()
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry is None:
+                self._pending[path] = [None, now, now]
+            else:
+                entry[1] = now
+
+    def pending_paths(self) -> List[str]:
+        """Paths that are still settling"""
+        with self._lock:
+            return list(self._pending)
+
+    def ready(self) -> List[Tuple[str, float]]:
+        """Remove and return (path, time first seen) for files that have settled"""
+        now = self.clock()
+        settled = []
+        with self._lock:
+            for path, entry in list(self._pending.items()):
+                signature = file_signature(path)
+                if signature is None:
+                    del self._pending[path]  # Deleted or renamed away
+                elif signature != entry[0] or signature[0] == 0:
+                    # Still being written (empty files are usually just created)
+                    entry[0], entry[1] = signature, now
+                elif now - entry[1] >= self.settle_seconds:
+                    del self._pending[path]
+                    settled.append((path, entry[2]))
+        return settled
+
+
+class PollingSource:
+    """Change detection by periodically comparing file sizes and modification times"""
+
+    name = "poll"
+
+    def __init__(self, root: str, include: Optional[Iterable[str]], exclude: Iterable[str],
+                 interval: float = ImageConfig.WATCH_POLL_INTERVAL):
+        self.root = root
+        self.include = include
+        self.exclude = exclude
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> Dict[str, Signature]:
+        snapshot = {}
+        for path in scan_images(self.root, self.include, self.exclude):
+            signature = file_signature(path)
+            if signature is not None:
+                snapshot[path] = signature
+        return snapshot
+
+    def start(self, notify: Callable[[str], None]):
+        """Call notify(path) from a background thread for every new or changed file"""
+        previous = self.snapshot()
+
+        def run():
+            nonlocal previous
+            while not self._stop.wait(self.interval):
+                current = self.snapshot()
+                for path, signature in current.items():
+                    if previous.get(path) != signature:
+                        notify(path)
+                previous = current
+
+        self._thread = threading.Thread(target=run, name="watch-poll", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class NativeSource:
+    """Change detection with the watchdog package (inotify, FSEvents or ReadDirectoryChangesW)"""
+
+    name = "native"
+
+    def __init__(self, root: str, accept: Callable[[str], bool]):
+        self.root = root
+        self.accept = accept
+        self._observer = None
+
+    def start(self, notify: Callable[[str], None]):
+        accept = self.accept
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type == "deleted":
+                    return
+                path = getattr(event, "dest_path", "") or event.src_path
+                if accept(path):
+                    notify(path)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.root, recursive=True)
+        self._observer.start()
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+
+def _warm_worker(barrier: threading.Barrier):
+    """Load Pillow's format plugins and hold the thread until every worker has started"""
+    Image.init()
+    try:
+        barrier.wait(timeout=5.0)
+    except threading.BrokenBarrierError:
+        pass
+
+
+class WatchFolderDaemon:
+    """Processes images dropped into a folder as soon as they have been fully written"""
+
+    EVENTS = (
+        EventSpec("watch_started", ("root", "backend")),
+        EventSpec("watch_job_done", ("job", "inputs", "outputs", "seconds", "latency")),
+        EventSpec("watch_job_failed", ("job", "inputs", "error")),
+        EventSpec("watch_stopped", ("done", "failed")),
+    )
+
+    def __init__(self, root: str, output_dir: str, mode: str = "unpack",
+                 include: Optional[Iterable[str]] = None, exclude: Iterable[str] = (),
+                 workers: int = ImageConfig.WATCH_WORKERS,
+                 settle_seconds: float = ImageConfig.WATCH_SETTLE_SECONDS,
+                 poll_interval: float = ImageConfig.WATCH_POLL_INTERVAL, backend: str = "auto",
+                 resize_policy: ResizePolicy = ImageConfig.DEFAULT_RESIZE_POLICY,
+                 target_size: Optional[Tuple[int, int]] = None, preserve_transparent: bool = True,
+                 apply_gamma_correction: bool = False, metrics=None):
+        if mode not in WATCH_MODES:
+            raise ValueError(f"Unknown watch mode: {mode}. Use one of: {', '.join(WATCH_MODES)}")
+        if backend not in WATCH_BACKENDS:
+            raise ValueError(f"Unknown watch backend: {backend}. Use one of: {', '.join(WATCH_BACKENDS)}")
+        if backend == "native" and Observer is None:
+            raise ValueError("The native backend needs the watchdog package: pip install watchdog")
+
+        self.root = os.path.abspath(root)
+        self.output_dir = os.path.abspath(output_dir)
+        self.mode = mode
+        self.include = list(include) if include else None
+        self.exclude = list(exclude) + list(TEMPORARY_PATTERNS)
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.backend = backend
+        self.resize_policy = resize_policy
+        self.target_size = target_size
+        self.preserve_transparent = preserve_transparent
+        self.metrics = metrics
+        self.unpacker = ChannelUnpackerModel()
+        self.unpacker.apply_gamma_correction = apply_gamma_correction
+        self.debouncer = Debouncer(settle_seconds)
+        self.events = EventBus(self.EVENTS)
+        self.stats = {"done": 0, "failed": 0}
+
+        self.source = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._settled: Dict[str, Signature] = {}    # Inputs known to be complete
+        self._processed: Dict[str, Signature] = {}  # Signature each input was last processed with
+        self._running: set = set()                   # Job keys currently on the pool
+        self._rerun: Dict[str, Tuple[Callable, tuple]] = {}
+
+    def add_observer(self, observer):
+        """Add observer for job events"""
+        self.events.subscribe(observer)
+
+    def notify_observers(self, event: str, **kwargs):
+        """Notify all observers of changes"""
+        self.events.publish(event, **kwargs)
+
+    def accepts(self, path: str) -> bool:
+        """Whether a path is an input of this daemon"""
+        path = os.path.abspath(path)
+        if path == self.output_dir or path.startswith(self.output_dir + os.sep):
+            return False  # Our own results, when the output folder is inside the drop folder
+        return path_matches(path, self.root, self.include, self.exclude)
+
+    def _create_source(self):
+        if self.backend != "poll" and Observer is not None:
+            return NativeSource(self.root, self.accepts)
+        return PollingSource(self.root, self.include, self.exclude, self.poll_interval)
+
+    def start(self, process_existing: bool = False):
+        """Start watching; with process_existing, images already in the folder are processed too"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="watch-worker")
+        barrier = threading.Barrier(self.workers)
+        wait([self._executor.submit(_warm_worker, barrier) for _ in range(self.workers)])
+        if self.metrics is not None:
+            self.metrics.start_run()
+
+        self.source = self._create_source()
+        self.source.start(self._on_change)
+        if process_existing:
+            for path in scan_images(self.root, self.include, self.exclude):
+                if self.accepts(path):
+                    self.debouncer.touch(path)
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="watch-dispatch", daemon=True)
+        self._dispatcher.start()
+        self.notify_observers('watch_started', root=self.root, backend=self.source.name)
+
+    def stop(self):
+        """Stop watching and wait for running jobs to finish"""
+        self._stop.set()
+        if self.source is not None:
+            self.source.stop()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.metrics is not None:
+            self.metrics.finish_run()
+        self.notify_observers('watch_stopped', done=self.stats["done"], failed=self.stats["failed"])
+
+    def run_forever(self, process_existing: bool = False):
+        """Watch until interrupted with Ctrl+C"""
+        self.start(process_existing)
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _on_change(self, path: str):
+        """Called by the change source, from its own thread"""
+        if self.accepts(path):
+            self.debouncer.touch(os.path.abspath(path))
+
+    def _dispatch_loop(self):
+        interval = min(0.25, max(0.01, self.debouncer.settle_seconds / 4))
+        while not self._stop.wait(interval):
+            settled = self.debouncer.ready()
+            if settled:
+                self._dispatch(settled)
+
+    def _dispatch(self, settled: List[Tuple[str, float]]):
+        """Queue jobs for files that have finished writing"""
+        changed = []
+        with self._lock:
+            for path, first_seen in settled:
+                signature = file_signature(path)
+                if signature is None or self._processed.get(path) == signature:
+                    continue  # Gone, or touched without changing
+                self._settled[path] = signature
+                changed.append((path, first_seen))
+
+        if self.mode == "unpack":
+            for path, first_seen in changed:
+                self._submit(path, self._run_unpack, (path, first_seen))
+            return
+
+        # Pack every set that gained or changed a file, unless another of its files is still settling
+        first_seen_by_path = dict(changed)
+        with self._lock:
+            for path in [path for path in self._settled if not os.path.isfile(path)]:
+                del self._settled[path]
+            sets, _ = group_channel_sets(sorted(self._settled))
+        pending_sets, _ = group_channel_sets(self.debouncer.pending_paths())
+        for name, channels in sets.items():
+            touched = [first_seen_by_path[path] for path in channels.values() if path in first_seen_by_path]
+            if touched and name not in pending_sets:
+                self._submit(name, self._run_pack, (name, channels, min(touched)))
+
+    def _submit(self, key: str, function: Callable, args: tuple):
+        """Run a job on the pool; a job for a key that is already running is queued behind it"""
+        with self._lock:
+            if key in self._running:
+                self._rerun[key] = (function, args)
+                return
+            self._running.add(key)
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(lambda _: self._job_finished(key))
+
+    def _job_finished(self, key: str):
+        executor = self._executor
+        with self._lock:
+            queued = self._rerun.pop(key, None)
+            if queued is None or executor is None:
+                self._running.discard(key)
+                return
+        try:
+            future = executor.submit(queued[0], *queued[1])
+        except RuntimeError:  # The pool is shutting down
+            with self._lock:
+                self._running.discard(key)
+            return
+        future.add_done_callback(lambda _: self._job_finished(key))
+
+    def _mark_processed(self, paths: List[str]):
+        with self._lock:
+            for path in paths:
+                if path in self._settled:
+                    self._processed[path] = self._settled[path]
+
+    def _record(self, job: str, inputs: List[str], start: float, first_seen: float,
+                outputs: Optional[List[str]] = None, error: Optional[Exception] = None):
+        with self._lock:
+            self.stats["failed" if error is not None else "done"] += 1
+        if error is not None:
+            self.notify_observers('watch_job_failed', job=job, inputs=inputs, error=str(error))
+        else:
+            self._mark_processed(inputs)
+            self.notify_observers('watch_job_done', job=job, inputs=inputs, outputs=outputs,
+                                  seconds=time.perf_counter() - start, latency=time.monotonic() - first_seen)
+
+    def _run_unpack(self, path: str, first_seen: float):
+        start = time.perf_counter()
+        try:
+            outputs = self.unpacker.unpack_file(path, self.output_dir, self.metrics, input_root=self.root)
+        except Exception as e:
+            self._record(os.path.relpath(path, self.root), [path], start, first_seen, error=e)
+            return
+        self._record(os.path.relpath(path, self.root), [path], start, first_seen, outputs)
+
+    def _run_pack(self, name: str, channels: Dict[str, str], first_seen: float):
+        start = time.perf_counter()
+        inputs = [channels[ch.value] for ch in ChannelType if ch.value in channels]
+        output_path = ChannelUnpackerModel.output_dir_for(f"{name}.png", self.output_dir, self.root) + ".png"
+        job = os.path.relpath(name, self.root)
+        if self.metrics is not None:
+            self.metrics.file_started()
+        try:
+            image = ImageProcessor.pack_channels(
+                channels.get("R"), channels.get("G"), channels.get("B"), channels.get("A"),
+                self.preserve_transparent, self.resize_policy, self.target_size
+            )
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            bytes_written = ImageProcessor.save_image(image, output_path)
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.record_file(job, time.perf_counter() - start, error=str(e))
+            self._record(job, inputs, start, first_seen, error=e)
+            return
+        if self.metrics is not None:
+            self.metrics.record_file(job, time.perf_counter() - start,
+                                     bytes_read=sum(os.path.getsize(path) for path in inputs),
+                                     bytes_written=bytes_written, pixels=image.width * image.height)
+        self._record(job, inputs, start, first_seen, [output_path])
+
+
+class ConsoleReporter:
+    """Prints daemon events for the command line"""
+
+    def on_watch_started(self, root: str, backend: str):
+        print(f"Watching {root} ({backend} backend), press Ctrl+C to stop")
+
+    def on_watch_job_done(self, job: str, inputs: List[str], outputs: List[str], seconds: float, latency: float):
+        print(f"Processed {job}: {len(outputs)} file(s) in {seconds:.2f}s, {latency:.1f}s after the first change")
+
+    def on_watch_job_failed(self, job: str, inputs: List[str], error: str):
+        print(f"Failed {job}: {error}")
+
+    def on_watch_stopped(self, done: int, failed: int):
+        print(f"Stopped: {done} job(s) done, {failed} failed")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Watch a folder and unpack or pack textures as they arrive")
+    parser.add_argument("mode", choices=WATCH_MODES, help="Job to run for new files")
+    parser.add_argument("folder", help="Drop folder to watch (recursively)")
+    parser.add_argument("output", help="Output folder")
+    parser.add_argument("--workers", type=int, default=ImageConfig.WATCH_WORKERS, help="Worker threads")
+    parser.add_argument("--settle", type=float, default=ImageConfig.WATCH_SETTLE_SECONDS,
+                        help="Seconds a file must stay unchanged before it is processed")
+    parser.add_argument("--poll-interval", type=float, default=ImageConfig.WATCH_POLL_INTERVAL,
+                        help="Seconds between scans when polling")
+    parser.add_argument("--backend", choices=WATCH_BACKENDS, default="auto",
+                        help="Change detection (auto: watchdog package if installed, else polling)")
+    parser.add_argument("--include", default="", help="';'-separated globs of files to process")
+    parser.add_argument("--exclude", default="", help="';'-separated globs of files or folders to skip")
+    parser.add_argument("--existing", action="store_true", help="Also process files already in the folder")
+    parser.add_argument("--gamma", action="store_true", help="Unpack with gamma correction")
+    parser.add_argument("--policy", choices=[policy.value for policy in ResizePolicy],
+                        default=ImageConfig.DEFAULT_RESIZE_POLICY.value, help="Size mismatch policy for pack")
+    parser.add_argument("--target-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"),
+                        help="Output size for the explicit policy")
+    parser.add_argument("--flatten", action="store_true", help="Pack with transparent pixels flattened to white")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"Not a folder: {args.folder}")
+        return 1
+    try:
+        daemon = WatchFolderDaemon(
+            args.folder, args.output, args.mode, parse_patterns(args.include) or None,
+            parse_patterns(args.exclude), args.workers, args.settle, args.poll_interval, args.backend,
+            ResizePolicy(args.policy), tuple(args.target_size) if args.target_size else None,
+            not args.flatten, args.gamma
+        )
+    except ValueError as e:
+        print(e)
+        return 1
+    daemon.add_observer(ConsoleReporter())
+    daemon.run_forever(args.existing)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())